@@ -0,0 +1,117 @@
+"""Micro-benchmark: indexed alert evaluation versus checking every rule.
+
+Registers `--rules` random price, volume and moving-average alerts over
+`--symbols` symbols, seeds their daily windows, then replays `--quotes`
+random-walk quotes through `AlertIndex` and through a naive loop over all
+rules of the quoted symbol, checking both fire the same rules.
+
+Run from the `discord_finance_bot` directory:
+    python -m bench.bench_alerts --rules 50000 --symbols 500 --quotes 20000
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+from utils.alert_index import ALERT_KINDS, AlertIndex, AlertRule
+
+
+def make_rules(count: int, symbols: List[str], rnd: random.Random) -> List[AlertRule]:
+    kinds = list(ALERT_KINDS)
+    rules = []
+    for i in range(count):
+        kind = rnd.choice(kinds)
+        if kind in ("above", "below"):
+            value = round(rnd.uniform(80, 120), 2)
+        elif kind == "volume":
+            value = rnd.choice([1.5, 2.0, 3.0])
+        else:
+            value = rnd.choice([5, 10, 20, 50])
+        rules.append(AlertRule(id=i + 1, symbol=rnd.choice(symbols), kind=kind, value=value))
+    return rules
+
+
+def naive_hits(index: AlertIndex, by_symbol: Dict[str, List[AlertRule]], symbol: str, old_price: float, price: float, old_volume: float, volume: float) -> List[int]:
+    hits = []
+    for rule in by_symbol.get(symbol, []):
+        level = index.threshold(rule.id)
+        if level is None:
+            continue
+        if rule.kind in ("above", "ma_above") and old_price < level <= price:
+            hits.append(rule.id)
+        elif rule.kind in ("below", "ma_below") and price <= level < old_price:
+            hits.append(rule.id)
+        elif rule.kind == "volume" and old_volume < level <= volume:
+            hits.append(rule.id)
+    return hits
+
+
+def run(rules: int, symbols: int, quotes: int, seed: int = 7) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    tickers = [f"S{i:03d}" for i in range(symbols)]
+    rule_list = make_rules(rules, tickers, rnd)
+
+    index = AlertIndex(volume_lookback=30, cooldown=0)
+    t0 = time.perf_counter()
+    index.load(rule_list)
+    load = time.perf_counter() - t0
+    sessions = [f"2025-{m:02d}-{d:02d}" for m in range(1, 4) for d in range(1, 29)]
+    t0 = time.perf_counter()
+    for symbol in tickers:
+        closes = [100 + rnd.gauss(0, 5) for _ in sessions]
+        volumes = [rnd.uniform(1e6, 3e6) for _ in sessions]
+        index.seed(symbol, sessions, closes, volumes)
+    seeding = time.perf_counter() - t0
+
+    by_symbol: Dict[str, List[AlertRule]] = {}
+    for rule in rule_list:
+        by_symbol.setdefault(rule.symbol, []).append(rule)
+
+    stream = []
+    prices = {s: 100.0 for s in tickers}
+    volumes = {s: 0.0 for s in tickers}
+    for _ in range(quotes):
+        symbol = rnd.choice(tickers)
+        prices[symbol] *= 1 + rnd.gauss(0, 0.01)
+        volumes[symbol] += rnd.uniform(0, 2e5)
+        stream.append((symbol, prices[symbol], volumes[symbol]))
+
+    # Naive pass first, against the same thresholds, tracking its own last values
+    last_price = {s: index._symbols[s].price for s in tickers}
+    last_volume = {s: 0.0 for s in tickers}
+    t0 = time.perf_counter()
+    expected = []
+    for symbol, price, volume in stream:
+        expected.append(sorted(naive_hits(index, by_symbol, symbol, last_price[symbol], price, last_volume[symbol], volume)))
+        last_price[symbol], last_volume[symbol] = price, volume
+    naive = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    got = [sorted(t.rule.id for t in index.on_quote(symbol, price, volume, session="2025-04-01")) for symbol, price, volume in stream]
+    indexed = time.perf_counter() - t0
+
+    return {
+        "rules": rules,
+        "symbols": symbols,
+        "quotes": quotes,
+        "load_ms": round(load * 1000, 3),
+        "seed_ms": round(seeding * 1000, 3),
+        "indexed_us_per_quote": round(indexed / quotes * 1e6, 3),
+        "naive_us_per_quote": round(naive / quotes * 1e6, 3),
+        "triggers": sum(map(len, got)),
+        "identical": got == expected,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Alert index benchmark")
+    parser.add_argument("--rules", type=int, default=50000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--quotes", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rules, args.symbols, args.quotes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Micro-benchmark: breakout backtest parameter sweep on a synthetic universe.
+
+Builds `--symbols` x `--days` random-walk bars, then times building the
+panel and sweeping a lookback x ratio x hold grid serially and on a
+process pool over shared memory.
+
+Run from the `discord_finance_bot` directory:
+    python -m bench.bench_backtest --symbols 500 --days 2520 --lookbacks 10:100:5 --ratios 1:3:0.25 --holds 1:20:2
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from bench.bench_ohlcv import make_bars
+from utils.backtest import BacktestGrid, Panel, rank_results, run_grid
+
+
+def run(symbols: int, days: int, grid: BacktestGrid, workers: Optional[int], serial: bool) -> Dict[str, Any]:
+    end = dt.date(2026, 1, 2)
+    universe = {f"S{i:03d}": make_bars(f"S{i:03d}", days, end) for i in range(symbols)}
+    t0 = time.perf_counter()
+    panel = Panel.from_universe(universe)
+    build = time.perf_counter() - t0
+
+    report: Dict[str, Any] = {
+        "symbols": symbols,
+        "bars_per_symbol": days,
+        "combinations": len(grid),
+        "workers": workers or os.cpu_count(),
+        "panel_build_ms": round(build * 1000, 3),
+    }
+    if serial:
+        t0 = time.perf_counter()
+        run_grid(panel, grid, workers=1)
+        report["serial_s"] = round(time.perf_counter() - t0, 3)
+    t0 = time.perf_counter()
+    rows = run_grid(panel, grid, workers)
+    report["pool_s"] = round(time.perf_counter() - t0, 3)
+    report["best"] = rank_results(rows)[0] if rows else None
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Breakout backtest grid benchmark")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--lookbacks", type=str, default="10:100:10")
+    parser.add_argument("--ratios", type=str, default="1:3:0.25")
+    parser.add_argument("--holds", type=str, default="1:20:2")
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    parser.add_argument("--serial", action="store_true", help="Also time a single-process run")
+    args = parser.parse_args()
+    grid = BacktestGrid.from_args([f"lookback={args.lookbacks}", f"ratio={args.ratios}", f"hold={args.holds}"])
+    print(json.dumps(run(args.symbols, args.days, grid, args.workers or None, args.serial), indent=2))
+
+
+if __name__ == "__main__":
+    main()
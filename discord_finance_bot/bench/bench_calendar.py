@@ -0,0 +1,102 @@
+"""Micro-benchmark: calendar CSV parse + date-window filtering.
+
+Compares the previous path (DictReader over `splitlines()` and a full scan
+with `strptime` per row) with `DatedRows` (streaming parse, ISO fast path,
+bisect slices) on a synthetic 3-month earnings calendar.
+
+Run from the `discord_finance_bot` directory:
+    python -m bench.bench_calendar --rows 7000
+"""
+import argparse
+import csv
+import datetime as dt
+import json
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from utils.date_index import DatedRows
+
+
+def make_earnings_csv(rows: int, start: dt.date, days: int = 90, seed: int = 42) -> str:
+    """Build an AlphaVantage-like EARNINGS_CALENDAR CSV body."""
+    rnd = random.Random(seed)
+    lines = ["symbol,name,reportDate,fiscalDateEnding,estimate,currency"]
+    for i in range(rows):
+        report = start + dt.timedelta(days=rnd.randrange(days))
+        fiscal = dt.date(report.year, ((report.month - 1) // 3) * 3 + 1, 1) - dt.timedelta(days=1)
+        estimate = f"{rnd.uniform(-1, 5):.2f}" if rnd.random() > 0.2 else ""
+        lines.append(f"SYM{i},Company {i} Inc,{report.isoformat()},{fiscal.isoformat()},{estimate},USD")
+    return "\n".join(lines) + "\n"
+
+
+def _legacy_normalize(value: str) -> Optional[dt.date]:
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d", "%Y/%m/%d"):
+        try:
+            return dt.datetime.strptime(value.strip(), fmt).date()
+        except Exception:
+            continue
+    return None
+
+
+def legacy_parse(text: str) -> List[Dict[str, str]]:
+    return [dict(row) for row in csv.DictReader(text.splitlines())]
+
+
+def legacy_range(rows: List[Dict[str, str]], start: dt.date, end: dt.date) -> List[Dict[str, str]]:
+    out = []
+    for r in rows:
+        d = _legacy_normalize(r.get("reportDate", ""))
+        if d and start <= d <= end:
+            out.append(r)
+    return out
+
+
+def _time(fn: Callable, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return round(best * 1000, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark calendar parsing and date filtering")
+    parser.add_argument("--rows", type=int, default=7000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=20, help="Date-window queries per parsed calendar")
+    args = parser.parse_args()
+
+    today = dt.date.today()
+    text = make_earnings_csv(args.rows, today)
+    windows = [(today + dt.timedelta(days=i), today + dt.timedelta(days=i + 2)) for i in range(args.queries)]
+
+    legacy_rows = legacy_parse(text)
+    indexed = DatedRows.from_csv(text, ("reportDate",))
+    identical = all(
+        sorted(r["symbol"] for r in legacy_range(legacy_rows, s, e))
+        == sorted(r["symbol"] for r in indexed.between(s, e))
+        for s, e in windows
+    )
+
+    report = {
+        "rows": args.rows,
+        "queries": args.queries,
+        "identical_results": identical,
+        "legacy_parse_ms": _time(lambda: legacy_parse(text), args.rounds),
+        "indexed_parse_ms": _time(lambda: DatedRows.from_csv(text, ("reportDate",)), args.rounds),
+        "legacy_filter_ms_per_query": round(
+            _time(lambda: [legacy_range(legacy_rows, s, e) for s, e in windows], args.rounds) / args.queries, 4
+        ),
+        "indexed_filter_ms_per_query": round(
+            _time(lambda: [indexed.between(s, e) for s, e in windows], args.rounds) / args.queries, 4
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Micro-benchmark: columnar OHLCV store on a synthetic S&P 500-sized universe.
+
+Writes `--symbols` x `--days` daily bars into a temporary store, then times
+mapping the whole universe, a 30-day slice across every symbol, a
+breakout scan of the whole universe, and an incremental one-bar append
+per symbol.
+
+Run from the `discord_finance_bot` directory:
+    python -m bench.bench_ohlcv --symbols 500 --days 2520
+"""
+import argparse
+import datetime as dt
+import json
+import tempfile
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from repositories.ohlcv_store import OHLCVStore
+from utils.bars import Bars
+from utils.breakout import scan_breakouts
+
+
+def make_bars(symbol: str, days: int, end: dt.date, seed: int = 7) -> Bars:
+    """Synthetic random-walk weekday bars ending on or before `end`."""
+    rnd = np.random.default_rng([seed, *symbol.encode()])
+    dates = np.busday_offset(np.datetime64(end, "D"), np.arange(-days + 1, 1), roll="backward")
+    close = np.round(50 * np.exp(np.cumsum(rnd.normal(0.0003, 0.02, days))), 4)
+    open_ = np.round(close * (1 + rnd.normal(0, 0.005, days)), 4)
+    high = np.round(np.maximum(open_, close) * (1 + rnd.uniform(0, 0.01, days)), 4)
+    low = np.round(np.minimum(open_, close) * (1 - rnd.uniform(0, 0.01, days)), 4)
+    volume = rnd.integers(100_000, 5_000_000, days).astype("<f8")
+    return Bars(dates.astype("<M8[D]"), open_, high, low, close, volume)
+
+
+def make_daily_csv(symbol: str, days: int, end: dt.date, seed: int = 7) -> str:
+    """Build an AlphaVantage-like TIME_SERIES_DAILY CSV (newest first) of weekday bars."""
+    bars = make_bars(symbol, days, end, seed)
+    lines = ["timestamp,open,high,low,close,volume"]
+    for i in reversed(range(len(bars))):
+        lines.append(
+            f"{bars.date[i]},{bars.open[i]:.4f},{bars.high[i]:.4f},{bars.low[i]:.4f},{bars.close[i]:.4f},{int(bars.volume[i])}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def run(symbols: int, days: int, rounds: int) -> Dict[str, Any]:
+    # Store history through the previous business day, then append "today"
+    end = np.busday_offset(np.datetime64(dt.date.today(), "D"), 0, roll="backward").astype(dt.date)
+    previous = np.busday_offset(np.datetime64(end, "D"), -1).astype(dt.date)
+    tickers = [f"S{i:03d}" for i in range(symbols)]
+    with tempfile.TemporaryDirectory() as root:
+        store = OHLCVStore(root)
+        t0 = time.perf_counter()
+        for symbol in tickers:
+            store.append(symbol, make_bars(symbol, days, previous))
+        build = time.perf_counter() - t0
+
+        load = float("inf")
+        for _ in range(rounds):
+            fresh = OHLCVStore(root)  # cold: no cached maps
+            t0 = time.perf_counter()
+            universe = fresh.load_universe(tickers)
+            load = min(load, time.perf_counter() - t0)
+
+        start = end - dt.timedelta(days=45)
+        t0 = time.perf_counter()
+        highs = [bars.between(start, end).high.max() for bars in universe.values()]
+        slice_max = time.perf_counter() - t0
+
+        scan = None
+        scan_time = float("inf")
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            scan = scan_breakouts(universe, lookback=30, volume_ratio=1.5)
+            scan_time = min(scan_time, time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        appended = sum(store.append(s, make_bars(s, 2, end)) for s in tickers)
+        append = time.perf_counter() - t0
+
+    return {
+        "symbols": symbols,
+        "bars_per_symbol": days,
+        "build_s": round(build, 3),
+        "load_universe_ms": round(load * 1000, 3),
+        "slice_30d_high_ms": round(slice_max * 1000, 3),
+        "scan_breakouts_ms": round(scan_time * 1000, 3),
+        "breakouts": int(scan.signal.sum()) if scan is not None else 0,
+        "append_1_bar_each_ms": round(append * 1000, 3),
+        "appended": appended,
+        "checked": len(highs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Columnar OHLCV store benchmark")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.symbols, args.days, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark sector row extraction modes against the offline concepts fixture.
+
+Run from the `discord_finance_bot` directory:
+    python -m bench.bench_sector_extract --rounds 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+from repositories.web_crawler_repo import WebCrawlerRepo
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "concepts.html")
+PLATE_LIST_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "get_plate_list.json")
+MODES = ["elements", "evaluate", "html"]
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "min_ms": round(samples[0] * 1000, 3),
+        "median_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def bench_soup_only(html: str, limit: int, rounds: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        WebCrawlerRepo.parse_sector_rows_html(html, limit=limit)
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples)
+
+
+def bench_plate_list_json(html: str, limit: int, rounds: int) -> Dict[str, object]:
+    """Time the get-plate-list mapping and check it agrees with the DOM parse."""
+    with open(PLATE_LIST_FIXTURE, encoding="utf-8") as fh:
+        raw = fh.read()
+    samples = []
+    rows: List[dict] = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        rows = WebCrawlerRepo.parse_plate_list_json(json.loads(raw), limit=limit)
+        samples.append(time.perf_counter() - t0)
+    dom_rows = WebCrawlerRepo.parse_sector_rows_html(html, limit=limit)
+    return {**_stats(samples), "rows": len(rows), "matches_dom": rows == dom_rows}
+
+
+async def bench_browser_modes(html: str, limit: int, rounds: int) -> Dict[str, dict]:
+    repo = WebCrawlerRepo(SimpleNamespace(browser_pool_size=1))
+    results: Dict[str, dict] = {}
+    try:
+        async with repo.browser_pool.page() as page:
+            await page.set_content(html)
+            reference = None
+            for mode in MODES:
+                samples = []
+                rows: List[dict] = []
+                for _ in range(rounds):
+                    t0 = time.perf_counter()
+                    rows = await repo.extract_sector_rows(page, limit=limit, mode=mode)
+                    samples.append(time.perf_counter() - t0)
+                if reference is None:
+                    reference = rows
+                results[mode] = {**_stats(samples), "rows": len(rows), "identical": rows == reference}
+    finally:
+        await repo.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark sector row extraction modes")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--fixture", type=str, default=FIXTURE)
+    args = parser.parse_args()
+
+    with open(args.fixture, encoding="utf-8") as fh:
+        html = fh.read()
+
+    report = {
+        "soup_parse_only": bench_soup_only(html, args.limit, args.rounds),
+        "plate_list_json": bench_plate_list_json(html, args.limit, args.rounds),
+    }
+    try:
+        report["browser"] = asyncio.run(bench_browser_modes(html, args.limit, args.rounds))
+    except Exception as exc:
+        report["browser"] = {"skipped": str(exc).splitlines()[0]}
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
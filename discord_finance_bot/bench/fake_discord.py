@@ -0,0 +1,163 @@
+"""Minimal stand-ins for discord.py channel/message objects and the Discord REST API."""
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class FakeSentMessage:
+    def __init__(self, channel: "FakeChannel", content: Optional[str], embed=None):
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+
+    async def edit(self, content: Optional[str] = None, embed=None) -> None:
+        self.content = content
+        self.embed = embed
+        self.channel.events.append(("edit", time.perf_counter(), self))
+
+    async def delete(self) -> None:
+        self.channel.events.append(("delete", time.perf_counter(), self))
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeChannel:
+    """Records every send/edit with a timestamp instead of talking to Discord."""
+
+    def __init__(self, channel_id: int = 1):
+        self.id = channel_id
+        self.events: List[tuple] = []
+
+    async def send(self, content: Optional[str] = None, embed=None) -> FakeSentMessage:
+        msg = FakeSentMessage(self, content, embed)
+        self.events.append(("send", time.perf_counter(), msg))
+        return msg
+
+    def typing(self) -> _Typing:
+        return _Typing()
+
+
+class FakeMessage:
+    def __init__(self, content: str, channel: FakeChannel, author: str = "bench-user"):
+        self.content = content
+        self.channel = channel
+        self.author = author
+
+
+class FakeDiscordAPI:
+    """Local HTTP stand-in for Discord's create-message endpoint.
+
+    Serves `POST {api_url}/channels/{id}/messages` on 127.0.0.1 and enforces a
+    per-channel bucket (`route_limit` per `route_window` seconds) plus a global
+    `global_limit` requests/second, answering with Discord-style rate-limit
+    headers and 429 bodies. Channels in `missing` answer 404.
+    """
+
+    def __init__(
+        self,
+        route_limit: int = 5,
+        route_window: float = 5.0,
+        global_limit: int = 50,
+        latency: float = 0.0,
+        missing: Iterable[int] = (),
+    ):
+        self.route_limit = route_limit
+        self.route_window = route_window
+        self.global_limit = global_limit
+        self.latency = latency
+        self.missing = set(missing)
+        self.delivered: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.bodies: Set[bytes] = set()
+        self._routes: Dict[int, List[float]] = {}
+        self._global: List[float] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v10"
+
+    def _admit(self, channel_id: int) -> Tuple[int, Dict[str, str], dict]:
+        now = time.monotonic()
+        with self._lock:
+            self._global = [t for t in self._global if now - t < 1.0]
+            if len(self._global) >= self.global_limit:
+                retry = 1.0 - (now - self._global[0])
+                return 429, {"X-RateLimit-Global": "true", "Retry-After": f"{retry:.3f}"}, {
+                    "message": "You are being rate limited.", "retry_after": retry, "global": True,
+                }
+            window = [t for t in self._routes.get(channel_id, []) if now - t < self.route_window]
+            self._routes[channel_id] = window
+            if len(window) >= self.route_limit:
+                retry = self.route_window - (now - window[0])
+                return 429, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": f"{retry:.3f}"}, {
+                    "message": "You are being rate limited.", "retry_after": retry, "global": False,
+                }
+            self._global.append(now)
+            window.append(now)
+            reset_after = self.route_window - (now - window[0])
+            headers = {
+                "X-RateLimit-Limit": str(self.route_limit),
+                "X-RateLimit-Remaining": str(self.route_limit - len(window)),
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                "X-RateLimit-Bucket": f"channel-{channel_id}",
+            }
+            if channel_id in self.missing:
+                return 404, headers, {"message": "Unknown Channel", "code": 10003}
+            self.delivered[channel_id] += 1
+            return 200, headers, {"id": str(len(self._global)), "channel_id": str(channel_id)}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                match = re.fullmatch(r"/api/v10/channels/(\d+)/messages", self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                if match is None:
+                    self.send_error(404)
+                    return
+                if api.latency:
+                    threading.Event().wait(api.latency)
+                status, headers, payload = api._admit(int(match.group(1)))
+                with api._lock:
+                    api.statuses[status] += 1
+                    if status == 200:
+                        api.bodies.add(body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "FakeDiscordAPI":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
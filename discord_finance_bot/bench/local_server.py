@@ -0,0 +1,294 @@
+"""Local HTTP stand-ins for AlphaVantage and the moomoo concepts page.
+
+Routes:
+- `/query?function=EARNINGS_CALENDAR|IPO_CALENDAR` -> calendar CSVs
+- `/query?function=REALTIME_BULK_QUOTES|GLOBAL_QUOTE` -> synthetic quote CSVs
+- `/query?function=TIME_SERIES_DAILY` -> synthetic daily bars through the
+  previous weekday (compact = last 100 bars)
+  (bulk answers with a premium notice when `bulk_quotes=False`)
+- `/hans/quote/us/concepts` -> static concepts page replica that loads its
+  data from `/api/get-plate-list` like the real site, or a recorded copy of
+  the live page when `concepts_page` names one (served as is)
+- `/hans/quote/us/concept/plate-<id>` -> synthetic concept page listing the
+  sector's constituents
+- `/api/get-plate-list?page=N` -> synthetic plate list JSON (shaped after the
+  field aliases in `PLATE_FIELDS`, not recorded from the site); pages after the
+  first repeat its rows under suffixed names (the fixture says 3 pages)
+- `/static/*` -> filler stylesheet, font and images the concepts page loads
+- `/tracker.js`, `/beacon` -> a stand-in analytics script, linked from the
+  concepts page via `localhost` so it counts as a third-party host
+
+`bytes_served` counts response bytes per route, for bandwidth comparisons.
+
+Fixture dates are rebased so the calendars always start today.
+"""
+import datetime as dt
+import json
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from bench.bench_calendar import make_earnings_csv
+from bench.bench_ohlcv import make_daily_csv
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURE_ANCHOR = dt.date(2026, 1, 5)
+CONCEPTS_PATH = "/hans/quote/us/concepts"
+PLATE_LIST_PATH = "/api/get-plate-list"
+CONCEPT_PATH_PREFIX = "/hans/quote/us/concept/plate-"
+CONSTITUENTS_PER_SECTOR = 12
+_ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+QUOTE_FUNCTIONS = ("REALTIME_BULK_QUOTES", "GLOBAL_QUOTE")
+DAILY_HISTORY_BARS = 1000
+_PREMIUM_NOTICE = b'{"Information": "This is a premium endpoint."}'
+
+# Mimics the real page: the sector list data arrives via an XHR after load
+_PLATE_LIST_SCRIPT = f"""
+<script>
+  fetch("{PLATE_LIST_PATH}?marketType=2&pageSize=30&page=1", {{ credentials: "same-origin" }});
+</script>
+"""
+
+
+STATIC_PREFIX = "/static/"
+# Sizes of the filler assets, roughly those of the real page
+STATIC_ASSETS = {
+    "app.css": ("text/css", 40_000),
+    "font.woff2": ("font/woff2", 90_000),
+    "banner.png": ("image/png", 150_000),
+    "logo.png": ("image/png", 20_000),
+}
+TRACKER_PATH = "/tracker.js"
+BEACON_PATH = "/beacon"
+# Like real analytics: a few beacons after load keep the network busy for a while
+_TRACKER_JS = f"""
+let sent = 0;
+const beat = () => {{ fetch("{BEACON_PATH}?n=" + sent); if (++sent < 4) setTimeout(beat, 250); }};
+beat();
+""".encode("utf-8")
+_ASSETS_HTML = (
+    '<link rel="stylesheet" href="/static/app.css">'
+    '<img src="/static/banner.png" alt=""><img src="/static/logo.png" alt="">'
+    '<script src="http://localhost:{port}/tracker.js"></script>'
+)
+
+
+def static_asset(name: str) -> Optional[Tuple[str, bytes]]:
+    """(content type, body) of a filler asset; the stylesheet pulls in the font."""
+    if name not in STATIC_ASSETS:
+        return None
+    ctype, size = STATIC_ASSETS[name]
+    if name == "app.css":
+        head = b"@font-face { font-family: f; src: url(/static/font.woff2); } body { font-family: f; }\n"
+        return ctype, head + b"/*" + b"x" * (size - len(head) - 4) + b"*/"
+    return ctype, bytes(size)
+
+
+def _read(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fh:
+        return fh.read()
+
+
+def quote_csv(function: str, symbols, day: dt.date) -> bytes:
+    """Deterministic synthetic quotes in the CSV layout of `function`."""
+    if function == "GLOBAL_QUOTE":
+        lines = ["symbol,open,high,low,price,volume,latestDay,previousClose,change,changePercent"]
+    else:
+        lines = ["symbol,timestamp,open,high,low,close,volume,previous_close,change,change_percent"]
+    for symbol in symbols:
+        seed = zlib.crc32(symbol.encode("utf-8"))
+        prev = 20 + seed % 480
+        change = ((seed >> 9) % 2001 - 1000) / 100
+        price = prev + change
+        volume = 100_000 + (seed >> 3) % 9_000_000
+        pct = change / prev * 100
+        if function == "GLOBAL_QUOTE":
+            lines.append(f"{symbol},{prev},{price + 1},{prev - 1},{price:.2f},{volume},{day},{prev},{change:.2f},{pct:.4f}%")
+        else:
+            lines.append(f"{symbol},{day} 16:00:00,{prev},{price + 1},{prev - 1},{price:.2f},{volume},{prev},{change:.2f},{pct:.4f}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def daily_csv(symbol: str, outputsize: str, today: dt.date) -> bytes:
+    """Synthetic TIME_SERIES_DAILY body ending on the weekday before `today`."""
+    end = today - dt.timedelta(days=1)
+    while end.weekday() >= 5:
+        end -= dt.timedelta(days=1)
+    lines = make_daily_csv(symbol, DAILY_HISTORY_BARS, end).splitlines()
+    if outputsize != "full":
+        lines = lines[:101]  # header + newest 100 bars
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def rebase_dates(text: str, anchor: dt.date, today: dt.date) -> str:
+    """Shift every ISO date in `text` by (today - anchor)."""
+    delta = today - anchor
+
+    def _shift(m: "re.Match") -> str:
+        try:
+            return (dt.date.fromisoformat(m.group(1)) + delta).isoformat()
+        except ValueError:
+            return m.group(1)
+
+    return _ISO_DATE.sub(_shift, text)
+
+
+def plate_list_page(raw: str, page: int) -> bytes:
+    """Page `page` of the synthetic plate list (page 1 is the fixture itself)."""
+    if page <= 1:
+        return raw.encode("utf-8")
+    payload = json.loads(raw)
+    data = payload["data"]
+    data["list"] = [{**item, "name": f"{item['name']} {page}"} for item in data["list"]]
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def concept_page_html(plate_id: str) -> bytes:
+    """Concept page of one sector with deterministic constituents."""
+    seed = zlib.crc32(plate_id.encode("utf-8"))
+    rows = []
+    for i in range(CONSTITUENTS_PER_SECTOR):
+        symbol = f"S{(seed + i * 37) % 500}"
+        change = ((seed >> (i % 16)) % 1001 - 500) / 100
+        rows.append(
+            f'<a class="list-item" href="/hans/stock/{symbol}-US">'
+            f'<span class="stock-name">{symbol} Inc</span><span class="price">{20 + i}.50</span>'
+            f'<span class="change value">{change:+.2f}%</span></a>'
+        )
+    html = f'<html><body><div class="content-main">{"".join(rows)}</div></body></html>'
+    return html.encode("utf-8")
+
+
+class LocalStandIn:
+    """Serve offline stand-ins on 127.0.0.1 from a background thread.
+
+    Use as a context manager; `hits` counts requests per route and
+    `latency` adds an artificial per-response delay (seconds).
+    """
+
+    def __init__(
+        self,
+        earnings_rows: int = 7000,
+        latency: float = 0.0,
+        bulk_quotes: bool = True,
+        concepts_page: str = "",
+    ):
+        today = dt.date.today()
+        self.today = today
+        self.latency = latency
+        self.bulk_quotes = bulk_quotes
+        self.hits: Counter = Counter()
+        self.bytes_served: Counter = Counter()
+        self.responses: Dict[str, bytes] = {
+            "EARNINGS_CALENDAR": make_earnings_csv(earnings_rows, today).encode("utf-8"),
+            "IPO_CALENDAR": rebase_dates(_read("ipo_calendar.csv"), FIXTURE_ANCHOR, today).encode("utf-8"),
+            CONCEPTS_PATH: b"",
+            PLATE_LIST_PATH: _read("get_plate_list.json").encode("utf-8"),
+        }
+        self.recorded_concepts = bool(concepts_page)
+        if concepts_page:
+            with open(concepts_page, encoding="utf-8") as fh:
+                self._concepts_page = fh.read()
+        else:
+            # The tracker's port is only known once `start()` binds the server
+            self._concepts_page = _read("concepts.html").replace("</body>", _PLATE_LIST_SCRIPT + _ASSETS_HTML + "</body>")
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def alphavantage_url(self) -> str:
+        return f"{self.base_url}/query"
+
+    @property
+    def concepts_url(self) -> str:
+        return f"{self.base_url}{CONCEPTS_PATH}"
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                body = None
+                if url.path == "/query":
+                    query = parse_qs(url.query)
+                    route = query.get("function", [""])[0]
+                    ctype = "text/csv; charset=utf-8"
+                    if route in QUOTE_FUNCTIONS:
+                        symbols = [s for s in query.get("symbol", [""])[0].split(",") if s]
+                        if route == "GLOBAL_QUOTE" or stand_in.bulk_quotes:
+                            body = quote_csv(route, symbols, stand_in.today)
+                        else:
+                            body, ctype = _PREMIUM_NOTICE, "application/json"
+                    elif route == "TIME_SERIES_DAILY":
+                        symbol = query.get("symbol", [""])[0]
+                        body = daily_csv(symbol, query.get("outputsize", ["compact"])[0], stand_in.today)
+                elif url.path == PLATE_LIST_PATH:
+                    route, ctype = PLATE_LIST_PATH, "application/json; charset=utf-8"
+                    page = parse_qs(url.query).get("page", ["1"])[0]
+                    body = plate_list_page(stand_in.responses[PLATE_LIST_PATH].decode("utf-8"), int(page) if page.isdigit() else 1)
+                elif url.path.startswith(STATIC_PREFIX):
+                    route = STATIC_PREFIX
+                    asset = static_asset(url.path[len(STATIC_PREFIX):])
+                    if asset is not None:
+                        ctype, body = asset
+                elif url.path in (TRACKER_PATH, BEACON_PATH):
+                    route, ctype = url.path, "application/javascript"
+                    body = _TRACKER_JS if url.path == TRACKER_PATH else b""
+                elif url.path.startswith(CONCEPT_PATH_PREFIX):
+                    route, ctype = CONCEPT_PATH_PREFIX, "text/html; charset=utf-8"
+                    body = concept_page_html(url.path[len(CONCEPT_PATH_PREFIX):])
+                else:
+                    route, ctype = url.path, "text/html; charset=utf-8"
+
+                if body is None:
+                    body = stand_in.responses.get(route)
+                stand_in.hits[route or url.path] += 1
+                if stand_in.latency:
+                    threading.Event().wait(stand_in.latency)
+                if body is None:
+                    self.send_error(404)
+                    return
+                stand_in.bytes_served[route or url.path] += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "LocalStandIn":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        port = str(self._server.server_address[1])
+        page = self._concepts_page if self.recorded_concepts else self._concepts_page.replace("{port}", port)
+        self.responses[CONCEPTS_PATH] = page.encode("utf-8")
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "LocalStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,416 @@
+"""Offline end-to-end benchmark suite.
+
+Runs against local stand-ins (see `bench.local_server`) and a fake Discord
+channel, so no network access or Discord token is needed. Emits a JSON
+report; with `--baseline` it also fails (exit code 1) when a tracked
+timing regresses by more than `--tolerance`.
+
+Run from the `discord_finance_bot` directory:
+    python -m bench.run_benchmarks --out bench_report.json
+    python -m bench.run_benchmarks --baseline bench_report.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import datetime as dt
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from bench.fake_discord import FakeChannel, FakeDiscordAPI, FakeMessage
+from bench.local_server import LocalStandIn
+from config import Config
+from controllers.bot_controller import BotController
+from repositories.web_crawler_repo import WebCrawlerRepo
+from services.broadcast_service import BroadcastService
+from services.alphavantage_service import AlphaVantageService
+from services.message_service import MessageService
+from services.price_history_service import PriceHistoryService
+from services.watchlist_service import WatchlistService
+from utils.date_index import DatedRows
+from utils.metrics import SPAN_METRIC, metrics
+
+
+# Timings compared against a baseline report (lower is better)
+TRACKED = [
+    "csv.parse_ms",
+    "csv.filter_us",
+    "render.text_ms",
+    "render.embed_ms",
+    "summary.cold_ms",
+    "summary.warm_ms",
+    "command.today_first_response_ms",
+    "watchlist.bulk.cold_ms",
+    "broadcast.paced.total_ms",
+]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _best(fn: Callable[[], Any], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def make_config(stand_in: LocalStandIn, cache_dir: str, **overrides) -> Config:
+    cfg = Config(
+        discord_token="",
+        channel_id=None,
+        selected_stocks=["AAPL", "MSFT", "GOOGL"],
+        timezone="UTC",
+        alphavantage_api_key="bench",
+        alphavantage_base_url=stand_in.alphavantage_url,
+        sectors_url=stand_in.concepts_url,
+        cache_dir=cache_dir,
+        data_dir=cache_dir,
+        summary_fresh_seconds=0,
+        browser_pool_size=1,
+        # The stand-in has no quota; budget pacing is exercised separately
+        alphavantage_requests_per_minute=0,
+        alphavantage_requests_per_day=0,
+    )
+    for key, value in overrides.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def bench_csv(stand_in: LocalStandIn, rounds: int) -> Dict[str, Any]:
+    text = stand_in.responses["EARNINGS_CALENDAR"].decode("utf-8")
+    indexed = DatedRows.from_csv(text, ("reportDate",))
+    lo = dt.date.fromisoformat(indexed[0]["reportDate"])
+    hi = lo + dt.timedelta(days=2)
+    return {
+        "rows": len(indexed),
+        "parse_ms": _ms(_best(lambda: DatedRows.from_csv(text, ("reportDate",)), rounds)),
+        "filter_us": round(_best(lambda: indexed.between(lo, hi), rounds) * 1e6, 3),
+    }
+
+
+async def bench_scrape(cfg: Config, rounds: int) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for mode in ("api", "dom"):
+        cfg.crawler_mode = mode
+        repo = WebCrawlerRepo(cfg)
+        try:
+            t0 = time.perf_counter()
+            await repo.browser_pool.start()
+            launch = time.perf_counter() - t0
+            samples: List[float] = []
+            rows: List[dict] = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                rows = await repo.fetch_top_sectors_details_async(limit=10)
+                samples.append(time.perf_counter() - t0)
+            out[mode] = {
+                "launch_ms": _ms(launch),
+                "first_ms": _ms(samples[0]),
+                "warm_min_ms": _ms(min(samples[1:] or samples)),
+                "rows": len(rows),
+            }
+            if mode == "api":
+                # Every page of the list; the stand-in's static DOM has no working pagination
+                t0 = time.perf_counter()
+                full = await repo.fetch_all_sectors_async()
+                out[mode]["full_crawl_ms"] = _ms(time.perf_counter() - t0)
+                out[mode]["full_crawl_rows"] = len(full)
+                # Constituents of the top sectors, then again from the cache
+                names = [r["name"] for r in rows[:5]]
+                t0 = time.perf_counter()
+                constituents = await repo.fetch_sector_constituents_async(names)
+                out[mode]["drilldown_ms"] = _ms(time.perf_counter() - t0)
+                out[mode]["drilldown_sectors"] = len(constituents)
+                t0 = time.perf_counter()
+                await repo.fetch_sector_constituents_async(names)
+                out[mode]["drilldown_cached_ms"] = _ms(time.perf_counter() - t0)
+        except Exception as exc:
+            out[mode] = {"skipped": str(exc).splitlines()[0]}
+        finally:
+            await repo.close()
+    return out
+
+
+async def bench_load_profiles(stand_in: LocalStandIn, cfg: Config, rounds: int) -> Dict[str, Any]:
+    """DOM scrape of the stand-in concepts page under each load profile.
+
+    Reports time, requests and bytes served per scrape, and whether the
+    lean profile extracts exactly the rows the full page load does. Only a
+    run with `--concepts-page` (a recorded copy of the live page) says
+    anything about the real site; the replica is synthetic.
+    """
+    out: Dict[str, Any] = {"page": "recorded" if stand_in.recorded_concepts else "synthetic"}
+    rows_by_profile: Dict[str, List[dict]] = {}
+    for profile in ("full", "lean"):
+        repo = WebCrawlerRepo(make_config_like(cfg, crawler_mode="dom", crawler_load_profile=profile))
+        try:
+            await repo.browser_pool.start()
+            samples: List[float] = []
+            hits, served = sum(stand_in.hits.values()), sum(stand_in.bytes_served.values())
+            rows: List[dict] = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                rows = await repo.fetch_top_sectors_details_async(limit=30)
+                samples.append(time.perf_counter() - t0)
+            rows_by_profile[profile] = rows
+            out[profile] = {
+                "first_ms": _ms(samples[0]),
+                "warm_min_ms": _ms(min(samples[1:] or samples)),
+                "requests_per_scrape": round((sum(stand_in.hits.values()) - hits) / rounds, 1),
+                "kb_per_scrape": round((sum(stand_in.bytes_served.values()) - served) / rounds / 1024, 1),
+                "rows": len(rows),
+            }
+        except Exception as exc:
+            out[profile] = {"skipped": str(exc).splitlines()[0]}
+        finally:
+            await repo.close()
+    if len(rows_by_profile) == 2:
+        out["identical"] = bool(rows_by_profile["full"]) and rows_by_profile["full"] == rows_by_profile["lean"]
+    return out
+
+
+def bench_render(payload: Dict[str, Any], rounds: int) -> Dict[str, Any]:
+    return {
+        "text_ms": _ms(_best(lambda: MessageService.render_daily_summary_text(payload), rounds)),
+        "embed_ms": _ms(_best(lambda: MessageService.build_daily_summary_embed(payload), rounds)),
+    }
+
+
+async def bench_summary(cfg: Config, rounds: int) -> Dict[str, Any]:
+    service = MessageService(cfg)
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        payload = await service.generate_daily_summary_json_async(force=True)
+        cold = time.perf_counter() - t0
+        warm = float("inf")
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            payload = await service.generate_daily_summary_json_async(force=True)
+            warm = min(warm, time.perf_counter() - t0)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        await service.close()
+    return {
+        "cold_ms": _ms(cold),
+        "warm_ms": _ms(warm),
+        "python_peak_kb": round(peak / 1024, 1),
+        "sectors": len(payload.get("top_sectors_details") or []),
+        "earnings": len(payload.get("earnings") or []),
+        "ipos": len(payload.get("ipos") or []),
+        "payload": payload,
+    }
+
+
+async def bench_command(cfg: Config) -> Dict[str, Any]:
+    bot = BotController(cfg)
+    channel = FakeChannel()
+    try:
+        t0 = time.perf_counter()
+        await bot.on_message(FakeMessage("!today", channel))
+        total = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        await bot.on_message(FakeMessage("!today", channel))
+        cached = time.perf_counter() - t1
+    finally:
+        await bot.message_service.close()
+    first = channel.events[0][1] - t0 if channel.events else total
+    return {
+        "today_first_response_ms": _ms(first),
+        "today_total_ms": _ms(total),
+        "today_from_snapshot_ms": _ms(cached),
+        "messages": [kind for kind, _, _ in channel.events],
+    }
+
+
+async def bench_broadcast(cfg: Config, channels: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Broadcast one embed to `channels` fake channels, paced vs. unpaced."""
+    embed = MessageService.build_daily_summary_embed(payload)
+    out: Dict[str, Any] = {}
+    # "paced" uses the configured limiter; "unpaced" only reacts to 429s
+    for name, overrides in (("paced", {}), ("unpaced", {"broadcast_global_rate": 1e6, "broadcast_concurrency": 64})):
+        with FakeDiscordAPI(missing={1}) as api:
+            bcfg = make_config_like(cfg, discord_api_url=api.api_url, data_dir="", **overrides)
+            service = BroadcastService(bcfg)
+            try:
+                report = await service.broadcast(embed=embed, channel_ids=range(1, channels + 1))
+            finally:
+                await service.close()
+            out[name] = {
+                "total_ms": _ms(report.duration_seconds),
+                "sent": report.sent,
+                "failed": report.failed,
+                "retries": report.retries,
+                "http_429": api.statuses[429],
+                "distinct_bodies": len(api.bodies),
+            }
+    return out
+
+
+async def bench_watchlist(stand_in: LocalStandIn, cfg: Config, symbols: int) -> Dict[str, Any]:
+    """Refresh a large watchlist via bulk quotes, then with the bulk endpoint unavailable."""
+    tickers = [f"T{i:04d}" for i in range(symbols)]
+    out: Dict[str, Any] = {}
+    for name, bulk in (("bulk", True), ("fallback", False)):
+        stand_in.bulk_quotes = bulk
+        before = dict(stand_in.hits)
+        watch_cfg = make_config_like(cfg, selected_stocks=tickers, quote_bulk_endpoint=True)
+        alpha = AlphaVantageService(watch_cfg)
+        service = WatchlistService(watch_cfg, alpha)
+        try:
+            t0 = time.perf_counter()
+            updated = await service.refresh()
+            cold = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            await service.refresh()
+            warm = time.perf_counter() - t0
+        finally:
+            await alpha.close()
+        out[name] = {
+            "cold_ms": _ms(cold),
+            "warm_ms": _ms(warm),
+            "updated": updated,
+            "requests": sum(stand_in.hits.values()) - sum(before.values()),
+        }
+    stand_in.bulk_quotes = True
+    return out
+
+
+async def bench_history(stand_in: LocalStandIn, cfg: Config) -> Dict[str, Any]:
+    """Backfill daily bars for the watchlist, then run an incremental no-op update."""
+    alpha = AlphaVantageService(cfg)
+    service = PriceHistoryService(cfg, alpha)
+    try:
+        before = stand_in.hits["TIME_SERIES_DAILY"]
+        t0 = time.perf_counter()
+        added = await service.update()
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        again = await service.update()
+        warm = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        universe = service.universe()
+        load = time.perf_counter() - t0
+    finally:
+        await alpha.close()
+    return {
+        "backfill_ms": _ms(cold),
+        "incremental_ms": _ms(warm),
+        "load_ms": _ms(load),
+        "bars": sum(added.values()),
+        "bars_incremental": sum(again.values()),
+        "symbols": len(universe),
+        "requests": stand_in.hits["TIME_SERIES_DAILY"] - before,
+    }
+
+
+def make_config_like(cfg: Config, **overrides) -> Config:
+    clone = Config(**vars(cfg))
+    for key, value in overrides.items():
+        setattr(clone, key, value)
+    return clone
+
+
+def _lookup(report: Dict[str, Any], dotted: str) -> Any:
+    node: Any = report["results"]
+    for part in dotted.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return descriptions of tracked timings that regressed beyond `tolerance`."""
+    regressions = []
+    for key in TRACKED:
+        new, old = _lookup(report, key), _lookup(baseline, key)
+        if isinstance(new, (int, float)) and isinstance(old, (int, float)) and old > 0:
+            if new > old * (1 + tolerance):
+                regressions.append(f"{key}: {old} -> {new}")
+    return regressions
+
+
+async def run(args) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    stand_in = LocalStandIn(earnings_rows=args.earnings_rows, latency=args.latency, concepts_page=args.concepts_page)
+    with stand_in, tempfile.TemporaryDirectory() as cache_dir:
+        results["csv"] = bench_csv(stand_in, args.rounds)
+        if not args.skip_browser:
+            results["scrape"] = await bench_scrape(make_config(stand_in, cache_dir), args.rounds)
+            results["load_profile"] = await bench_load_profiles(stand_in, make_config(stand_in, cache_dir), args.rounds)
+        summary = await bench_summary(make_config(stand_in, cache_dir), args.rounds)
+        summary_payload = summary.pop("payload")
+        results["render"] = bench_render(summary_payload, args.rounds)
+        results["summary"] = summary
+        results["command"] = await bench_command(make_config(stand_in, cache_dir))
+        results["history"] = await bench_history(stand_in, make_config(stand_in, cache_dir))
+        if args.symbols:
+            results["watchlist"] = await bench_watchlist(stand_in, make_config(stand_in, cache_dir), args.symbols)
+        if args.channels:
+            results["broadcast"] = await bench_broadcast(make_config(stand_in, cache_dir), args.channels, summary_payload)
+        results["upstream_hits"] = dict(stand_in.hits)
+        results["spans"] = {
+            "/".join([labels.pop("span")] + [f"{k}={v}" for k, v in sorted(labels.items())]): {
+                "count": hist.count,
+                "total_ms": _ms(hist.total),
+                "max_ms": _ms(hist.max),
+            }
+            for _, labels, hist in metrics.histograms(SPAN_METRIC)
+        }
+
+    return {
+        "version": 1,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark suite")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--earnings-rows", type=int, default=7000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial upstream latency in seconds")
+    parser.add_argument("--symbols", type=int, default=300, help="Watchlist size for the quote benchmark (0 skips)")
+    parser.add_argument("--channels", type=int, default=200, help="Fake channels for the broadcast benchmark (0 skips)")
+    parser.add_argument("--skip-browser", action="store_true", help="Skip Playwright scrape benchmarks")
+    parser.add_argument(
+        "--concepts-page",
+        type=str,
+        default="",
+        help="Recorded HTML of the live concepts page, served instead of the synthetic replica",
+    )
+    parser.add_argument("--out", type=str, default="", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", type=str, default="", help="Compare against a previous report")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            regressions = compare(report, json.load(fh), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
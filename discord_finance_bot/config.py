@@ -1,10 +1,7 @@
 import os
 from dotenv import load_dotenv
-from dataclasses import dataclass
-from typing import List, Optional
-
-# Load environment variables from a .env file if present
-load_dotenv()
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 
 # Configuration container for bot runtime settings
@@ -15,6 +12,62 @@ class Config:
     selected_stocks: List[str]
     timezone: str = "Asia/Shanghai"
     alphavantage_api_key: str = ""
+    alphavantage_base_url: str = "https://www.alphavantage.co/query"
+    sectors_url: str = "https://www.moomoo.com/hans/quote/us/concepts"
+    alphavantage_max_connections: int = 4
+    alphavantage_cache_ttl: int = 6 * 3600
+    alphavantage_cache_stale_ttl: int = 2 * 24 * 3600
+    cache_dir: str = ".cache"
+    summary_fresh_seconds: int = 300
+    summary_error_seconds: int = 30
+    snapshot_refresh_minutes: int = 30
+    snapshot_max_age_seconds: int = 3600
+    command_defer_seconds: float = 0.5
+    metrics_port: int = 0
+    metrics_host: str = "127.0.0.1"
+    browser_pool_size: int = 2
+    browser_max_navigations: int = 50
+    browser_max_memory_mb: int = 512
+    crawler_extract_mode: str = "evaluate"
+    crawler_mode: str = "dom"
+    crawler_full_crawl: bool = False
+    crawler_page_concurrency: int = 4
+    crawler_max_pages: int = 20
+    crawler_drilldown_sectors: int = 0
+    crawler_sector_timeout: float = 15.0
+    crawler_drilldown_budget: float = 30.0
+    crawler_constituents_ttl: int = 600
+    crawler_nav_timeout: float = 20.0
+    crawler_load_profile: str = "full"
+    crawler_blocked_resources: List[str] = field(default_factory=list)
+    crawler_allowed_hosts: List[str] = field(default_factory=list)
+    crawler_viewport: str = "1024x768"
+    channel_ids: List[int] = field(default_factory=list)
+    data_dir: str = "data"
+    discord_api_url: str = "https://discord.com/api/v10"
+    broadcast_concurrency: int = 8
+    broadcast_global_rate: float = 40.0
+    broadcast_max_attempts: int = 4
+    quote_max_age_seconds: int = 300
+    quote_batch_size: int = 100
+    quote_bulk_endpoint: bool = False
+    history_full_backfill: bool = False
+    alphavantage_requests_per_minute: int = 5
+    alphavantage_requests_per_day: int = 25
+    breakout_lookback_days: int = 30
+    breakout_volume_ratio: float = 1.5
+    breakout_max_candidates: int = 10
+    breakout_member_history: int = 10
+    backtest_workers: int = 0
+    backtest_max_combinations: int = 5000
+    backtest_min_trades: int = 10
+    alert_poll_minutes: int = 15
+    alert_cooldown_minutes: int = 60
+    alert_max_per_user: int = 50
+    alert_volume_lookback: int = 30
+    summary_source_budgets: Dict[str, float] = field(default_factory=dict)
+    circuit_failure_threshold: int = 3
+    circuit_reset_seconds: int = 300
 
 
 def load_config() -> Config:
@@ -26,15 +79,150 @@ def load_config() -> Config:
     - SELECTED_STOCKS: Comma-separated stock tickers, e.g., "AAPL,MSFT,GOOGL"
     - TIMEZONE: IANA time zone for scheduler, e.g., "Asia/Shanghai"
     - ALPHAVANTAGE_API_KEY: API key for Alpha Vantage endpoints (optional)
+    - ALPHAVANTAGE_BASE_URL: Alpha Vantage query endpoint (default https://www.alphavantage.co/query)
+    - SECTORS_URL: moomoo concepts page scraped for sectors
+    - ALPHAVANTAGE_MAX_CONNECTIONS: Pooled HTTP connections to Alpha Vantage (default 4)
+    - ALPHAVANTAGE_CACHE_TTL: Seconds a cached calendar stays fresh, within the same day (default 21600)
+    - ALPHAVANTAGE_CACHE_STALE_TTL: Seconds a stale calendar may still be served while refreshing (default 172800)
+    - CACHE_DIR: Directory for on-disk caches; empty disables disk caching (default ".cache")
+    - SUMMARY_FRESH_SECONDS: Seconds a built daily summary is reused by later requests (default 300)
+    - SUMMARY_ERROR_SECONDS: Seconds a failed summary build is re-raised to later requests before retrying (default 30)
+    - SNAPSHOT_REFRESH_MINUTES: Interval of the background summary snapshot refresh (default 30)
+    - SNAPSHOT_MAX_AGE_SECONDS: Oldest snapshot the scheduled push may send without rebuilding (default 3600)
+    - COMMAND_DEFER_SECONDS: Handler time before a command is acknowledged and edited later (default 0.5)
+    - METRICS_PORT: Port of the Prometheus-style /metrics endpoint; 0 disables it (default 0)
+    - METRICS_HOST: Bind address of the metrics endpoint (default 127.0.0.1)
+    - BROWSER_POOL_SIZE: Number of reusable Playwright pages (default 2)
+    - BROWSER_MAX_NAVIGATIONS: Navigations before a page is recycled (default 50)
+    - BROWSER_MAX_MEMORY_MB: JS heap ceiling before a page is recycled (default 512)
+    - CRAWLER_EXTRACT_MODE: Sector row extraction: "evaluate", "html" or "elements" (default "evaluate")
+    - CRAWLER_MODE: "dom" parses the rendered list, "api" captures the get-plate-list JSON (falls back to DOM;
+      its field mapping is not yet checked against a recorded response) (default "dom")
+    - CRAWLER_FULL_CRAWL: "1" crawls every page of the concepts list for the summary and sector history (default "0")
+    - CRAWLER_PAGE_CONCURRENCY: Concepts pages fetched at once during a full crawl (default 4)
+    - CRAWLER_MAX_PAGES: Most concepts pages a full crawl reads (default 20)
+    - CRAWLER_DRILLDOWN_SECTORS: Top sectors whose constituents are scraped into the breakout sector map; 0 disables.
+      The constituent row selectors are not yet checked against a recorded page (default 0)
+    - CRAWLER_SECTOR_TIMEOUT: Seconds one sector's constituent scrape may take (default 15)
+    - CRAWLER_DRILLDOWN_BUDGET: Seconds a whole constituent drill-down may take (default 30)
+    - CRAWLER_CONSTITUENTS_TTL: Seconds a scraped constituent list is reused (default 600)
+    - CRAWLER_NAV_TIMEOUT: Seconds a page navigation may take (default 20)
+    - CRAWLER_LOAD_PROFILE: "full" loads the page like a normal browser; "lean" blocks non-essential
+      requests and waits only until the sector rows settle, and is not yet checked against a recorded
+      live page (default "full")
+    - CRAWLER_BLOCKED_RESOURCES: Comma-separated Playwright resource types the lean profile blocks
+      (default "image,media,font,stylesheet,texttrack,manifest")
+    - CRAWLER_ALLOWED_HOSTS: Comma-separated sites the lean profile loads besides the scraped page's own
+      (default "moomoo.com,futunn.com,futustatic.com")
+    - CRAWLER_VIEWPORT: Browser viewport of the lean profile as WIDTHxHEIGHT (default "1024x768")
+    - DISCORD_CHANNEL_IDS: Extra comma-separated channel IDs the daily summary is broadcast to
+    - DATA_DIR: Directory for persistent bot state such as channel subscriptions (default "data")
+    - DISCORD_API_URL: Discord REST base URL used for broadcasts (default https://discord.com/api/v10)
+    - BROADCAST_CONCURRENCY: Concurrent broadcast sends (default 8)
+    - BROADCAST_GLOBAL_RATE: Broadcast requests per second across all channels (default 40)
+    - BROADCAST_MAX_ATTEMPTS: Attempts per channel on 429/5xx/transport errors (default 4)
+    - QUOTE_MAX_AGE_SECONDS: Age after which a watchlist quote is re-requested (default 300)
+    - QUOTE_BATCH_SIZE: Symbols per REALTIME_BULK_QUOTES request, at most 100 (default 100)
+    - HISTORY_FULL_BACKFILL: "1" downloads the full daily series for symbols without history (premium
+      keys); otherwise new symbols start from the latest 100 bars (default "0")
+    - QUOTE_BULK_ENDPOINT: "1" uses REALTIME_BULK_QUOTES (premium keys); otherwise quotes come from
+      per-symbol GLOBAL_QUOTE calls (default "0")
+    - ALPHAVANTAGE_REQUESTS_PER_MINUTE: Request budget per minute; 0 = unlimited (default 5)
+    - ALPHAVANTAGE_REQUESTS_PER_DAY: Request budget per day (rolling); 0 = unlimited (default 25)
+    - BREAKOUT_LOOKBACK_DAYS: Completed sessions whose high a breakout must clear (default 30)
+    - BREAKOUT_VOLUME_RATIO: Minimum volume vs. the lookback average for a breakout (default 1.5)
+    - BREAKOUT_MAX_CANDIDATES: Breakout candidates listed in the daily summary (default 10)
+    - BREAKOUT_MEMBER_HISTORY: Scraped sector members added to each price history run, so they can be
+      scanned for breakouts; 0 scans only the watchlist and alert symbols (default 10)
+    - BACKTEST_WORKERS: Processes used by !backtest; 0 = one per CPU (default 0)
+    - BACKTEST_MAX_COMBINATIONS: Largest parameter grid !backtest accepts (default 5000)
+    - BACKTEST_MIN_TRADES: Results with fewer trades are ranked last (default 10)
+    - ALERT_POLL_MINUTES: Shortest interval of the alert quote poll, which only runs during the US session and
+      is stretched so polls use at most half of ALPHAVANTAGE_REQUESTS_PER_DAY; 0 disables polling (default 15)
+    - ALERT_COOLDOWN_MINUTES: Minimum time between two triggers of one alert (default 60)
+    - ALERT_MAX_PER_USER: Alerts one user may register (default 50)
+    - ALERT_VOLUME_LOOKBACK: Sessions averaged for volume alerts (default 30)
+    - SUMMARY_SOURCE_BUDGETS: Per-source summary deadlines in seconds, e.g. "sectors=45,earnings=20"
+      (sources: sectors, earnings, ipos, watchlist; defaults 45/20/20/20)
+    - CIRCUIT_FAILURE_THRESHOLD: Consecutive failures before a summary source is skipped (default 3)
+    - CIRCUIT_RESET_SECONDS: Seconds a skipped source waits before one trial call (default 300)
+
+    Variables from a `.env` file (if present) are loaded first; values
+    already set in the environment win.
     """
+    load_dotenv()
     token = os.getenv("DISCORD_TOKEN", "")
     channel_id_env = os.getenv("DISCORD_CHANNEL_ID")
     stocks_env = os.getenv("SELECTED_STOCKS", "AAPL,MSFT,GOOGL")
     tz_env = os.getenv("TIMEZONE", "Asia/Shanghai")
     av_key = os.getenv("ALPHAVANTAGE_API_KEY", "")
+    av_base_url = os.getenv("ALPHAVANTAGE_BASE_URL", "https://www.alphavantage.co/query")
+    sectors_url = os.getenv("SECTORS_URL", "https://www.moomoo.com/hans/quote/us/concepts")
+    av_max_connections = int(os.getenv("ALPHAVANTAGE_MAX_CONNECTIONS", "4"))
+    av_cache_ttl = int(os.getenv("ALPHAVANTAGE_CACHE_TTL", str(6 * 3600)))
+    av_cache_stale_ttl = int(os.getenv("ALPHAVANTAGE_CACHE_STALE_TTL", str(2 * 24 * 3600)))
+    cache_dir = os.getenv("CACHE_DIR", ".cache")
+    summary_fresh_seconds = int(os.getenv("SUMMARY_FRESH_SECONDS", "300"))
+    summary_error_seconds = int(os.getenv("SUMMARY_ERROR_SECONDS", "30"))
+    snapshot_refresh_minutes = int(os.getenv("SNAPSHOT_REFRESH_MINUTES", "30"))
+    snapshot_max_age_seconds = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "3600"))
+    command_defer_seconds = float(os.getenv("COMMAND_DEFER_SECONDS", "0.5"))
+    metrics_port = int(os.getenv("METRICS_PORT", "0"))
+    metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+    pool_size = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    max_navigations = int(os.getenv("BROWSER_MAX_NAVIGATIONS", "50"))
+    max_memory_mb = int(os.getenv("BROWSER_MAX_MEMORY_MB", "512"))
+    extract_mode = os.getenv("CRAWLER_EXTRACT_MODE", "evaluate").strip().lower()
+    crawler_mode = os.getenv("CRAWLER_MODE", "dom").strip().lower()
+    crawler_full_crawl = os.getenv("CRAWLER_FULL_CRAWL", "0").strip().lower() in ("1", "true", "yes")
+    crawler_page_concurrency = int(os.getenv("CRAWLER_PAGE_CONCURRENCY", "4"))
+    crawler_max_pages = int(os.getenv("CRAWLER_MAX_PAGES", "20"))
+    crawler_drilldown_sectors = int(os.getenv("CRAWLER_DRILLDOWN_SECTORS", "0"))
+    crawler_sector_timeout = float(os.getenv("CRAWLER_SECTOR_TIMEOUT", "15"))
+    crawler_drilldown_budget = float(os.getenv("CRAWLER_DRILLDOWN_BUDGET", "30"))
+    crawler_constituents_ttl = int(os.getenv("CRAWLER_CONSTITUENTS_TTL", "600"))
+    crawler_nav_timeout = float(os.getenv("CRAWLER_NAV_TIMEOUT", "20"))
+    crawler_load_profile = os.getenv("CRAWLER_LOAD_PROFILE", "full").strip().lower()
+    blocked_resources_env = os.getenv("CRAWLER_BLOCKED_RESOURCES", "")
+    allowed_hosts_env = os.getenv("CRAWLER_ALLOWED_HOSTS", "")
+    crawler_viewport = os.getenv("CRAWLER_VIEWPORT", "1024x768").strip().lower()
+    channel_ids_env = os.getenv("DISCORD_CHANNEL_IDS", "")
+    data_dir = os.getenv("DATA_DIR", "data")
+    discord_api_url = os.getenv("DISCORD_API_URL", "https://discord.com/api/v10")
+    broadcast_concurrency = int(os.getenv("BROADCAST_CONCURRENCY", "8"))
+    broadcast_global_rate = float(os.getenv("BROADCAST_GLOBAL_RATE", "40"))
+    broadcast_max_attempts = int(os.getenv("BROADCAST_MAX_ATTEMPTS", "4"))
+    quote_max_age_seconds = int(os.getenv("QUOTE_MAX_AGE_SECONDS", "300"))
+    quote_batch_size = int(os.getenv("QUOTE_BATCH_SIZE", "100"))
+    quote_bulk_endpoint = os.getenv("QUOTE_BULK_ENDPOINT", "0").strip().lower() in ("1", "true", "yes")
+    history_full_backfill = os.getenv("HISTORY_FULL_BACKFILL", "0").strip().lower() in ("1", "true", "yes")
+    av_per_minute = int(os.getenv("ALPHAVANTAGE_REQUESTS_PER_MINUTE", "5"))
+    av_per_day = int(os.getenv("ALPHAVANTAGE_REQUESTS_PER_DAY", "25"))
+    breakout_lookback_days = int(os.getenv("BREAKOUT_LOOKBACK_DAYS", "30"))
+    breakout_volume_ratio = float(os.getenv("BREAKOUT_VOLUME_RATIO", "1.5"))
+    breakout_max_candidates = int(os.getenv("BREAKOUT_MAX_CANDIDATES", "10"))
+    breakout_member_history = int(os.getenv("BREAKOUT_MEMBER_HISTORY", "10"))
+    backtest_workers = int(os.getenv("BACKTEST_WORKERS", "0"))
+    backtest_max_combinations = int(os.getenv("BACKTEST_MAX_COMBINATIONS", "5000"))
+    backtest_min_trades = int(os.getenv("BACKTEST_MIN_TRADES", "10"))
+    alert_poll_minutes = int(os.getenv("ALERT_POLL_MINUTES", "15"))
+    alert_cooldown_minutes = int(os.getenv("ALERT_COOLDOWN_MINUTES", "60"))
+    alert_max_per_user = int(os.getenv("ALERT_MAX_PER_USER", "50"))
+    alert_volume_lookback = int(os.getenv("ALERT_VOLUME_LOOKBACK", "30"))
+    budgets_env = os.getenv("SUMMARY_SOURCE_BUDGETS", "")
+    circuit_failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+    circuit_reset_seconds = int(os.getenv("CIRCUIT_RESET_SECONDS", "300"))
 
     channel_id = int(channel_id_env) if channel_id_env else None
     selected_stocks = [s.strip() for s in stocks_env.split(",") if s.strip()]
+    channel_ids = [int(c) for c in channel_ids_env.split(",") if c.strip()]
+    crawler_blocked_resources = [r.strip().lower() for r in blocked_resources_env.split(",") if r.strip()]
+    crawler_allowed_hosts = [h.strip().lower() for h in allowed_hosts_env.split(",") if h.strip()]
+    summary_source_budgets = {
+        name.strip().lower(): float(seconds)
+        for name, _, seconds in (item.partition("=") for item in budgets_env.split(","))
+        if name.strip() and seconds.strip()
+    }
 
     return Config(
         discord_token=token,
@@ -42,4 +230,60 @@ def load_config() -> Config:
         selected_stocks=selected_stocks,
         timezone=tz_env,
         alphavantage_api_key=av_key,
+        alphavantage_base_url=av_base_url,
+        sectors_url=sectors_url,
+        alphavantage_max_connections=av_max_connections,
+        alphavantage_cache_ttl=av_cache_ttl,
+        alphavantage_cache_stale_ttl=av_cache_stale_ttl,
+        cache_dir=cache_dir,
+        summary_fresh_seconds=summary_fresh_seconds,
+        summary_error_seconds=summary_error_seconds,
+        snapshot_refresh_minutes=snapshot_refresh_minutes,
+        snapshot_max_age_seconds=snapshot_max_age_seconds,
+        command_defer_seconds=command_defer_seconds,
+        metrics_port=metrics_port,
+        metrics_host=metrics_host,
+        browser_pool_size=pool_size,
+        browser_max_navigations=max_navigations,
+        browser_max_memory_mb=max_memory_mb,
+        crawler_extract_mode=extract_mode,
+        crawler_mode=crawler_mode,
+        crawler_full_crawl=crawler_full_crawl,
+        crawler_page_concurrency=crawler_page_concurrency,
+        crawler_max_pages=crawler_max_pages,
+        crawler_drilldown_sectors=crawler_drilldown_sectors,
+        crawler_sector_timeout=crawler_sector_timeout,
+        crawler_drilldown_budget=crawler_drilldown_budget,
+        crawler_constituents_ttl=crawler_constituents_ttl,
+        crawler_nav_timeout=crawler_nav_timeout,
+        crawler_load_profile=crawler_load_profile,
+        crawler_blocked_resources=crawler_blocked_resources,
+        crawler_allowed_hosts=crawler_allowed_hosts,
+        crawler_viewport=crawler_viewport,
+        channel_ids=channel_ids,
+        data_dir=data_dir,
+        discord_api_url=discord_api_url,
+        broadcast_concurrency=broadcast_concurrency,
+        broadcast_global_rate=broadcast_global_rate,
+        broadcast_max_attempts=broadcast_max_attempts,
+        quote_max_age_seconds=quote_max_age_seconds,
+        quote_batch_size=quote_batch_size,
+        quote_bulk_endpoint=quote_bulk_endpoint,
+        history_full_backfill=history_full_backfill,
+        alphavantage_requests_per_minute=av_per_minute,
+        alphavantage_requests_per_day=av_per_day,
+        breakout_lookback_days=breakout_lookback_days,
+        breakout_volume_ratio=breakout_volume_ratio,
+        breakout_max_candidates=breakout_max_candidates,
+        breakout_member_history=breakout_member_history,
+        backtest_workers=backtest_workers,
+        backtest_max_combinations=backtest_max_combinations,
+        backtest_min_trades=backtest_min_trades,
+        alert_poll_minutes=alert_poll_minutes,
+        alert_cooldown_minutes=alert_cooldown_minutes,
+        alert_max_per_user=alert_max_per_user,
+        alert_volume_lookback=alert_volume_lookback,
+        summary_source_budgets=summary_source_budgets,
+        circuit_failure_threshold=circuit_failure_threshold,
+        circuit_reset_seconds=circuit_reset_seconds,
     )
\ No newline at end of file
@@ -1,17 +1,38 @@
+import asyncio
 import json
 import discord
+from controllers.command_router import CommandRouter, Reply
+from services.alert_service import AlertService
+from services.backtest_service import BacktestService
+from services.broadcast_service import BroadcastService
 from services.message_service import MessageService
+from utils.data_parser import format_age, to_markdown_table
 from utils.logger import get_logger
-from typing import Optional
+from utils.metrics import metrics, span, start_metrics_server
+from typing import List, Optional
+
+
+WATCHLIST_MAX_ROWS = 30
+# Characters of the text summary `!today` sends (Discord caps messages at 2000)
+TODAY_MAX_CHARS = 1900
+BACKTEST_TOP_ROWS = 10
+SECTOR_HISTORY_ROWS = 10
+ALERT_USAGE = (
+    "Usage: `!alert add <SYMBOL> above|below <price>`, `!alert add <SYMBOL> volume <multiple>`, "
+    "`!alert add <SYMBOL> ma_above|ma_below <days>`, `!alert list`, `!alert remove <id>`"
+)
+BACKTEST_USAGE = "Usage: `!backtest [lookback=20,30,55] [ratio=1.5:3:0.5] [hold=5,10] [symbols=AAPL,MSFT]`"
 
 
 class BotController(discord.Client):
     """Discord bot controller handling events and commands.
 
     Responsibilities:
-    - Initialize MessageService
-    - Handle lifecycle events: on_ready
-    - Handle commands: !today (text), !today_json (JSON)
+    - Initialize MessageService, BroadcastService, AlertService and BacktestService
+    - Handle lifecycle events: setup_hook, on_ready, close
+    - Handle commands via CommandRouter: !today (text), !today_json (JSON),
+      !watchlist, !sector, !alert, !backtest, !stats, !subscribe, !unsubscribe, !help; summaries serve the pre-built
+      snapshot, append "refresh" to force a rebuild
     - Cooperate with SchedulerController for scheduled pushes
     """
 
@@ -21,16 +42,59 @@ class BotController(discord.Client):
         super().__init__(intents=intents)
 
         self.config = config
-        self.message_service = MessageService(config)
+        # Each component's construction is timed for `main.py --profile-startup`
+        with span("startup.init", component="message_service"):
+            self.message_service = MessageService(config)
+        with span("startup.init", component="broadcast_service"):
+            self.broadcast_service = BroadcastService(config)
+        with span("startup.init", component="alert_service"):
+            self.alert_service = AlertService(
+                config, self.message_service.watchlist_service, self.message_service.price_history_service
+            )
+        with span("startup.init", component="backtest_service"):
+            self.backtest_service = BacktestService(config, self.message_service.price_history_service)
         self.logger = get_logger(__name__)
         self._scheduler: Optional[object] = None
+        self._startup_profiler: Optional[object] = None
+        self._warmup: Optional[asyncio.Task] = None
+        self._metrics_server = None
+        self.router = CommandRouter(defer_after=getattr(config, "command_defer_seconds", 0.5))
+        self._register_commands()
 
     def attach_scheduler(self, scheduler) -> None:
         """Attach a scheduler instance to be started when bot is ready."""
         self._scheduler = scheduler
 
+    def attach_startup_profiler(self, profiler) -> None:
+        """Report `profiler` and shut down once the bot is ready (`--profile-startup`)."""
+        self._startup_profiler = profiler
+
+    async def setup_hook(self) -> None:
+        # Warm up data sources (browser launch) alongside the gateway connect, not before it
+        self._warmup = asyncio.create_task(self.message_service.start())
+        port = getattr(self.config, "metrics_port", 0)
+        if port:
+            self._metrics_server = await start_metrics_server(port, host=getattr(self.config, "metrics_host", "127.0.0.1"))
+            self.logger.info(f"Metrics endpoint listening on port {port} (/metrics)")
+
+    async def close(self) -> None:
+        if self._warmup is not None and not self._warmup.done():
+            self._warmup.cancel()
+            await asyncio.gather(self._warmup, return_exceptions=True)
+        if self._metrics_server is not None:
+            self._metrics_server.close()
+            self._metrics_server = None
+        await self.alert_service.flush()
+        await self.message_service.close()
+        await self.broadcast_service.close()
+        await super().close()
+
     async def on_ready(self):
         self.logger.info(f"Logged in as {self.user}")
+        if self._startup_profiler is not None:
+            self._startup_profiler.ready()
+            await self.close()
+            return
         if self._scheduler:
             self._scheduler.start()
 
@@ -38,14 +102,205 @@ class BotController(discord.Client):
         # Ignore messages from bot itself
         if message.author == self.user:
             return
+        await self.router.dispatch(message)
+
+    def _register_commands(self) -> None:
+        self.router.register("today", self._cmd_today, help="Daily summary as text (`refresh` to rebuild)")
+        self.router.register("today_json", self._cmd_today_json, help="Daily summary as JSON (`refresh` to rebuild)")
+        self.router.register("watchlist", self._cmd_watchlist, help="Latest quotes for the configured watchlist")
+        self.router.register("sector", self._cmd_sector, help="Sector trend from recorded scrapes (no name: momentum ranking)")
+        self.router.register("alert", self._cmd_alert, help="Manage your price, volume and moving-average alerts")
+        self.router.register(
+            "backtest", self._cmd_backtest, help="Backtest the breakout signal over a parameter grid", max_concurrency=1
+        )
+        self.router.register("stats", self._cmd_stats, help="Per-command latency statistics")
+        self.router.register("subscribe", self._cmd_subscribe, help="Receive the daily summary in this channel")
+        self.router.register("unsubscribe", self._cmd_unsubscribe, help="Stop the daily summary in this channel")
+        self.router.register("help", self._cmd_help, help="List available commands")
+
+    @staticmethod
+    def _snapshot_note(snapshot) -> str:
+        return f"_Snapshot v{snapshot.version}, updated {format_age(snapshot.age_seconds())} ago_"
+
+    async def _cmd_today(self, message: discord.Message, args: List[str]) -> Reply:
+        # "!today refresh" forces a rebuild instead of serving the snapshot
+        snapshot = await self.message_service.get_snapshot(force=args[:1] == ["refresh"])
+        note = self._snapshot_note(snapshot)
+        text = snapshot.text
+        # Stay under Discord's 2000-character message limit, cutting at a line break
+        limit = TODAY_MAX_CHARS - len(note) - 4
+        if len(text) > limit:
+            text = text[:limit].rsplit("\n", 1)[0] + "\n…"
+        return Reply(content=f"{text}\n\n{note}")
+
+    async def _cmd_today_json(self, message: discord.Message, args: List[str]) -> Reply:
+        snapshot = await self.message_service.get_snapshot(force=args[:1] == ["refresh"])
+        return Reply(
+            content=f"{self._snapshot_note(snapshot)}\n"
+            f"```json\n{json.dumps(snapshot.payload, ensure_ascii=False, indent=2)}\n```"
+        )
+
+    async def _cmd_watchlist(self, message: discord.Message, args: List[str]) -> Reply:
+        # "!watchlist AAPL MSFT" narrows the table to the given symbols
+        rows = await self.message_service.get_watchlist_async()
+        wanted = {a.upper() for a in args}
+        if wanted:
+            rows = [r for r in rows if r["symbol"] in wanted]
+        # Keep the table within Discord's 2000-character message limit
+        shown = rows[:WATCHLIST_MAX_ROWS]
+        more = f"\n…and {len(rows) - len(shown)} more" if len(rows) > len(shown) else ""
+        return Reply(content=f"👀 Watchlist\n{self.message_service.render_watchlist_text(shown)}{more}")
+
+    @staticmethod
+    def _fmt_pct(value: Optional[float]) -> str:
+        return f"{value:+.2f}%" if value is not None else ""
+
+    async def _cmd_sector(self, message: discord.Message, args: List[str]) -> Reply:
+        # "!sector 半导体" for one sector, "!sector" for the momentum ranking
+        history = self.message_service.sector_history_service
+        if not args:
+            rows = [
+                {
+                    "name": r["name"],
+                    "momentum_5d": self._fmt_pct(r["momentum_pct"]),
+                    "days": r["days"],
+                    "best_rank": r["best_rank"],
+                }
+                for r in history.momentum(sessions=5)
+            ]
+            moves = [
+                {
+                    "name": r["name"],
+                    "rank": r["rank"],
+                    "previous": r["previous_rank"] or "new",
+                    "change_pct": self._fmt_pct(r["change_pct"]),
+                }
+                for r in history.rank_changes()
+            ]
+            if not rows:
+                return Reply(content="No sector history recorded yet.")
+            return Reply(
+                content=f"🏭 Sector momentum (5 sessions)\n{to_markdown_table(rows, ['name', 'momentum_5d', 'days', 'best_rank'])}\n\n"
+                f"🔀 Latest ranking vs. previous session\n{to_markdown_table(moves, ['name', 'rank', 'previous', 'change_pct'])}"
+            )
+
+        name = history.find(" ".join(args))
+        if name is None:
+            return Reply(content=f"No recorded sector matches {' '.join(args)!r}.")
+        report = history.sector_report(name)
+        rank = f"rank #{report['rank']}" if report["rank"] else "not ranked"
+        was = f" (was #{report['previous_rank']})" if report["previous_rank"] else ""
+        leader = report["leader"]
+        rows = [
+            {
+                "session": r["session"],
+                "rank": r["rank"] or "-",
+                "change_pct": self._fmt_pct(r["change_pct"]),
+                "leader_stock": r["leader_stock"] or "",
+                "leader_change_pct": self._fmt_pct(r["leader_change_pct"]),
+            }
+            for r in report["history"][-SECTOR_HISTORY_ROWS:]
+        ]
+        lines = [
+            f"🏭 {name} — {rank}{was}, {self._fmt_pct(report['change_pct']) or 'n/a'} latest",
+            f"Momentum: {self._fmt_pct(report['momentum_5d_pct'])} over 5 sessions, "
+            f"{self._fmt_pct(report['momentum_20d_pct'])} over 20; ranked {report['days_ranked']} of {report['sessions']} sessions",
+        ]
+        if leader["days"]:
+            lines.append(f"Leader: {leader['leader_stock']} for {leader['days']} session(s)")
+        table = to_markdown_table(rows, ["session", "rank", "change_pct", "leader_stock", "leader_change_pct"])
+        return Reply(content="\n".join(lines) + f"\n{table}")
+
+    async def _cmd_alert(self, message: discord.Message, args: List[str]) -> Reply:
+        user_id = getattr(message.author, "id", 0)
+        action = args[0].lower() if args else ""
+        if action == "list":
+            rules = self.alert_service.rules_for(user_id)
+            if not rules:
+                return Reply(content="You have no alerts.")
+            return Reply(content="🔔 Your alerts\n" + "\n".join(f"#{r.id} {r.describe()}" for r in rules))
+        if action == "remove" and len(args) == 2 and args[1].lstrip("#").isdigit():
+            rule = self.alert_service.remove_rule(int(args[1].lstrip("#")), user_id=user_id)
+            return Reply(content=f"✅ Removed alert #{rule.id}." if rule else "No such alert of yours.")
+        if action == "add" and len(args) == 4:
+            try:
+                rule = self.alert_service.add_rule(
+                    args[1], args[2], float(args[3]), user_id=user_id, channel_id=message.channel.id
+                )
+            except ValueError as exc:
+                return Reply(content=f"⚠️ {exc}\n{ALERT_USAGE}")
+            return Reply(content=f"✅ Alert #{rule.id}: {rule.describe()}")
+        return Reply(content=ALERT_USAGE)
+
+    async def _cmd_backtest(self, message: discord.Message, args: List[str]) -> Reply:
+        # "!backtest lookback=10:60:5 ratio=1.5,2 hold=5,10 symbols=AAPL,MSFT"
+        symbols = None
+        grid_args = []
+        for arg in args:
+            key, _, value = arg.partition("=")
+            if key.lower() == "symbols":
+                symbols = [s for s in value.split(",") if s.strip()]
+            else:
+                grid_args.append(arg)
+        try:
+            grid = self.backtest_service.parse_grid(grid_args)
+            report = await self.backtest_service.run(grid, symbols)
+        except ValueError as exc:
+            return Reply(content=f"⚠️ {exc}\n{BACKTEST_USAGE}")
+        if not report.symbols:
+            return Reply(content="No stored price history to backtest yet.")
+        rows = [self.backtest_service.format_result(r) for r in report.results[:BACKTEST_TOP_ROWS]]
+        headers = ["lookback", "ratio", "hold", "trades", "win", "avg", "pf", "sharpe"]
+        return Reply(
+            content=f"🧪 Breakout backtest: {report.symbols} symbols, {report.start} → {report.end}, "
+            f"{report.combinations} combinations in {report.elapsed_seconds:.1f}s\n"
+            f"{to_markdown_table(rows, headers)}"
+        )
+
+    async def _cmd_stats(self, message: discord.Message, args: List[str]) -> Reply:
+        rows = []
+        for _, labels, hist in metrics.histograms("command_latency_seconds"):
+            summary = hist.summary()
+            rows.append(
+                {
+                    "command": labels.get("command", ""),
+                    "status": labels.get("status", ""),
+                    "count": summary["count"],
+                    "p50_ms": round(summary["p50"] * 1000),
+                    "p95_ms": round(summary["p95"] * 1000),
+                    "p99_ms": round(summary["p99"] * 1000),
+                    "max_ms": round(summary["max"] * 1000),
+                }
+            )
+        headers = ["command", "status", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+        budget = self.message_service.alpha_service.budget_status()
+        left = ", ".join(
+            f"{budget[w]:.0f}/{w}" if budget[w] is not None else f"unlimited/{w}" for w in ("minute", "day")
+        )
+        return Reply(
+            content=f"⏱️ Command latency\n{to_markdown_table(rows, headers)}\n\n"
+            f"📉 AlphaVantage budget left: {left} ({budget['queued']} queued)"
+        )
+
+    @staticmethod
+    def _can_manage(message: discord.Message) -> bool:
+        permissions = getattr(message.author, "guild_permissions", None)
+        return bool(permissions and permissions.manage_channels)
+
+    async def _cmd_subscribe(self, message: discord.Message, args: List[str]) -> Reply:
+        if not self._can_manage(message):
+            return Reply(content="⛔ You need the Manage Channels permission to subscribe a channel.")
+        if not self.broadcast_service.registry.add(message.channel.id):
+            return Reply(content="This channel already receives the daily summary.")
+        return Reply(content="✅ This channel will receive the daily summary.")
 
-        content = message.content.strip()
-        if content.startswith("!today"):
-            text = await self.message_service.generate_daily_summary_text_async()
-            await message.channel.send(text)
+    async def _cmd_unsubscribe(self, message: discord.Message, args: List[str]) -> Reply:
+        if not self._can_manage(message):
+            return Reply(content="⛔ You need the Manage Channels permission to unsubscribe a channel.")
+        if not self.broadcast_service.registry.remove(message.channel.id):
+            return Reply(content="This channel is not subscribed (configured channels can only be changed in the config).")
+        return Reply(content="✅ This channel will no longer receive the daily summary.")
 
-        elif content.startswith("!today_json"):
-            payload = await self.message_service.generate_daily_summary_json_async()
-            await message.channel.send(
-                f"```json\n{json.dumps(payload, ensure_ascii=False, indent=2)}\n```"
-            )
\ No newline at end of file
+    async def _cmd_help(self, message: discord.Message, args: List[str]) -> Reply:
+        lines = [f"`{self.router.prefix}{c.name}` – {c.help}" for c in self.router.commands]
+        return Reply(content="\n".join(lines))
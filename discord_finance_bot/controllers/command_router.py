@@ -0,0 +1,121 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+import discord
+from utils.logger import get_logger
+from utils.metrics import metrics, span
+
+
+@dataclass
+class Reply:
+    """Response produced by a command handler; the router does the sending."""
+
+    content: Optional[str] = None
+    embed: Optional[discord.Embed] = None
+
+
+Handler = Callable[[discord.Message, List[str]], Awaitable[Optional[Reply]]]
+
+
+@dataclass
+class Command:
+    name: str
+    handler: Handler
+    help: str = ""
+    max_concurrency: int = 4
+    semaphore: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+
+class CommandRouter:
+    """Dispatch `!commands` through a lookup table.
+
+    - The first token is matched exactly (so `!today_json` never hits `!today`).
+    - A handler slower than `defer_after` seconds gets an immediate "working"
+      acknowledgement that is edited in place once the reply is ready.
+    - Each command has its own concurrency limit; excess calls are turned away.
+    - Latency is recorded per command in the `command_latency_seconds` histogram.
+    """
+
+    def __init__(self, prefix: str = "!", defer_after: float = 0.5):
+        self.prefix = prefix
+        self.defer_after = defer_after
+        self.logger = get_logger(__name__)
+        self._commands: Dict[str, Command] = {}
+
+    def register(self, name: str, handler: Handler, help: str = "", max_concurrency: int = 4) -> None:
+        self._commands[name.lower()] = Command(name=name.lower(), handler=handler, help=help, max_concurrency=max_concurrency)
+
+    @property
+    def commands(self) -> List[Command]:
+        return list(self._commands.values())
+
+    async def dispatch(self, message: discord.Message) -> bool:
+        """Route a message to its command; return False if it is not a known command."""
+        tokens = message.content.strip().split()
+        if not tokens or not tokens[0].startswith(self.prefix):
+            return False
+        command = self._commands.get(tokens[0][len(self.prefix):].lower())
+        if command is None:
+            return False
+
+        metrics.counter("command_invocations_total", command=command.name).inc()
+        if command.semaphore.locked():
+            metrics.counter("command_rejected_total", command=command.name).inc()
+            await message.channel.send(f"⏳ `{self.prefix}{command.name}` is busy, please retry shortly.")
+            return True
+
+        started = time.perf_counter()
+        status = "ok"
+        async with command.semaphore:
+            try:
+                await self._run(command, message, tokens[1:])
+            except Exception:
+                # `_run` has already logged and reported the failure
+                status = "error"
+            finally:
+                metrics.histogram(
+                    "command_latency_seconds", command=command.name, status=status
+                ).observe(time.perf_counter() - started)
+        return True
+
+    async def _run(self, command: Command, message: discord.Message, args: List[str]) -> None:
+        task = asyncio.ensure_future(command.handler(message, args))
+        ack: Optional[discord.Message] = None
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.defer_after)
+            if done:
+                reply = task.result()
+                if reply is not None:
+                    with span("discord.send", target="command"):
+                        await message.channel.send(content=reply.content, embed=reply.embed)
+                return
+
+            # Slow path: acknowledge now, edit the acknowledgement when data arrives
+            with span("discord.send", target="ack"):
+                ack = await message.channel.send("⏳ Fetching data…")
+            async with message.channel.typing():
+                reply = await task
+            with span("discord.send", target="edit"):
+                if reply is None:
+                    await ack.delete()
+                else:
+                    await ack.edit(content=reply.content, embed=reply.embed)
+        except Exception as exc:
+            self.logger.exception(f"Command {command.name} failed: {exc}")
+            await self._report_failure(command, message, ack)
+            raise
+
+    async def _report_failure(self, command: Command, message: discord.Message, ack: Optional[discord.Message]) -> None:
+        """Turn the acknowledgement (if one was sent) into the error message."""
+        text = f"⚠️ `{self.prefix}{command.name}` failed, please try again later."
+        try:
+            if ack is not None:
+                await ack.edit(content=text, embed=None)
+            else:
+                await message.channel.send(text)
+        except Exception as exc:
+            self.logger.warning(f"Could not report the failure of {command.name}: {exc}")
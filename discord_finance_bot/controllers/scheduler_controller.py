@@ -1,7 +1,7 @@
 import asyncio
 import discord
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from utils.logger import get_logger
+from utils.request_scheduler import PRIORITY_SCHEDULED, request_context
 from utils.scheduler_utils import get_timezone
 
 
@@ -12,12 +12,36 @@ class SchedulerController:
         self.bot = bot
         self.config = config
         self.logger = get_logger(__name__)
-        self.scheduler = AsyncIOScheduler(event_loop=asyncio.get_event_loop(), timezone=get_timezone(config.timezone))
+        self.scheduler = None
 
     def start(self) -> None:
-        """Start scheduler with default jobs."""
+        """Start scheduler with default jobs (APScheduler is imported here, once the bot is ready).
+
+        `on_ready` fires again after a gateway reconnect; later calls are
+        no-ops so jobs are not duplicated and the summary is not re-pushed.
+        """
+        if self.scheduler is not None:
+            return
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
         self.logger.info("Starting scheduler...")
+        self.scheduler = AsyncIOScheduler(event_loop=asyncio.get_running_loop(), timezone=get_timezone(self.config.timezone))
+        # Pre-warm the summary snapshot shortly before the push, then keep it fresh
+        self.scheduler.add_job(lambda: asyncio.create_task(self.refresh_snapshot(force=True)), "cron", hour=8, minute=55)
+        self.scheduler.add_job(
+            lambda: asyncio.create_task(self.refresh_snapshot()),
+            "interval",
+            minutes=getattr(self.config, "snapshot_refresh_minutes", 30),
+        )
         self.scheduler.add_job(lambda: asyncio.create_task(self.daily_update()), "cron", hour=9, minute=0)
+        # Append yesterday's daily bars once the US session has closed
+        self.scheduler.add_job(lambda: asyncio.create_task(self.update_price_history()), "cron", hour=8, minute=30)
+        if getattr(self.config, "crawler_drilldown_sectors", 0) > 0:
+            # Map the top sectors' constituents before the snapshot ranks breakouts
+            self.scheduler.add_job(lambda: asyncio.create_task(self.update_sector_members()), "cron", hour=8, minute=45)
+        poll_minutes = getattr(self.config, "alert_poll_minutes", 15)
+        if poll_minutes > 0:
+            self.scheduler.add_job(lambda: asyncio.create_task(self.check_alerts()), "interval", minutes=poll_minutes)
 
         self.scheduler.start()
         # trigger once immediately in background
@@ -25,72 +49,71 @@ class SchedulerController:
 
 
     async def _send_to_channel(self, text: str = None, embed: discord.Embed = None) -> None:
-        """Send text or embed to the configured channel asynchronously."""
-        channel_id = self.config.channel_id
-        if not channel_id:
-            self.logger.warning("DISCORD_CHANNEL_ID not configured; skipping scheduled send.")
+        """Broadcast text or embed to every registered channel."""
+        if not embed and not text:
+            self.logger.warning("No message to send.")
             return
-
-        channel = self.bot.get_channel(channel_id)
-        if not channel:
-            self.logger.warning(f"Channel {channel_id} not found; ensure bot has access.")
+        report = await self.bot.broadcast_service.broadcast(content=text, embed=embed)
+        if report.failed:
+            self.logger.warning(f"Scheduled push failed for {report.failed} of {report.targets} channels.")
+
+    async def refresh_snapshot(self, force: bool = False) -> None:
+        """Job: Rebuild the cached summary snapshot served by commands."""
+        try:
+            with request_context(PRIORITY_SCHEDULED):
+                snapshot = await self.bot.message_service.refresh_snapshot(force=force)
+            self.logger.info(f"Summary snapshot v{snapshot.version} refreshed.")
+        except Exception as exc:
+            self.logger.exception(f"Failed to refresh summary snapshot: {exc}")
+
+    async def update_price_history(self) -> None:
+        """Job: Append missing daily bars for the watchlist, alert symbols and some sector members."""
+        history = self.bot.message_service.price_history_service
+        members = self.bot.message_service.breakout_service.member_history_symbols(
+            getattr(self.config, "breakout_member_history", 10)
+        )
+        try:
+            symbols = list(dict.fromkeys(history.symbols + self.bot.alert_service.symbols() + members))
+            added = await history.update(symbols)
+            self.bot.alert_service.reseed()
+            self.logger.info(f"Price history updated: {sum(added.values())} bars for {len(added)} symbols.")
+        except Exception as exc:
+            self.logger.exception(f"Failed to update price history: {exc}")
+
+    async def update_sector_members(self) -> None:
+        """Job: Scrape the top sectors' constituents for breakout ranking."""
+        try:
+            updated = await self.bot.message_service.update_sector_members()
+            self.logger.info(f"Sector members updated for {updated} sectors.")
+        except Exception as exc:
+            self.logger.exception(f"Failed to update sector members: {exc}")
+
+    async def check_alerts(self) -> None:
+        """Job: Poll quotes for alert symbols (when a poll is due) and notify each rule's channel."""
+        try:
+            triggers = await self.bot.alert_service.poll()
+        except Exception as exc:
+            self.logger.exception(f"Failed to check alerts: {exc}")
             return
-
-        if embed:
-            await channel.send(embed=embed)
-        elif text:
-            await channel.send(text)
-        else:
-            self.logger.warning("No message to send.")
+        by_channel = {}
+        for trigger in triggers:
+            if trigger.rule.channel_id:
+                by_channel.setdefault(trigger.rule.channel_id, []).append(self.bot.alert_service.format_trigger(trigger))
+        sends = []
+        for channel_id, lines in by_channel.items():
+            # Stay under Discord's 2000-character message limit
+            text = "\n".join(lines)
+            if len(text) > 1900:
+                text = text[:1900].rsplit("\n", 1)[0] + "\n…"
+            sends.append(self.bot.broadcast_service.broadcast(content=text, channel_ids=[channel_id]))
+        await asyncio.gather(*sends)
 
     async def daily_update(self) -> None:
-        """Job: Generate and send daily market summary (async)."""
-        json_data = await self.bot.message_service.generate_daily_summary_json_async()
-
-        embed = self._build_daily_summary_embed(json_data)
-
-        # Send to channel directly with await
-        await self._send_to_channel(embed=embed)
-
-    def _build_daily_summary_embed(self, data: dict) -> discord.Embed:
-        """Convert JSON data into a Discord Embed (with sector table)."""
-        embed = discord.Embed(
-            title="📊 Daily Market Summary",
-            description=f"Market summary for {data.get('dates', ['N/A'])[-1]}",
-            color=discord.Color.blue()
-        )
-
-        # --- Earnings section ---
-        earnings = data.get("earnings", [])
-        if earnings:
-            top_earnings = earnings[:5]
-            earnings_text = "\n".join(
-                [f"**{e['symbol']}** – {e['name']} ({e['reportDate']})"
-                 for e in top_earnings]
-            )
-            embed.add_field(name="🧾 Upcoming Earnings", value=earnings_text, inline=False)
-
-        # --- IPO section ---
-        ipos = data.get("ipos", [])
-        if ipos:
-            ipo_text = "\n".join(
-                [f"**{i['symbol']}** – {i['name']} ({i['ipoDate']})"
-                 for i in ipos]
+        """Job: Send the daily market summary embed (from the pre-warmed snapshot)."""
+        with request_context(PRIORITY_SCHEDULED):
+            snapshot = await self.bot.message_service.get_snapshot(
+                max_age=getattr(self.config, "snapshot_max_age_seconds", 3600)
             )
-            embed.add_field(name="🚀 Upcoming IPOs", value=ipo_text, inline=False)
-
-        # --- Top Sector section ---
-        sectors = data.get("top_sectors_details", [])
-        if sectors:
-            table = "```text\n"
-            table += f"{'Sector':<10}{'Change':<8}{'Leader':<22}{'Leader %':<8}\n"
-            table += "-" * 50 + "\n"
-            for s in sectors[:8]:  # Limit to 8 rows to avoid overly long embed
-                name = (s['name'][:9] + '…') if len(s['name']) > 9 else s['name']
-                leader = (s['leader_stock'][:20] + '…') if len(s['leader_stock']) > 20 else s['leader_stock']
-                table += f"{name:<10}{s['change_pct']:<8}{leader:<22}{s['leader_change_pct']:<8}\n"
-            table += "```"
-            embed.add_field(name="🏭 Top Sectors", value=table, inline=False)
 
-        embed.set_footer(text="Data source: your API provider")
-        return embed
+        # Rendered once in the snapshot, broadcast to every channel
+        await self._send_to_channel(embed=snapshot.embed)
@@ -1,26 +1,72 @@
-import asyncio
-from config import load_config
-from controllers.bot_controller import BotController
-from controllers.scheduler_controller import SchedulerController
-from utils.logger import get_logger
+import time
+
+# Taken before any other import so --profile-startup covers them all
+STARTED = time.perf_counter()
+
+import argparse
+from contextlib import nullcontext
 
 
 # Entry point: initialize Discord client and scheduler
-logger = get_logger(__name__)
+def main(argv=None):
+    """Main entry to start Discord Bot and scheduler.
+
+    With `--profile-startup` the bot connects, prints import and
+    initialisation times plus the time to `on_ready`, and exits.
+    """
+    parser = argparse.ArgumentParser(description="Discord finance bot")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report per-module import time, per-component init time and time to on_ready, then exit",
+    )
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile_startup:
+        from utils.startup_profile import StartupProfiler
 
+        profiler = StartupProfiler(started=STARTED)
+        profiler.install()
 
-def main():
-    """Main entry to start Discord Bot and scheduler."""
-    config = load_config()
-    bot = BotController(config)
+    def phase(name: str):
+        return profiler.phase(name) if profiler is not None else nullcontext()
+
+    # Controllers (discord, aiohttp, numpy, ...) are imported here so profiling sees them
+    with phase("import config"):
+        from config import load_config
+    with phase("load config"):
+        # Loads .env first, so LOG_* settings apply to every logger created after this
+        config = load_config()
+    from utils.logger import get_logger
+
+    logger = get_logger(__name__)
+    with phase("import controllers"):
+        from controllers.bot_controller import BotController
+        from controllers.scheduler_controller import SchedulerController
+    with phase("init BotController"):
+        bot = BotController(config)
     scheduler = SchedulerController(bot, config)
 
     # Attach scheduler to bot and start when bot becomes ready
     bot.attach_scheduler(scheduler)
+    if profiler is not None:
+        bot.attach_startup_profiler(profiler)
 
     logger.info("Starting Discord bot...")
     bot.run(config.discord_token)
 
+    if profiler is not None:
+        from utils.metrics import SPAN_METRIC, metrics
+
+        profiler.uninstall()
+        components = {
+            labels["component"]: hist.total
+            for _, labels, hist in metrics.histograms(SPAN_METRIC)
+            if labels.get("span") == "startup.init"
+        }
+        print(profiler.report(components=components))
+
 
 if __name__ == "__main__":
     main()
@@ -1,90 +1,282 @@
+import asyncio
 import csv
 import datetime as dt
-from typing import Dict, List, Optional
-import requests
+import io
+import os
+from typing import Dict, List, Optional, Set, Tuple
+import aiohttp
+from utils.bars import Bars
+from utils.cache import FRESH, STALE, TTLCache
+from utils.date_index import DatedRows
 from utils.logger import get_logger
+from utils.metrics import metrics, span
+from utils.request_scheduler import BudgetExceeded, RequestScheduler
 
 
 BASE_URL = "https://www.alphavantage.co/query"
+EARNINGS_FIELDS = ["symbol", "name", "reportDate", "fiscalDateEnding", "estimateEPS", "estimateCurrency"]
+IPO_FIELDS = ["symbol", "name", "ipoDate", "priceRange", "currency"]
+CACHE_NAMESPACE = "alphavantage"
+# Date column used to index each calendar (earnings, IPOs)
+DATE_FIELDS = ("reportDate", "ipoDate")
+# TIME_SERIES_DAILY "compact" returns the latest 100 bars
+COMPACT_BARS = 100
+# REALTIME_BULK_QUOTES accepts up to 100 symbols per request
+BULK_QUOTE_LIMIT = 100
+# Marks the JSON notice Alpha Vantage sends when the key lacks a premium endpoint
+# (its rate-limit notice mentions "premium plans", so the full phrase is matched)
+PREMIUM_NOTICE_MARKER = "premium endpoint"
+# Quote CSV column aliases: REALTIME_BULK_QUOTES first, GLOBAL_QUOTE second
+QUOTE_FIELDS = {
+    "price": ("close", "price"),
+    "change": ("change",),
+    "change_pct": ("change_percent", "changePercent"),
+    "volume": ("volume",),
+    "previous_close": ("previous_close", "previousClose"),
+    "as_of": ("timestamp", "latestDay"),
+}
+
+
+class AlphaVantageUnavailable(RuntimeError):
+    """A calendar request failed, ran out of budget or got a notice instead of CSV."""
+
+
+# One request budget per API key, shared by every repo instance in the process
+_budgets: Dict[str, RequestScheduler] = {}
+
+
+def shared_budget(config) -> RequestScheduler:
+    """Return the process-wide request scheduler for the configured API key."""
+    key = getattr(config, "alphavantage_api_key", "") or "demo"
+    budget = _budgets.get(key)
+    if budget is None:
+        budget = _budgets[key] = RequestScheduler(
+            "alphavantage",
+            per_minute=getattr(config, "alphavantage_requests_per_minute", 5),
+            per_day=getattr(config, "alphavantage_requests_per_day", 25),
+        )
+    return budget
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value.strip().rstrip("%").replace(",", ""))
+    except ValueError:
+        return None
 
 
 class AlphaVantageRepo:
-    """Repository for Alpha Vantage CSV endpoints."""
+    """Repository for Alpha Vantage CSV endpoints.
+
+    Responses are cached per function/parameters (see `utils.cache.TTLCache`),
+    so repeated summaries and restarts do not spend API quota. Each download
+    is parsed once into a `DatedRows` index, so date-window queries are
+    bisect slices rather than full scans. Every request is admitted by the
+    shared `RequestScheduler` budget (see `shared_budget`).
+    """
 
     def __init__(self, config):
         self.logger = get_logger(__name__)
         self.api_key = getattr(config, "alphavantage_api_key", "") or ""
+        self.base_url = getattr(config, "alphavantage_base_url", "") or BASE_URL
+        self.max_connections = getattr(config, "alphavantage_max_connections", 4)
+        self._session: Optional[aiohttp.ClientSession] = None
+        cache_dir = getattr(config, "cache_dir", "")
+        self.cache = TTLCache(
+            maxsize=16,
+            ttl=getattr(config, "alphavantage_cache_ttl", 6 * 3600),
+            stale_ttl=getattr(config, "alphavantage_cache_stale_ttl", 2 * 24 * 3600),
+            disk_dir=os.path.join(cache_dir, "alphavantage") if cache_dir else None,
+            decode=self._parse_csv,
+            timezone=getattr(config, "timezone", "UTC"),
+        )
+        self._revalidating: Set[str] = set()
+        # Strong references to background refreshes; the loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+        self.budget = shared_budget(config)
+        if not self.api_key:
+            self.logger.warning("ALPHAVANTAGE_API_KEY is not configured; using the rate-limited demo key.")
 
-    def _fetch_csv(self, params: Dict[str, str]) -> List[Dict[str, str]]:
+    def _build_query(self, params: Dict[str, str]) -> Dict[str, str]:
         if not self.api_key:
-            self.logger.warning("ALPHAVANTAGE_API_KEY is not configured.")
-        q = {**params, "apikey": self.api_key or "demo"}
+            metrics.counter("alphavantage_demo_key_requests_total").inc()
+        return {**params, "apikey": self.api_key or "demo"}
+
+    def _parse_csv(self, text: str) -> DatedRows:
+        """Parse a calendar CSV once into rows sorted by their date column."""
         try:
-            resp = requests.get(BASE_URL, params=q, timeout=10)
-            resp.raise_for_status()
+            return DatedRows.from_csv(text, DATE_FIELDS)
+        except Exception as exc:
+            self.logger.exception(f"Failed to parse CSV: {exc}")
+            return DatedRows([], DATE_FIELDS[0])
+
+    def _check_body(self, text: str) -> Optional[str]:
+        """Return the CSV body, or None when Alpha Vantage answered with a JSON notice.
+
+        Rate-limit and invalid-key responses come back as HTTP 200 with a JSON
+        body; they must not be cached or parsed as CSV.
+        """
+        if text.lstrip().startswith("{"):
+            self.logger.warning(f"AlphaVantage returned a notice instead of CSV: {text.strip()[:200]}")
+            return None
+        return text
+
+    def _download_csv(self, params: Dict[str, str]) -> Optional[str]:
+        # The blocking path cannot queue; it only runs when budget is free right now
+        if not self.budget.try_acquire():
+            self.logger.warning(f"AlphaVantage budget exhausted; skipping {params.get('function', '')}.")
+            return None
+        import requests  # blocking path only; the bot itself uses aiohttp
+
+        q = self._build_query(params)
+        try:
+            with span("alphavantage.fetch", function=params.get("function", "")):
+                resp = requests.get(self.base_url, params=q, timeout=10)
+                resp.raise_for_status()
+                text = resp.content.decode("utf-8")
         except Exception as exc:
             self.logger.exception(f"AlphaVantage request failed: {exc}")
-            return []
+            return None
+        return self._check_body(text)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+            )
+        return self._session
+
+    async def _download_text_async(self, params: Dict[str, str]) -> Optional[str]:
+        """Raw response body via the shared budget (None on failure or an expired budget).
+
+        Identical requests already queued or running share one call.
+        """
+        try:
+            return await self.budget.submit((self.base_url, tuple(sorted(params.items()))), lambda: self._request_async(params))
+        except BudgetExceeded as exc:
+            self.logger.warning(f"AlphaVantage {params.get('function', '')} skipped: {exc}")
+            return None
 
+    async def _request_async(self, params: Dict[str, str]) -> Optional[str]:
+        q = self._build_query(params)
         try:
-            text = resp.content.decode("utf-8")
-            reader = csv.DictReader(text.splitlines())
-            return [dict(row) for row in reader]
+            with span("alphavantage.fetch", function=params.get("function", "")):
+                async with self._get_session().get(self.base_url, params=q) as resp:
+                    resp.raise_for_status()
+                    return await resp.text(encoding="utf-8")
         except Exception as exc:
-            self.logger.exception(f"Failed to parse CSV: {exc}")
-            return []
+            self.logger.exception(f"AlphaVantage request failed: {exc}")
+            return None
+
+    async def _download_csv_async(self, params: Dict[str, str]) -> Optional[str]:
+        text = await self._download_text_async(params)
+        return None if text is None else self._check_body(text)
+
+    def _lookup(self, key: str, params: Dict[str, str]):
+        entry, state = self.cache.lookup(key)
+        metrics.counter("alphavantage_cache_total", function=params.get("function", ""), state=state).inc()
+        return entry, state
+
+    def _store(self, key: str, text: str) -> DatedRows:
+        with span("alphavantage.parse"):
+            rows = self._parse_csv(text)
+        self.cache.set(key, rows, raw=text)
+        return rows
+
+    def _fetch_csv(self, params: Dict[str, str]) -> DatedRows:
+        key = TTLCache.make_key(CACHE_NAMESPACE, params)
+        entry, state = self._lookup(key, params)
+        if state == FRESH:
+            return entry.value
 
-    def fetch_earnings_calendar(self, horizon: str = "3month", symbol: Optional[str] = None) -> List[Dict[str, str]]:
+        text = self._download_csv(params)
+        if text is not None:
+            return self._store(key, text)
+        return entry.value if entry is not None else self._parse_csv("")
+
+    async def _revalidate(self, key: str, params: Dict[str, str]) -> None:
+        try:
+            text = await self._download_csv_async(params)
+            if text is not None:
+                self._store(key, text)
+        finally:
+            self._revalidating.discard(key)
+
+    async def _fetch_csv_async(self, params: Dict[str, str]) -> DatedRows:
+        """Return rows for `params`, serving cached data whenever possible.
+
+        Fresh entries cost nothing; stale entries are returned immediately
+        while a single background task refreshes them. Without a cached
+        entry, a failed download, expired budget or JSON notice raises
+        `AlphaVantageUnavailable`, so callers can tell it from a calendar
+        that is really empty.
+        """
+        key = TTLCache.make_key(CACHE_NAMESPACE, params)
+        entry, state = self._lookup(key, params)
+        if state == FRESH:
+            return entry.value
+        if state == STALE:
+            if key not in self._revalidating:
+                self._revalidating.add(key)
+                task = asyncio.create_task(self._revalidate(key, params))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry.value
+
+        text = await self._download_csv_async(params)
+        if text is None:
+            raise AlphaVantageUnavailable(f"AlphaVantage {params.get('function', '')} unavailable")
+        return self._store(key, text)
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def fetch_earnings_calendar(self, horizon: str = "3month", symbol: Optional[str] = None) -> DatedRows:
         params = {"function": "EARNINGS_CALENDAR", "horizon": horizon}
         if symbol:
             params["symbol"] = symbol
         return self._fetch_csv(params)
 
-    def fetch_ipo_calendar(self) -> List[Dict[str, str]]:
+    def fetch_ipo_calendar(self) -> DatedRows:
         params = {"function": "IPO_CALENDAR"}
         return self._fetch_csv(params)
 
-    @staticmethod
-    def _normalize_date(value: str) -> Optional[dt.date]:
-        if not value:
-            return None
-        for fmt in ("%Y-%m-%d", "%Y/%m/%d"):
-            try:
-                return dt.datetime.strptime(value.strip(), fmt).date()
-            except Exception:
-                continue
-        return None
+    async def fetch_earnings_calendar_async(self, horizon: str = "3month", symbol: Optional[str] = None) -> DatedRows:
+        params = {"function": "EARNINGS_CALENDAR", "horizon": horizon}
+        if symbol:
+            params["symbol"] = symbol
+        return await self._fetch_csv_async(params)
+
+    async def fetch_ipo_calendar_async(self) -> DatedRows:
+        params = {"function": "IPO_CALENDAR"}
+        return await self._fetch_csv_async(params)
 
     @staticmethod
-    def _filter_by_dates(rows: List[Dict[str, str]], date_field: str, dates: List[dt.date]) -> List[Dict[str, str]]:
-        target = set(dates)
-        out: List[Dict[str, str]] = []
-        for r in rows:
-            d = AlphaVantageRepo._normalize_date(r.get(date_field, ""))
-            if d and d in target:
-                out.append(r)
-        return out
+    def _week_window(dates: Optional[List[dt.date]]) -> Tuple[dt.date, dt.date]:
+        """Return (start, end) covering `dates`, or the next 7 days if none given."""
+        if dates:
+            return min(dates), max(dates)
+        start = dt.date.today()
+        return start, start + dt.timedelta(days=7)
 
     @staticmethod
-    def _filter_by_range(rows: List[Dict[str, str]], date_field: str, start: dt.date, end: dt.date) -> List[Dict[str, str]]:
-        out: List[Dict[str, str]] = []
-        for r in rows:
-            d = AlphaVantageRepo._normalize_date(r.get(date_field, ""))
-            if d and start <= d <= end:
-                out.append(r)
-        return out
+    def _select(rows: List[Dict[str, str]], fields: List[str]) -> List[Dict[str, str]]:
+        return [{k: r.get(k, "") for k in fields} for r in rows]
 
     def get_earnings_for_dates(self, dates: List[dt.date], horizon: str = "3month", symbol: Optional[str] = None) -> List[Dict[str, str]]:
         rows = self.fetch_earnings_calendar(horizon=horizon, symbol=symbol)
-        filt = self._filter_by_dates(rows, "reportDate", dates)
-        fields = ["symbol", "name", "reportDate", "fiscalDateEnding", "estimateEPS", "estimateCurrency"]
-        return [{k: r.get(k, "") for k in fields} for r in filt]
+        return self._select(rows.on_dates(dates), EARNINGS_FIELDS)
 
     def get_ipos_for_dates(self, dates: List[dt.date]) -> List[Dict[str, str]]:
         rows = self.fetch_ipo_calendar()
-        filt = self._filter_by_dates(rows, "ipoDate", dates)
-        fields = ["symbol", "name", "ipoDate", "priceRange", "currency"]
-        return [{k: r.get(k, "") for k in fields} for r in filt]
+        return self._select(rows.on_dates(dates), IPO_FIELDS)
 
     def get_earnings_this_week(
         self,
@@ -94,27 +286,84 @@ class AlphaVantageRepo:
     ) -> List[Dict[str, str]]:
         """Return earnings within the given date range or the next 7 days."""
         rows = self.fetch_earnings_calendar(horizon=horizon, symbol=symbol)
-
-        if dates:
-            start, end = min(dates), max(dates)
-        else:
-            start = dt.date.today()
-            end = start + dt.timedelta(days=7)
-
-        filt = self._filter_by_range(rows, "reportDate", start, end)
-        fields = ["symbol", "name", "reportDate", "fiscalDateEnding", "estimateEPS", "estimateCurrency"]
-        return [{k: r.get(k, "") for k in fields} for r in filt]
+        start, end = self._week_window(dates)
+        return self._select(rows.between(start, end), EARNINGS_FIELDS)
 
     def get_ipos_this_week(self, dates: Optional[List[dt.date]] = None) -> List[Dict[str, str]]:
         """Return IPOs within the given date range or the next 7 days."""
         rows = self.fetch_ipo_calendar()
+        start, end = self._week_window(dates)
+        return self._select(rows.between(start, end), IPO_FIELDS)
 
-        if dates:
-            start, end = min(dates), max(dates)
-        else:
-            start = dt.date.today()
-            end = start + dt.timedelta(days=7)
-
-        filt = self._filter_by_range(rows, "ipoDate", start, end)
-        fields = ["symbol", "name", "ipoDate", "priceRange", "currency"]
-        return [{k: r.get(k, "") for k in fields} for r in filt]
+    async def get_earnings_this_week_async(
+        self,
+        dates: Optional[List[dt.date]] = None,
+        horizon: str = "3month",
+        symbol: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Async version of `get_earnings_this_week` using the pooled session."""
+        rows = await self.fetch_earnings_calendar_async(horizon=horizon, symbol=symbol)
+        start, end = self._week_window(dates)
+        return self._select(rows.between(start, end), EARNINGS_FIELDS)
+
+    async def get_ipos_this_week_async(self, dates: Optional[List[dt.date]] = None) -> List[Dict[str, str]]:
+        """Async version of `get_ipos_this_week` using the pooled session."""
+        rows = await self.fetch_ipo_calendar_async()
+        start, end = self._week_window(dates)
+        return self._select(rows.between(start, end), IPO_FIELDS)
+
+    @staticmethod
+    def parse_quotes_csv(text: str) -> List[Dict[str, object]]:
+        """Normalize REALTIME_BULK_QUOTES or GLOBAL_QUOTE CSV into quote dicts."""
+        quotes = []
+        for row in csv.DictReader(io.StringIO(text)):
+            symbol = (row.get("symbol") or "").strip().upper()
+            if not symbol:
+                continue
+            quote: Dict[str, object] = {"symbol": symbol}
+            for field, aliases in QUOTE_FIELDS.items():
+                raw = next((row[a] for a in aliases if row.get(a) not in (None, "")), None)
+                quote[field] = (raw or "") if field == "as_of" else _to_float(raw)
+            if quote["price"] is not None:
+                quotes.append(quote)
+        return quotes
+
+    async def fetch_bulk_quotes_async(self, symbols: List[str]) -> Optional[List[Dict[str, object]]]:
+        """Latest quotes for up to BULK_QUOTE_LIMIT symbols in one request.
+
+        Returns None only when Alpha Vantage says the endpoint is premium,
+        and an empty list when the request failed, ran out of budget or hit
+        a rate-limit notice, so callers can fall back to GLOBAL_QUOTE.
+        Quotes are volatile and deliberately bypass the calendar cache.
+        """
+        params = {
+            "function": "REALTIME_BULK_QUOTES",
+            "symbol": ",".join(symbols[:BULK_QUOTE_LIMIT]),
+            "datatype": "csv",
+        }
+        text = await self._download_text_async(params)
+        if text is None:
+            return []
+        body = self._check_body(text)
+        if body is None:
+            return None if PREMIUM_NOTICE_MARKER in text.lower() else []
+        return self.parse_quotes_csv(body)
+
+    async def fetch_global_quote_async(self, symbol: str) -> Optional[Dict[str, object]]:
+        """Latest quote for a single symbol via GLOBAL_QUOTE."""
+        params = {"function": "GLOBAL_QUOTE", "symbol": symbol, "datatype": "csv"}
+        text = await self._download_csv_async(params)
+        quotes = self.parse_quotes_csv(text) if text is not None else []
+        return quotes[0] if quotes else None
+
+    async def fetch_daily_bars_async(self, symbol: str, outputsize: str = "compact") -> Optional[Bars]:
+        """Daily OHLCV bars for `symbol` (latest 100, or full history with "full").
+
+        Returns None when the request failed; the caller's store is the cache.
+        """
+        params = {"function": "TIME_SERIES_DAILY", "symbol": symbol, "outputsize": outputsize, "datatype": "csv"}
+        text = await self._download_csv_async(params)
+        if text is None:
+            return None
+        with span("alphavantage.parse", function="TIME_SERIES_DAILY"):
+            return Bars.from_csv(text)
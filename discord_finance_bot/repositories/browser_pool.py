@@ -0,0 +1,152 @@
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from utils.load_profile import LoadProfile
+from utils.logger import get_logger
+from utils.metrics import metrics, span
+
+
+class _PageSlot:
+    """One reusable browser context + page owned by the pool."""
+
+    __slots__ = ("browser", "context", "page", "navigations")
+
+    def __init__(self):
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.navigations = 0
+
+
+class BrowserPool:
+    """Long-lived headless Chromium with a bounded pool of reusable pages.
+
+    The browser is launched once (on `start()` or first use) and shared by all
+    scrapes. Each slot keeps its own context/page and is recycled after
+    `max_navigations` uses or once its JS heap exceeds `max_memory_mb`.
+    A disconnected browser is relaunched transparently on the next acquire.
+    Playwright itself is imported on the first launch, not at import time.
+    Every context is created with `load_profile` (resource blocking,
+    viewport); pages opened on it later inherit the profile.
+    """
+
+    def __init__(self, size: int = 2, max_navigations: int = 50, max_memory_mb: int = 512, load_profile: Optional[LoadProfile] = None):
+        self.logger = get_logger(__name__)
+        self.size = max(1, size)
+        self.max_navigations = max(1, max_navigations)
+        self.max_memory_bytes = max(0, max_memory_mb) * 1024 * 1024
+        self.load_profile = load_profile or LoadProfile()
+        # Checked without importing Playwright; the import happens on first launch
+        self._installed = importlib.util.find_spec("playwright") is not None
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+        self._slots: asyncio.Queue = asyncio.Queue(maxsize=self.size)
+        for _ in range(self.size):
+            self._slots.put_nowait(_PageSlot())
+
+    @property
+    def available(self) -> bool:
+        return self._installed
+
+    async def start(self) -> None:
+        """Launch Playwright and Chromium if they are not already running."""
+        await self._ensure_browser()
+
+    async def _ensure_browser(self):
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self._playwright is None:
+                try:
+                    from playwright.async_api import async_playwright  # type: ignore
+                except ImportError as exc:
+                    raise RuntimeError("Playwright is not installed.") from exc
+                self._playwright = await async_playwright().start()
+            self.logger.info("Launching pooled Chromium browser...")
+            with span("scrape.launch"):
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            return self._browser
+
+    async def _reset_slot(self, slot: _PageSlot) -> None:
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        slot.browser = None
+        slot.context = None
+        slot.page = None
+        slot.navigations = 0
+
+    async def _ensure_slot(self, slot: _PageSlot) -> None:
+        browser = await self._ensure_browser()
+        healthy = (
+            slot.page is not None
+            and slot.browser is browser
+            and not slot.page.is_closed()
+        )
+        if healthy:
+            return
+        await self._reset_slot(slot)
+        slot.context = await browser.new_context(**self.load_profile.context_options())
+        await self.load_profile.apply(slot.context)
+        slot.page = await slot.context.new_page()
+        slot.browser = browser
+
+    async def _needs_recycle(self, slot: _PageSlot) -> bool:
+        if slot.navigations >= self.max_navigations:
+            return True
+        if not self.max_memory_bytes or slot.page is None or slot.page.is_closed():
+            return False
+        try:
+            used = await slot.page.evaluate(
+                "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+            )
+        except Exception:
+            return True
+        return used > self.max_memory_bytes
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator:
+        """Borrow a ready page; it is returned to the pool (or recycled) on exit."""
+        slot = await self._slots.get()
+        try:
+            await self._ensure_slot(slot)
+            slot.navigations += 1
+            try:
+                yield slot.page
+            except BaseException:
+                # A failed scrape may leave the page mid-navigation; start fresh next time.
+                await self._reset_slot(slot)
+                raise
+            if await self._needs_recycle(slot):
+                self.logger.info(f"Recycling browser page after {slot.navigations} navigations.")
+                metrics.counter("browser_page_recycles_total").inc()
+                await self._reset_slot(slot)
+        finally:
+            self._slots.put_nowait(slot)
+
+    async def close(self) -> None:
+        """Close all pooled contexts, the browser and the Playwright driver."""
+        slots = []
+        while not self._slots.empty():
+            slots.append(self._slots.get_nowait())
+        for slot in slots:
+            await self._reset_slot(slot)
+            self._slots.put_nowait(slot)
+
+        async with self._lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
@@ -0,0 +1,105 @@
+import json
+from dataclasses import dataclass
+from typing import Optional
+import aiohttp
+from utils.logger import get_logger
+
+
+DISCORD_API_URL = "https://discord.com/api/v10"
+
+
+@dataclass
+class SendResult:
+    """Outcome of one create-message call, including rate-limit headers."""
+
+    status: int
+    bucket: Optional[str] = None
+    remaining: Optional[int] = None
+    reset_after: Optional[float] = None
+    retry_after: float = 0.0
+    is_global: bool = False
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class DiscordRestRepo:
+    """Minimal Discord REST client for posting pre-serialized messages.
+
+    Used for broadcasts so one rendered body can be sent to many channels
+    over a pooled session while the caller keeps full control over rate
+    limiting (see `services.broadcast_service`).
+    """
+
+    def __init__(self, config):
+        self.logger = get_logger(__name__)
+        self.token = getattr(config, "discord_token", "") or ""
+        self.base_url = (getattr(config, "discord_api_url", "") or DISCORD_API_URL).rstrip("/")
+        self.max_connections = getattr(config, "broadcast_concurrency", 8)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15),
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                headers={
+                    "Authorization": f"Bot {self.token}",
+                    "Content-Type": "application/json",
+                    "User-Agent": "DiscordBot (dbot, 1.0)",
+                },
+            )
+        return self._session
+
+    @staticmethod
+    def encode_message(content: Optional[str] = None, embed: Optional[dict] = None) -> bytes:
+        """Serialize a create-message body once so it can be reused for every target."""
+        body = {}
+        if content:
+            body["content"] = content
+        if embed:
+            body["embeds"] = [embed]
+        return json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+    async def post_message(self, channel_id: int, body: bytes) -> SendResult:
+        """POST /channels/{id}/messages; never raises, errors are reported in the result."""
+        url = f"{self.base_url}/channels/{channel_id}/messages"
+        try:
+            async with self._get_session().post(url, data=body) as resp:
+                headers = resp.headers
+                remaining = headers.get("X-RateLimit-Remaining")
+                result = SendResult(
+                    status=resp.status,
+                    bucket=headers.get("X-RateLimit-Bucket"),
+                    remaining=int(remaining) if remaining and remaining.isdigit() else None,
+                    reset_after=_float(headers.get("X-RateLimit-Reset-After")),
+                    is_global=headers.get("X-RateLimit-Global", "").lower() == "true",
+                )
+                if resp.status == 429:
+                    try:
+                        data = await resp.json(content_type=None)
+                    except Exception:
+                        data = {}
+                    result.retry_after = _float(data.get("retry_after")) or _float(headers.get("Retry-After")) or 1.0
+                    result.is_global = result.is_global or bool(data.get("global"))
+                elif not result.ok:
+                    result.error = (await resp.text())[:200]
+                return result
+        except Exception as exc:
+            return SendResult(status=0, error=f"{type(exc).__name__}: {exc}")
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
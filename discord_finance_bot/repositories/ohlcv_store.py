@@ -0,0 +1,161 @@
+import datetime as dt
+import mmap
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from utils.bars import BAR_COLUMNS, Bars
+from utils.logger import get_logger
+
+
+_SYMBOL_RE = re.compile(r"^[A-Z0-9][A-Z0-9.\-^]{0,15}$")
+# (column, dtype, file name) resolved once
+_COLUMN_FILES = tuple((name, np.dtype(dtype), f"{name}.bin") for name, dtype in BAR_COLUMNS)
+
+
+class OHLCVStore:
+    """On-disk columnar store of daily OHLCV bars, one directory per symbol.
+
+    Each column is a raw little-endian file (`<symbol>/<column>.bin`, dtypes
+    in `utils.bars.BAR_COLUMNS`) that is appended to in place and exposed
+    as a read-only memory map, so loading a universe only maps files and
+    slicing by date is zero-copy. The date column is written last on append; a symbol's
+    length is the shortest column, so an interrupted append is ignored and
+    trimmed on the next write.
+    """
+
+    def __init__(self, root: str):
+        self.logger = get_logger(__name__)
+        self.root = root
+        # symbol -> (row count, bars backed by memory maps)
+        self._maps: Dict[str, Tuple[int, Bars]] = {}
+
+    @staticmethod
+    def normalize(symbol: str) -> str:
+        symbol = symbol.strip().upper()
+        if not _SYMBOL_RE.match(symbol):
+            raise ValueError(f"Invalid symbol: {symbol!r}")
+        return symbol
+
+    def _dir(self, symbol: str) -> str:
+        return os.path.join(self.root, self.normalize(symbol))
+
+    def _rows_on_disk(self, path: str) -> int:
+        sizes = []
+        for _, dtype, file_name in _COLUMN_FILES:
+            try:
+                sizes.append(os.path.getsize(os.path.join(path, file_name)) // dtype.itemsize)
+            except OSError:
+                return 0
+        return min(sizes)
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def load(self, symbol: str) -> Bars:
+        """Memory-map all bars of `symbol` (empty Bars when unknown)."""
+        symbol = self.normalize(symbol)
+        path = os.path.join(self.root, symbol)
+        fds: List[int] = []
+        try:
+            try:
+                for _, _, file_name in _COLUMN_FILES:
+                    fds.append(os.open(os.path.join(path, file_name), os.O_RDONLY))
+            except FileNotFoundError:
+                return Bars.empty()
+            rows = min(os.fstat(fd).st_size // dtype.itemsize for fd, (_, dtype, _) in zip(fds, _COLUMN_FILES))
+            cached = self._maps.get(symbol)
+            if cached is not None and cached[0] == rows:
+                return cached[1]
+            if rows == 0:
+                return Bars.empty()
+            # mmap + frombuffer gives read-only zero-copy views and is cheaper to set up than np.memmap
+            bars = Bars(**{
+                name: np.frombuffer(mmap.mmap(fd, rows * dtype.itemsize, access=mmap.ACCESS_READ), dtype=dtype, count=rows)
+                for fd, (name, dtype, _) in zip(fds, _COLUMN_FILES)
+            })
+        finally:
+            for fd in fds:
+                os.close(fd)
+        self._maps[symbol] = (rows, bars)
+        return bars
+
+    def load_universe(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Bars]:
+        """Map every requested (default: stored) symbol; unknown or invalid symbols are skipped."""
+        out = {}
+        for symbol in self.symbols() if symbols is None else symbols:
+            try:
+                bars = self.load(symbol)
+            except ValueError:
+                continue
+            if len(bars):
+                out[self.normalize(symbol)] = bars
+        return out
+
+    def bars(self, symbol: str, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> Bars:
+        """Zero-copy view of `symbol` between `start` and `end` (inclusive)."""
+        return self.load(symbol).between(start, end)
+
+    def last_date(self, symbol: str) -> Optional[dt.date]:
+        return self.load(symbol).last_date
+
+    def append(self, symbol: str, bars: Bars) -> int:
+        """Append bars newer than the stored ones; return how many were written."""
+        symbol = self.normalize(symbol)
+        path = self._dir(symbol)
+        os.makedirs(path, exist_ok=True)
+        rows = self._rows_on_disk(path)
+        existing = self.load(symbol) if rows else Bars.empty()
+        new = bars.after(existing.last_date)
+        if not len(new):
+            return 0
+
+        self._maps.pop(symbol, None)
+        columns = new.columns()
+        # Dates go last: a crash mid-append leaves the extra values ignored
+        for name, dtype, file_name in _COLUMN_FILES[1:] + _COLUMN_FILES[:1]:
+            with open(os.path.join(path, file_name), "ab") as fh:
+                fh.truncate(rows * dtype.itemsize)
+                fh.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        return len(new)
+
+    def import_csv(self, symbol: str, text: str) -> int:
+        """Append bars from an AlphaVantage daily CSV (e.g. an offline fixture)."""
+        return self.append(symbol, Bars.from_csv(text))
+
+
+if __name__ == "__main__":
+    # Offline maintenance, e.g. seeding the store from fixture CSVs:
+    #   python -m repositories.ohlcv_store --root data/ohlcv import bench/fixtures/daily
+    #   python -m repositories.ohlcv_store --root data/ohlcv show AAPL --start 2025-12-01
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Columnar OHLCV store maintenance")
+    parser.add_argument("--root", type=str, default=os.path.join("data", "ohlcv"))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="Append <SYMBOL>.csv files (AlphaVantage daily CSV) from a directory")
+    imp.add_argument("directory")
+    show = sub.add_parser("show", help="Print stored bars for a symbol")
+    show.add_argument("symbol")
+    show.add_argument("--start", type=dt.date.fromisoformat, default=None)
+    show.add_argument("--end", type=dt.date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    store = OHLCVStore(args.root)
+    if args.cmd == "import":
+        added = {}
+        for file_name in sorted(os.listdir(args.directory)):
+            if file_name.lower().endswith(".csv"):
+                with open(os.path.join(args.directory, file_name), encoding="utf-8") as fh:
+                    added[file_name[:-4].upper()] = store.import_csv(file_name[:-4], fh.read())
+        print(json.dumps(added, indent=2))
+    else:
+        bars = store.bars(args.symbol, args.start, args.end)
+        rows = [
+            {name: (str(col[i]) if name == "date" else float(col[i])) for name, col in bars.columns().items()}
+            for i in range(len(bars))
+        ]
+        print(json.dumps(rows, indent=2))
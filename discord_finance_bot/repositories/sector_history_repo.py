@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+from utils.logger import get_logger
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY,
+    scraped_at TEXT NOT NULL,
+    session TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scrapes_session ON scrapes (session, id);
+CREATE TABLE IF NOT EXISTS sector_snapshots (
+    scrape_id INTEGER NOT NULL REFERENCES scrapes (id),
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    change_pct REAL,
+    up_count INTEGER,
+    unchanged_count INTEGER,
+    down_count INTEGER,
+    leader_stock TEXT,
+    leader_change_pct REAL,
+    PRIMARY KEY (scrape_id, rank)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sector_snapshots_name ON sector_snapshots (name, scrape_id);
+"""
+
+# Latest scrape of each of the most recent `?` sessions
+_DAILY = """
+daily AS (
+    SELECT session, max(id) AS scrape_id FROM scrapes
+    GROUP BY session ORDER BY session DESC LIMIT ?
+)
+"""
+
+
+def _pct(value: Any) -> Optional[float]:
+    """Parse "+3.21%" / 3.21 into 3.21."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).strip().rstrip("%").replace(",", ""))
+    except ValueError:
+        return None
+
+
+class SectorHistoryRepo:
+    """Append-only SQLite history of sector ranking scrapes.
+
+    Each scrape is one `scrapes` row (UTC time plus the market session it
+    belongs to) and one `sector_snapshots` row per ranked sector. The
+    database runs in WAL mode, so reads never block the writer. Per-session
+    queries use each session's latest scrape, found through the
+    (session, id) index. Per-sector lookups go through (name, scrape_id).
+    """
+
+    def __init__(self, path: str):
+        self.logger = get_logger(__name__)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record(self, sectors: List[Dict[str, Any]], scraped_at: str, session: str) -> int:
+        """Append one scrape (rows in rank order); return its id."""
+        with self._lock, self._conn:
+            scrape_id = self._conn.execute(
+                "INSERT INTO scrapes (scraped_at, session) VALUES (?, ?)", (scraped_at, session)
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO sector_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        scrape_id,
+                        rank,
+                        str(s.get("name") or ""),
+                        _pct(s.get("change_pct")),
+                        s.get("up_count"),
+                        s.get("unchanged_count"),
+                        s.get("down_count"),
+                        str(s.get("leader_stock") or ""),
+                        _pct(s.get("leader_change_pct")),
+                    )
+                    for rank, s in enumerate(sectors, start=1)
+                ],
+            )
+        return scrape_id
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def sessions(self, limit: int = 20) -> List[str]:
+        """Most recent recorded sessions, newest first."""
+        return [r["session"] for r in self._query(f"WITH {_DAILY} SELECT session FROM daily ORDER BY session DESC", (limit,))]
+
+    def find_names(self, query: str, limit: int = 5) -> List[str]:
+        """Sector names equal to `query`, else containing it, most recently seen first."""
+        return [
+            r["name"]
+            for r in self._query(
+                "SELECT name, max(scrape_id) AS last_seen FROM sector_snapshots WHERE name = ? OR instr(name, ?) > 0 "
+                "GROUP BY name ORDER BY name = ? DESC, last_seen DESC LIMIT ?",
+                (query, query, query, limit),
+            )
+        ]
+
+    def history(self, name: str, sessions: int = 20) -> List[Dict[str, Any]]:
+        """Per-session rows of `name` over the last `sessions` sessions, oldest first.
+
+        Sessions where the sector was not ranked have rank None.
+        """
+        return self._query(
+            f"WITH {_DAILY} SELECT d.session, s.rank, s.change_pct, s.leader_stock, s.leader_change_pct "
+            "FROM daily d LEFT JOIN sector_snapshots s ON s.scrape_id = d.scrape_id AND s.name = ? "
+            "ORDER BY d.session",
+            (sessions, name),
+        )
+
+    def momentum(self, sessions: int = 5, limit: int = 10) -> List[Dict[str, Any]]:
+        """Sectors by summed daily change over the last `sessions` sessions.
+
+        `days` counts the sessions the sector was ranked in; sessions where it
+        was not ranked add nothing to the sum.
+        """
+        return self._query(
+            f"WITH {_DAILY} SELECT s.name, sum(s.change_pct) AS momentum_pct, count(*) AS days, "
+            "avg(s.rank) AS avg_rank, min(s.rank) AS best_rank "
+            "FROM daily d JOIN sector_snapshots s ON s.scrape_id = d.scrape_id "
+            "GROUP BY s.name ORDER BY momentum_pct DESC LIMIT ?",
+            (sessions, limit),
+        )
+
+    def rank_changes(self) -> List[Dict[str, Any]]:
+        """Rank in the latest session vs. the one before (previous_rank None when newly ranked)."""
+        return self._query(
+            f"WITH {_DAILY} SELECT cur.name, cur.rank, prev.rank AS previous_rank, cur.change_pct "
+            "FROM (SELECT scrape_id FROM daily ORDER BY session DESC LIMIT 1) latest "
+            "JOIN sector_snapshots cur ON cur.scrape_id = latest.scrape_id "
+            "LEFT JOIN (SELECT scrape_id FROM daily ORDER BY session DESC LIMIT 1 OFFSET 1) before "
+            "LEFT JOIN sector_snapshots prev ON prev.scrape_id = before.scrape_id AND prev.name = cur.name "
+            "ORDER BY cur.rank",
+            (2,),
+        )
@@ -1,18 +1,112 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 import asyncio
-import requests
-from bs4 import BeautifulSoup
+import math
+import re
+from repositories.browser_pool import BrowserPool
+from utils.cache import FRESH, STALE, TTLCache
+from utils.load_profile import LoadProfile
 from utils.logger import get_logger
+from utils.metrics import metrics, span
 
-try:
-    from playwright.async_api import async_playwright  # type: ignore
-except Exception:
-    async_playwright = None  # Playwright not installed yet
 
-try:
-    from playwright.sync_api import sync_playwright  # type: ignore
-except Exception:
-    sync_playwright = None  # Playwright sync API not installed
+DEFAULT_SECTORS_URL = "https://www.moomoo.com/hans/quote/us/concepts"
+SECTOR_ROW_SELECTOR = "div.content-main a.list-item"
+# True once the last sector row has a name and the row count has not changed
+# for `settleMs`, so a list that renders progressively is not read half-built
+SECTOR_ROWS_READY_JS = """
+({ selector, settleMs }) => {
+  const rows = document.querySelectorAll(selector);
+  const last = rows[rows.length - 1];
+  const name = last && last.querySelector("span.plate-name");
+  if (!name || name.textContent.trim() === "") {
+    window.__dbotSectorRows = null;
+    return false;
+  }
+  const now = performance.now();
+  const seen = window.__dbotSectorRows;
+  if (!seen || seen.count !== rows.length) {
+    window.__dbotSectorRows = { count: rows.length, since: now };
+    return false;
+  }
+  return now - seen.since >= settleMs;
+}
+"""
+# How long the sector row count must stay unchanged before the lean profile reads it
+SECTOR_ROWS_SETTLE_MS = 500
+
+# Returns the raw texts of each sector row in one browser round trip;
+# mapping into the final schema happens in `WebCrawlerRepo._build_sector_row`.
+SECTOR_ROWS_JS = """
+({ selector, limit }) => {
+  const texts = (item, sel) =>
+    Array.from(item.querySelectorAll(sel), (n) => n.textContent).filter((t) => t);
+  const text = (item, sel) => {
+    const el = item.querySelector(sel);
+    return el ? el.textContent || "" : "";
+  };
+  return Array.from(document.querySelectorAll(selector)).slice(0, limit).map((item) => ({
+    name: text(item, "span.plate-name"),
+    changes: texts(item, "span.change.value"),
+    values: texts(item, "span.value.ellipsis"),
+    same: text(item, "span.same-count.value.ellipsis"),
+    leader: text(item, "object.stock-name a"),
+  }));
+}
+"""
+
+PAGINATION_ITEM_SELECTOR = ".base-pagination .item"
+# Row cap per page in full crawls (a page holds `pageSize` rows, 30 on moomoo)
+MAX_ROWS_PER_PAGE = 1000
+
+# Sector name -> href of its concept page, read from the loaded concepts list
+SECTOR_LINKS_JS = """
+(selector) => Object.fromEntries(
+  Array.from(document.querySelectorAll(selector))
+    .map((item) => {
+      const name = item.querySelector("span.plate-name");
+      return [name ? name.textContent.trim() : "", item.getAttribute("href") || ""];
+    })
+    .filter(([name, href]) => name && href)
+)
+"""
+
+# Constituent rows of one concept page (each row links to its stock page)
+CONSTITUENT_ROW_SELECTOR = 'div.content-main a.list-item[href*="/stock/"]'
+CONSTITUENT_ROWS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector), (item) => {
+  const text = (sel) => {
+    const el = item.querySelector(sel);
+    return el ? (el.textContent || "").trim() : "";
+  };
+  return {
+    href: item.getAttribute("href") || "",
+    name: text(".stock-name"),
+    price: text(".price"),
+    change: text("span.change.value"),
+  };
+})
+"""
+# "/hans/stock/NVDA-US" -> "NVDA"
+_STOCK_HREF = re.compile(r"/stock/([^/?#]+)-[A-Za-z]{2}(?:[/?#]|$)")
+
+PLATE_LIST_URL_MARKER = "get-plate-list"
+PLATE_LIST_KEYS = ("list", "plateList", "plate_list", "items", "rows")
+# Query parameters that may carry the page number of a captured get-plate-list URL
+PAGE_PARAMS = ("page", "pageNo", "pageIndex", "pageNum", "page_no", "pn")
+# Accepted aliases for each field of a get-plate-list item. These are not yet
+# confirmed against a recorded response (the bench fixture is synthetic), so
+# "dom" stays the default crawler mode.
+PLATE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "name": ("name", "plateName", "plate_name"),
+    "change_pct": ("changeRatio", "change_ratio", "changeRate", "change_pct", "change"),
+    "up_count": ("riseCount", "upCount", "upNum", "up_count", "rise"),
+    "unchanged_count": ("flatCount", "sameCount", "flatNum", "unchanged_count", "flat"),
+    "down_count": ("fallCount", "downCount", "downNum", "down_count", "fall"),
+    "leader": ("leadStock", "leaderStock", "leadingStock", "leader"),
+    "leader_name": ("leadStockName", "leaderStockName", "leader_stock"),
+    "leader_change_pct": ("leadStockChangeRatio", "leaderChangeRatio", "leader_change_pct"),
+}
 
 
 class WebCrawlerRepo:
@@ -21,89 +115,610 @@ class WebCrawlerRepo:
     def __init__(self, config):
         self.config = config
         self.logger = get_logger(__name__)
+        self.load_profile = LoadProfile.from_config(config)
+        self.browser_pool = BrowserPool(
+            size=getattr(config, "browser_pool_size", 2),
+            max_navigations=getattr(config, "browser_max_navigations", 50),
+            max_memory_mb=getattr(config, "browser_max_memory_mb", 512),
+            load_profile=self.load_profile,
+        )
+        # (url, headers) of the last captured get-plate-list request, for replay
+        self._plate_list_request: Optional[Tuple[str, Dict[str, str]]] = None
+        # Sector name -> concept page URL, refreshed when a drill-down misses a name
+        self._sector_links: Dict[str, str] = {}
+        # Constituent lists per concept page; stale entries cover failed drill-downs
+        self.constituents_cache = TTLCache(
+            maxsize=256,
+            ttl=getattr(config, "crawler_constituents_ttl", 600),
+            stale_ttl=6 * 3600,
+        )
+
+    async def start(self) -> None:
+        """Warm up the shared browser so the first scrape skips the cold start."""
+        if not self.browser_pool.available:
+            self.logger.warning("Playwright is not installed; sector scraping is disabled.")
+            return
+        try:
+            await self.browser_pool.start()
+        except Exception as exc:
+            self.logger.exception(f"Failed to start browser pool: {exc}")
+
+    async def close(self) -> None:
+        """Shut down the shared browser."""
+        await self.browser_pool.close()
+
+    @staticmethod
+    def _to_int(s: str) -> Optional[int]:
+        try:
+            return int(s)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _build_sector_row(raw: Dict[str, Any]) -> dict:
+        """Map raw texts of one `a.list-item` into the sector details schema.
+
+        `raw` holds: name, changes (texts of `span.change.value`), values
+        (texts of `span.value.ellipsis`), same (unchanged count) and leader.
+        """
+        change_texts = [t.strip() for t in raw.get("changes") or [] if t]
+        val_texts = [t.strip() for t in raw.get("values") or [] if t]
+        same_text = (raw.get("same") or "").strip()
+        to_int = WebCrawlerRepo._to_int
+        return {
+            "name": (raw.get("name") or "").strip(),
+            "change_pct": change_texts[0] if change_texts else "",
+            "up_count": to_int(val_texts[0]) if val_texts else None,
+            "unchanged_count": to_int(same_text) if same_text else None,
+            "down_count": to_int(val_texts[-1]) if val_texts else None,
+            "leader_stock": (raw.get("leader") or "").strip(),
+            "leader_change_pct": change_texts[-1] if len(change_texts) > 1 else "",
+        }
+
+    @staticmethod
+    def parse_sector_rows_html(html: str, limit: int = 10) -> List[dict]:
+        """Parse sector rows from a concepts page HTML snapshot with BeautifulSoup."""
+        from bs4 import BeautifulSoup  # only the "html" extract mode and offline tools need it
+
+        soup = BeautifulSoup(html, "html.parser")
+        out: List[dict] = []
+        for item in soup.select(SECTOR_ROW_SELECTOR)[:limit]:
+            name_el = item.select_one("span.plate-name")
+            same_el = item.select_one("span.same-count.value.ellipsis")
+            leader_el = item.select_one("object.stock-name a")
+            raw = {
+                "name": name_el.get_text() if name_el else "",
+                "changes": [n.get_text() for n in item.select("span.change.value")],
+                "values": [n.get_text() for n in item.select("span.value.ellipsis")],
+                "same": same_el.get_text() if same_el else "",
+                "leader": leader_el.get_text() if leader_el else "",
+            }
+            out.append(WebCrawlerRepo._build_sector_row(raw))
+        return out
+
+    @staticmethod
+    def _pick(obj: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+        for key in keys:
+            if key in obj and obj[key] not in (None, ""):
+                return obj[key]
+        return None
+
+    @staticmethod
+    def _format_pct(value: Any) -> str:
+        """Render a change ratio like the page does, e.g. `+3.21%`."""
+        if value is None:
+            return ""
+        if isinstance(value, (int, float)):
+            return f"{value:+.2f}%"
+        text = str(value).strip()
+        try:
+            return f"{float(text):+.2f}%"
+        except ValueError:
+            return text
+
+    @staticmethod
+    def parse_plate_list_json(payload: Any, limit: int = 10) -> List[dict]:
+        """Map a `get-plate-list` JSON response into the sector details schema.
+
+        Returns [] when the payload does not look like a plate list (e.g. the
+        API shape changed) so callers can fall back to DOM extraction.
+        """
+        if not isinstance(payload, dict):
+            return []
+        data = payload.get("data", payload)
+        items = data if isinstance(data, list) else None
+        if isinstance(data, dict):
+            for key in PLATE_LIST_KEYS:
+                if isinstance(data.get(key), list):
+                    items = data[key]
+                    break
+        if not items:
+            return []
+
+        pick = WebCrawlerRepo._pick
+        pct = WebCrawlerRepo._format_pct
+        out: List[dict] = []
+        for item in items[:limit]:
+            if not isinstance(item, dict):
+                return []
+            name = pick(item, PLATE_FIELDS["name"])
+            change = pick(item, PLATE_FIELDS["change_pct"])
+            if name is None or change is None:
+                return []
+            leader = pick(item, PLATE_FIELDS["leader"])
+            if isinstance(leader, dict):
+                leader_name = pick(leader, ("name", "stockName", "stock_name"))
+                leader_change = pick(leader, PLATE_FIELDS["change_pct"])
+            else:
+                leader_name = leader if leader is not None else pick(item, PLATE_FIELDS["leader_name"])
+                leader_change = pick(item, PLATE_FIELDS["leader_change_pct"])
+            counts = {
+                key: WebCrawlerRepo._to_int(str(pick(item, PLATE_FIELDS[key])))
+                for key in ("up_count", "unchanged_count", "down_count")
+            }
+            out.append(
+                {
+                    "name": str(name).strip(),
+                    "change_pct": pct(change),
+                    "up_count": counts["up_count"],
+                    "unchanged_count": counts["unchanged_count"],
+                    "down_count": counts["down_count"],
+                    "leader_stock": str(leader_name or "").strip(),
+                    "leader_change_pct": pct(leader_change),
+                }
+            )
+        return out
+
+    async def _goto(self, page, url: str, wait_until: str = "domcontentloaded") -> None:
+        """Navigate within `crawler_nav_timeout` seconds.
+
+        A "networkidle" wait that runs out of time is not an error: analytics
+        polling can keep the network busy forever, and the DOM is loaded by
+        then. Callers still wait for the selectors they need.
+        """
+        try:
+            await page.goto(url, wait_until=wait_until, timeout=getattr(self.config, "crawler_nav_timeout", 20) * 1000)
+        except Exception as exc:
+            from playwright.async_api import TimeoutError as PlaywrightTimeoutError  # type: ignore
+
+            if wait_until != "networkidle" or not isinstance(exc, PlaywrightTimeoutError):
+                raise
+            metrics.counter("scrape_networkidle_timeouts_total").inc()
+            self.logger.warning(f"{url} did not reach networkidle; continuing with the loaded DOM.")
+
+    async def _load_sector_list(self, page, url: str) -> None:
+        """Navigate to the concepts list and wait until its rows are rendered.
+
+        The lean profile stops at DOMContentLoaded and waits until the rows
+        are named and their count has settled (`SECTOR_ROWS_SETTLE_MS`); the
+        full profile waits for networkidle and the list container, as a
+        normal browser session would.
+        """
+        if self.load_profile.lean:
+            with span("scrape.goto"):
+                await self._goto(page, url)
+            with span("scrape.wait"):
+                await page.wait_for_function(
+                    SECTOR_ROWS_READY_JS,
+                    arg={"selector": SECTOR_ROW_SELECTOR, "settleMs": SECTOR_ROWS_SETTLE_MS},
+                    polling=100,
+                    timeout=10000,
+                )
+            return
+        with span("scrape.goto"):
+            await self._goto(page, url, "networkidle")
+        with span("scrape.wait"):
+            await page.wait_for_selector("div.content-main", timeout=10000)
+
+    async def _fetch_plate_list_payload(self, page, url: str) -> Optional[Any]:
+        """Get the `get-plate-list` JSON for the concepts page.
+
+        Replays the last captured request with the page's cookies when
+        possible; otherwise navigates and captures the XHR response.
+        Returns None when no usable response is seen.
+        """
+        if self._plate_list_request is not None and page.url != "about:blank":
+            api_url, headers = self._plate_list_request
+            try:
+                with span("scrape.replay"):
+                    resp = await page.request.get(api_url, headers=headers, timeout=10000)
+                    if resp.ok:
+                        return await resp.json()
+            except Exception as exc:
+                self.logger.warning(f"Replaying get-plate-list failed: {exc}")
+            self._plate_list_request = None
+
+        try:
+            with span("scrape.capture"):
+                async with page.expect_response(
+                    lambda r: PLATE_LIST_URL_MARKER in r.url and r.request.method == "GET", timeout=15000
+                ) as resp_info:
+                    await self._goto(page, url)
+                resp = await resp_info.value
+                payload = await resp.json()
+        except Exception as exc:
+            self.logger.warning(f"Failed to capture get-plate-list response: {exc}")
+            return None
+
+        headers = {k: v for k, v in (await resp.request.all_headers()).items() if not k.startswith(":")}
+        self._plate_list_request = (resp.url, headers)
+        return payload
+
+    async def _extract_rows_evaluate(self, page, limit: int) -> List[dict]:
+        """Collect every sector row in a single `page.evaluate` round trip."""
+        raws = await page.evaluate(SECTOR_ROWS_JS, {"selector": SECTOR_ROW_SELECTOR, "limit": limit})
+        return [self._build_sector_row(raw) for raw in raws]
+
+    async def _extract_rows_html(self, page, limit: int) -> List[dict]:
+        """Take one `page.content()` snapshot and parse it locally."""
+        html = await page.content()
+        return self.parse_sector_rows_html(html, limit=limit)
+
+    async def _extract_rows_elements(self, page, limit: int) -> List[dict]:
+        """Legacy extraction using per-element Playwright handles (one IPC call per node)."""
+
+        async def _texts(item, selector: str) -> List[str]:
+            texts: List[str] = []
+            for node in await item.query_selector_all(selector):
+                t = await node.text_content()
+                if t:
+                    texts.append(t)
+            return texts
+
+        async def _text(item, selector: str) -> str:
+            el = await item.query_selector(selector)
+            return (await el.text_content() or "") if el else ""
+
+        items = await page.query_selector_all(SECTOR_ROW_SELECTOR)
+        out: List[dict] = []
+        for item in items[:limit]:
+            raw = {
+                "name": await _text(item, "span.plate-name"),
+                "changes": await _texts(item, "span.change.value"),
+                "values": await _texts(item, "span.value.ellipsis"),
+                "same": await _text(item, "span.same-count.value.ellipsis"),
+                "leader": await _text(item, "object.stock-name a"),
+            }
+            out.append(self._build_sector_row(raw))
+        return out
+
+    async def extract_sector_rows(self, page, limit: int = 10, mode: Optional[str] = None) -> List[dict]:
+        """Extract sector rows from a loaded concepts page.
+
+        mode: "evaluate" (default, one browser round trip), "html"
+        (`page.content()` + BeautifulSoup) or "elements" (legacy per-node calls).
+        """
+        mode = mode or getattr(self.config, "crawler_extract_mode", "evaluate")
+        if mode == "html":
+            return await self._extract_rows_html(page, limit)
+        if mode == "elements":
+            return await self._extract_rows_elements(page, limit)
+        return await self._extract_rows_evaluate(page, limit)
 
     async def _scrape_top_sectors_details_async(self, url: str = "https://www.moomoo.com/hans/quote/us/concepts", limit: int = 10) -> List[dict]:
         """Use Playwright to scrape detailed top sectors.
 
-        Extracts per sector:
+        With `config.crawler_mode == "api"` the page's `get-plate-list` XHR is
+        captured (or replayed) and mapped directly; the DOM path below is used
+        when that fails or the payload shape is not recognised.
+
+        DOM extraction per sector:
           - name: `span.plate-name`
           - change_pct: first `span.change.value`
           - leader_stock: `object.stock-name a`
           - leader_change_pct: last `span.change.value` (if present)
           - up_count, unchanged_count, down_count: parsed from value elements.
         """
-        if async_playwright is None:
+        if not self.browser_pool.available:
             self.logger.error("Playwright is not installed. Please `pip install playwright` and `python -m playwright install chromium`.")
             return []
 
+        mode = getattr(self.config, "crawler_mode", "dom")
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context()
-                page = await context.new_page()
-                await page.goto(url, wait_until="networkidle")
-                await page.wait_for_selector("div.content-main", timeout=10000)
-
-                items = await page.query_selector_all("div.content-main a.list-item")
-                out: List[dict] = []
-                for item in items[:limit]:
-                    name_el = await item.query_selector("span.plate-name")
-                    name = (await name_el.text_content()).strip() if name_el else ""
-
-                    change_nodes = await item.query_selector_all("span.change.value")
-                    change_texts: List[str] = []
-                    for cn in change_nodes:
-                        t = await cn.text_content()
-                        if t:
-                            change_texts.append(t.strip())
-                    sector_change = change_texts[0] if change_texts else ""
-                    leader_change = change_texts[-1] if len(change_texts) > 1 else ""
-
-                    val_nodes = await item.query_selector_all("span.value.ellipsis")
-                    val_texts: List[str] = []
-                    for vn in val_nodes:
-                        t = await vn.text_content()
-                        if t:
-                            val_texts.append(t.strip())
-                    same_el = await item.query_selector("span.same-count.value.ellipsis")
-                    same_text = (await same_el.text_content()).strip() if same_el else ""
-
-                    def _to_int(s: str) -> Optional[int]:
-                        try:
-                            return int(s)
-                        except Exception:
-                            return None
-
-                    up_count = _to_int(val_texts[0]) if val_texts else None
-                    down_count = _to_int(val_texts[-1]) if val_texts else None
-                    unchanged_count = _to_int(same_text) if same_text else None
-
-                    leader_el = await item.query_selector("object.stock-name a")
-                    leader_name = (await leader_el.text_content()).strip() if leader_el else ""
-
-                    out.append(
-                        {
-                            "name": name,
-                            "change_pct": sector_change,
-                            "up_count": up_count,
-                            "unchanged_count": unchanged_count,
-                            "down_count": down_count,
-                            "leader_stock": leader_name,
-                            "leader_change_pct": leader_change,
-                        }
-                    )
-
-                await context.close()
-                await browser.close()
-                return out
+            with span("scrape.total", mode=mode):
+                async with self.browser_pool.page() as page:
+                    rows = await self._scrape_page(page, url, limit, mode)
+                metrics.counter("scrape_rows_total", mode=mode).inc(len(rows))
+                return rows
         except Exception as exc:
             self.logger.exception(f"Failed to scrape sector details via Playwright: {exc}")
             return []
 
+    async def _scrape_page(self, page, url: str, limit: int, mode: str) -> List[dict]:
+        if mode == "api":
+            payload = await self._fetch_plate_list_payload(page, url)
+            rows = self.parse_plate_list_json(payload, limit=limit) if payload is not None else []
+            if rows:
+                return rows
+            metrics.counter("scrape_api_fallbacks_total").inc()
+            self.logger.warning("get-plate-list payload unavailable or unrecognised; falling back to DOM extraction.")
+        await self._load_sector_list(page, url)
+        with span("scrape.extract"):
+            return await self.extract_sector_rows(page, limit=limit)
+
+
+    @staticmethod
+    def plate_list_pages(payload: Any) -> int:
+        """Number of pages a `get-plate-list` response says the list spans (1 if unknown)."""
+        data = payload.get("data") if isinstance(payload, dict) else None
+        if not isinstance(data, dict):
+            return 1
+        total = WebCrawlerRepo._to_int(str(data.get("total")))
+        size = WebCrawlerRepo._to_int(str(data.get("pageSize")))
+        if not total or not size or size <= 0:
+            return 1
+        return max(1, math.ceil(total / size))
+
+    @staticmethod
+    def page_param(api_url: str) -> Optional[str]:
+        """Name of the page-number query parameter in a captured URL (None if it has none)."""
+        present = {k for k, _ in parse_qsl(urlparse(api_url).query, keep_blank_values=True)}
+        return next((name for name in PAGE_PARAMS if name in present), None)
+
+    @staticmethod
+    def _with_page(api_url: str, page_no: int, param: str = "page") -> str:
+        """`api_url` with its `param` query parameter set to `page_no`."""
+        parts = urlparse(api_url)
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != param]
+        query.append((param, str(page_no)))
+        return urlunparse(parts._replace(query=urlencode(query)))
+
+    @staticmethod
+    def _change_key(row: dict) -> float:
+        try:
+            return float(str(row.get("change_pct") or "").strip().rstrip("%").replace(",", ""))
+        except ValueError:
+            return -math.inf
+
+    @staticmethod
+    def merge_sector_pages(pages: Iterable[List[dict]]) -> List[dict]:
+        """Merge per-page rows into one table ranked by change, best first.
+
+        Rows are deduplicated by sector name, keeping the first page's copy
+        (a sector can move across a page boundary while pages are fetched).
+        Rows without a parsable change sort last; ties keep page order.
+        """
+        merged: Dict[str, dict] = {}
+        for rows in pages:
+            for row in rows:
+                name = row.get("name")
+                if name and name not in merged:
+                    merged[name] = row
+        return sorted(merged.values(), key=WebCrawlerRepo._change_key, reverse=True)
+
+    async def _gather_pages(self, page_numbers: List[int], fetch) -> List[List[dict]]:
+        """Run `fetch(page_no)` for every page, at most `crawler_page_concurrency` at once.
+
+        A failed page is logged and contributes no rows, so one bad page
+        does not sink the whole crawl.
+        """
+        semaphore = asyncio.Semaphore(max(1, getattr(self.config, "crawler_page_concurrency", 4)))
+
+        async def _one(page_no: int) -> List[dict]:
+            async with semaphore:
+                try:
+                    with span("scrape.page"):
+                        return await fetch(page_no)
+                except Exception as exc:
+                    metrics.counter("scrape_page_failures_total").inc()
+                    self.logger.warning(f"Failed to crawl sector page {page_no}: {exc}")
+                    return []
+
+        return list(await asyncio.gather(*(_one(n) for n in page_numbers)))
+
+    async def _crawl_pages_api(self, page, url: str) -> Optional[List[List[dict]]]:
+        """Page 1 via the captured `get-plate-list` XHR, the others replayed concurrently.
+
+        Replays go through `page.request`, which shares the context's
+        cookies. The page number goes into whichever `PAGE_PARAMS` name the
+        captured URL uses. Returns None when the API path is unusable: no
+        page parameter to set, or a replayed page that repeats page 1 (the
+        API ignored the parameter), so the caller falls back to the DOM.
+        """
+        payload = await self._fetch_plate_list_payload(page, url)
+        first = self.parse_plate_list_json(payload, limit=MAX_ROWS_PER_PAGE) if payload is not None else []
+        if not first or self._plate_list_request is None:
+            return None
+        api_url, headers = self._plate_list_request
+        pages = min(self.plate_list_pages(payload), max(1, getattr(self.config, "crawler_max_pages", 20)))
+        if pages <= 1:
+            return [first]
+        param = self.page_param(api_url)
+        if param is None:
+            self.logger.warning(f"Captured get-plate-list URL has no page parameter: {api_url}")
+            return None
+        first_names = [row["name"] for row in first]
+        repeated: List[int] = []
+
+        async def _fetch(page_no: int) -> List[dict]:
+            resp = await page.request.get(self._with_page(api_url, page_no, param), headers=headers, timeout=10000)
+            if not resp.ok:
+                raise RuntimeError(f"HTTP {resp.status}")
+            rows = self.parse_plate_list_json(await resp.json(), limit=MAX_ROWS_PER_PAGE)
+            if not rows:
+                raise RuntimeError("unrecognised payload")
+            if [row["name"] for row in rows] == first_names:
+                repeated.append(page_no)
+                raise RuntimeError(f"page {page_no} repeats page 1")
+            return rows
+
+        rest = await self._gather_pages(list(range(2, pages + 1)), _fetch)
+        if repeated:
+            self.logger.warning(f"get-plate-list ignored the {param!r} parameter (pages {repeated} repeat page 1).")
+            return None
+        return [first] + rest
+
+    async def _crawl_pages_dom(self, page, url: str) -> List[List[dict]]:
+        """Page 1 from the loaded DOM; each other page in its own tab of the same context.
+
+        Each tab loads the list and clicks its number in `.base-pagination`,
+        then waits for the rows to differ from page 1 before extracting.
+        """
+        await self._load_sector_list(page, url)
+        first = await self.extract_sector_rows(page, limit=MAX_ROWS_PER_PAGE)
+        labels = await page.locator(PAGINATION_ITEM_SELECTOR).all_text_contents()
+        numbers = [n for n in (self._to_int(t.strip()) for t in labels) if n]
+        pages = min(max(numbers, default=1), max(1, getattr(self.config, "crawler_max_pages", 20)))
+        first_name = first[0]["name"] if first else ""
+
+        async def _fetch(page_no: int) -> List[dict]:
+            tab = await page.context.new_page()
+            try:
+                await self._goto(tab, url)
+                item = tab.locator(PAGINATION_ITEM_SELECTOR).filter(has_text=re.compile(rf"^\s*{page_no}\s*$")).first
+                await item.click(timeout=10000)
+                await tab.wait_for_function(
+                    """([selector, name]) => {
+                      const el = document.querySelector(selector + " span.plate-name");
+                      return el && el.textContent.trim() !== name;
+                    }""",
+                    arg=[SECTOR_ROW_SELECTOR, first_name],
+                    timeout=10000,
+                )
+                return await self.extract_sector_rows(tab, limit=MAX_ROWS_PER_PAGE)
+            finally:
+                await tab.close()
+
+        return [first] + await self._gather_pages(list(range(2, pages + 1)), _fetch)
+
+    async def fetch_all_sectors_async(self, url: Optional[str] = None) -> List[dict]:
+        """Crawl every page of the concepts list into one ranked, deduplicated table.
+
+        Page 1 is loaded once; the remaining pages are fetched concurrently
+        (up to `crawler_page_concurrency`, at most `crawler_max_pages` pages)
+        within the same browser context, so the crawl takes about two page
+        loads instead of one per page. Uses the API replay with
+        `crawler_mode == "api"` and tabs clicking through the pagination
+        otherwise (or when the API path fails).
+        """
+        target_url = url or getattr(self.config, "sectors_url", DEFAULT_SECTORS_URL)
+        if not target_url or not self.browser_pool.available:
+            self.logger.warning("Full sector crawl skipped: no sectors URL or Playwright is not installed.")
+            return []
+
+        mode = getattr(self.config, "crawler_mode", "dom")
+        try:
+            with span("scrape.full", mode=mode):
+                async with self.browser_pool.page() as page:
+                    pages = await self._crawl_pages_api(page, target_url) if mode == "api" else None
+                    if pages is None:
+                        if mode == "api":
+                            metrics.counter("scrape_api_fallbacks_total").inc()
+                        pages = await self._crawl_pages_dom(page, target_url)
+                rows = self.merge_sector_pages(pages)
+            metrics.counter("scrape_rows_total", mode=f"{mode}_full").inc(len(rows))
+            self.logger.debug(f"Full sector crawl: {len(pages)} pages, {len(rows)} sectors")
+            return rows
+        except Exception as exc:
+            self.logger.exception(f"Failed to crawl all sector pages: {exc}")
+            return []
+
+    @staticmethod
+    def _build_constituent_row(raw: Dict[str, Any]) -> Optional[dict]:
+        match = _STOCK_HREF.search(raw.get("href") or "")
+        if not match:
+            return None
+        try:
+            price: Optional[float] = float(str(raw.get("price") or "").replace(",", ""))
+        except ValueError:
+            price = None
+        return {
+            "symbol": match.group(1).upper(),
+            "name": (raw.get("name") or "").strip(),
+            "price": price,
+            "change_pct": (raw.get("change") or "").strip(),
+        }
+
+    async def _sector_link_map(self, page, url: str) -> Dict[str, str]:
+        """Absolute concept page URL of every sector on the concepts list's first page."""
+        await self._goto(page, url)
+        await page.wait_for_selector(SECTOR_ROW_SELECTOR, timeout=10000)
+        links = await page.evaluate(SECTOR_LINKS_JS, SECTOR_ROW_SELECTOR)
+        return {name: urljoin(url, href) for name, href in links.items()}
+
+    async def _scrape_constituents(self, context, sector_url: str) -> List[dict]:
+        tab = await context.new_page()
+        try:
+            await self._goto(tab, sector_url)
+            await tab.wait_for_selector(CONSTITUENT_ROW_SELECTOR, timeout=10000)
+            raws = await tab.evaluate(CONSTITUENT_ROWS_JS, CONSTITUENT_ROW_SELECTOR)
+        finally:
+            await tab.close()
+        rows = [row for row in map(self._build_constituent_row, raws) if row]
+        return list({row["symbol"]: row for row in rows}.values())
 
-    async def fetch_top_sectors_details_async(self, url: Optional[str] = "https://www.moomoo.com/hans/quote/us/concepts", limit: int = 10) -> List[dict]:
+    async def fetch_sector_constituents_async(self, names: List[str], url: Optional[str] = None) -> Dict[str, List[dict]]:
+        """Constituents of each named sector, scraped concurrently from their concept pages.
+
+        Fresh cached lists (younger than `crawler_constituents_ttl`) are
+        served without a browser. The rest open as tabs of one context, at
+        most `crawler_page_concurrency` at a time, each bounded by
+        `crawler_sector_timeout` seconds; the whole call returns within
+        `crawler_drilldown_budget` seconds. A sector that fails or runs out
+        of time falls back to its stale cached list, else is left out.
+        """
+        target_url = url or getattr(self.config, "sectors_url", DEFAULT_SECTORS_URL)
+        result: Dict[str, List[dict]] = {}
+        stale: Dict[str, List[dict]] = {}
+        missing: List[str] = []
+        for name in dict.fromkeys(names):
+            entry, state = self.constituents_cache.lookup(name)
+            if state == FRESH:
+                result[name] = entry.value
+                continue
+            if state == STALE:
+                stale[name] = entry.value
+            missing.append(name)
+
+        def _ordered() -> Dict[str, List[dict]]:
+            found = {**stale, **result}
+            return {name: found[name] for name in dict.fromkeys(names) if name in found}
+
+        if not missing or not target_url or not self.browser_pool.available:
+            return _ordered()
+
+        sector_timeout = getattr(self.config, "crawler_sector_timeout", 15)
+        budget = getattr(self.config, "crawler_drilldown_budget", 30)
+        semaphore = asyncio.Semaphore(max(1, getattr(self.config, "crawler_page_concurrency", 4)))
+
+        async def _one(context, name: str) -> None:
+            async with semaphore:
+                try:
+                    with span("scrape.constituents"):
+                        rows = await asyncio.wait_for(
+                            self._scrape_constituents(context, self._sector_links[name]), sector_timeout
+                        )
+                except Exception as exc:
+                    metrics.counter("scrape_constituent_failures_total").inc()
+                    self.logger.warning(f"Failed to scrape constituents of {name}: {exc!r}")
+                    return
+            self.constituents_cache.set(name, rows)
+            result[name] = rows
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget
+        try:
+            with span("scrape.drilldown"):
+                async with self.browser_pool.page() as page:
+                    if any(name not in self._sector_links for name in missing):
+                        self._sector_links = await asyncio.wait_for(self._sector_link_map(page, target_url), budget)
+                    tasks = [
+                        asyncio.create_task(_one(page.context, name)) for name in missing if name in self._sector_links
+                    ]
+                    if tasks:
+                        _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+                        for task in pending:
+                            task.cancel()
+                        if pending:
+                            self.logger.warning(f"Constituent drill-down budget spent; {len(pending)} sectors left out.")
+                            await asyncio.gather(*pending, return_exceptions=True)
+        except Exception as exc:
+            self.logger.exception(f"Failed to drill down into sector constituents: {exc}")
+        return _ordered()
+
+    async def fetch_top_sectors_details_async(self, url: Optional[str] = None, limit: int = 10) -> List[dict]:
         """Public async wrapper to get detailed top sector info using Playwright async API."""
-        target_url = url or getattr(self.config, "sectors_url", "")
+        target_url = url or getattr(self.config, "sectors_url", DEFAULT_SECTORS_URL)
         if not target_url:
             self.logger.warning("No sectors URL provided. Pass `url` or set `config.sectors_url`.")
             return []
@@ -135,5 +750,11 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    details = repo.fetch_top_sectors_details(url=args.url, limit=args.limit)
+    async def _run() -> List[dict]:
+        try:
+            return await repo.fetch_top_sectors_details_async(url=args.url, limit=args.limit)
+        finally:
+            await repo.close()
+
+    details = asyncio.run(_run())
     print(json.dumps({"sectors": details}, ensure_ascii=False, indent=2))
\ No newline at end of file
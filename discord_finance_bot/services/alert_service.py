@@ -0,0 +1,246 @@
+import asyncio
+import datetime as dt
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from repositories.alphavantage_repo import BULK_QUOTE_LIMIT
+from services.price_history_service import PriceHistoryService
+from services.watchlist_service import WatchlistService
+from utils.alert_index import ALERT_KINDS, AlertIndex, AlertRule, AlertTrigger
+from utils.logger import get_logger
+from utils.metrics import metrics, span
+from utils.request_scheduler import PRIORITY_BACKFILL, request_context
+from utils.scheduler_utils import US_SESSION_MINUTES, is_us_market_open
+
+
+# Undelivered triggers kept when nothing drains the queue
+MAX_PENDING_TRIGGERS = 1000
+# Share of the daily AlphaVantage budget the alert poll plans to spend
+POLL_BUDGET_SHARE = 0.5
+# Trigger bookkeeping (`last_fired`) is written at most this often
+SAVE_DELAY_SECONDS = 30
+
+
+class AlertService:
+    """Per-user alert rules evaluated against every stored watchlist quote.
+
+    Rules live in an `AlertIndex` and are persisted as JSON at
+    DATA_DIR/alerts.json. Their symbols are added to the watchlist
+    refresh while they have a rule, and every refresh (scheduled poll,
+    summary or command) feeds its quotes to the index. Triggers wait in a
+    queue until `drain()`. Moving-average and volume windows are seeded
+    from the OHLCV store.
+
+    The scheduled poll only refreshes during the regular US session, and
+    never more often than `POLL_BUDGET_SHARE` of the daily request budget
+    allows for the current number of alert symbols (`poll_interval()`).
+    Rule changes are saved at once; trigger state from quotes is saved
+    at most every `SAVE_DELAY_SECONDS`, off the event loop.
+    """
+
+    def __init__(self, config, watchlist_service: WatchlistService, price_history_service: PriceHistoryService):
+        self.logger = get_logger(__name__)
+        self.watchlist_service = watchlist_service
+        self.price_history_service = price_history_service
+        self.max_per_user = getattr(config, "alert_max_per_user", 50)
+        self.poll_minutes = getattr(config, "alert_poll_minutes", 15)
+        self.requests_per_day = getattr(config, "alphavantage_requests_per_day", 25)
+        self.index = AlertIndex(
+            volume_lookback=getattr(config, "alert_volume_lookback", 30),
+            cooldown=getattr(config, "alert_cooldown_minutes", 60) * 60,
+        )
+        data_dir = getattr(config, "data_dir", "") or "data"
+        self.path = os.path.join(data_dir, "alerts.json")
+        self._next_id = 1
+        self._triggered: List[AlertTrigger] = []
+        self._last_poll: Optional[float] = None
+        self._save_lock = threading.Lock()
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._save_task: Optional[asyncio.Future] = None
+        self._dirty = False
+        self._load()
+        self.reseed()
+        watchlist_service.watch(self.index.symbols())
+        watchlist_service.add_listener(self.on_quotes)
+        metrics.gauge("alert_rules").set(len(self.index))
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            self.index.load(AlertRule(**rule) for rule in data.get("rules", []))
+            self._next_id = max([data.get("next_id", 1)] + [rule_id + 1 for rule_id in self.index.rules])
+        except Exception as exc:
+            self.logger.exception(f"Failed to load alert rules {self.path}: {exc}")
+
+    def _document(self) -> Dict[str, Any]:
+        return {"next_id": self._next_id, "rules": [r.to_dict() for r in self.index.rules.values()]}
+
+    def _write(self, document: Dict[str, Any]) -> None:
+        # Serialised: a deferred write may run in a worker thread
+        with self._save_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(document, fh)
+            os.replace(tmp, self.path)
+
+    def _save(self) -> None:
+        """Persist now (rule changes); cancels any pending deferred save."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._dirty = False
+        self._write(self._document())
+
+    def _save_soon(self) -> None:
+        """Persist within `SAVE_DELAY_SECONDS`, writing the file in a worker thread."""
+        self._dirty = True
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save()
+            return
+        self._save_handle = loop.call_later(SAVE_DELAY_SECONDS, self._deferred_save)
+
+    def _deferred_save(self) -> None:
+        self._save_handle = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        # The snapshot is taken on the loop; only serialising and writing move off it
+        self._save_task = asyncio.ensure_future(asyncio.to_thread(self._write, self._document()))
+        self._save_task.add_done_callback(self._save_done)
+
+    def _save_done(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Failed to save alert rules {self.path}: {task.exception()}")
+            self._dirty = True
+
+    async def flush(self) -> None:
+        """Write pending trigger state (call on shutdown)."""
+        if self._save_task is not None:
+            await asyncio.gather(self._save_task, return_exceptions=True)
+        if self._dirty:
+            self._save()
+
+    def _seed(self, symbol: str) -> bool:
+        """Load `symbol`'s daily history into the index; False when none is stored."""
+        bars = self.price_history_service.bars(symbol).tail(self.index.history_needed(symbol))
+        if not len(bars):
+            return False
+        self.index.seed(symbol, [str(d) for d in bars.date], bars.close.tolist(), bars.volume.tolist())
+        return True
+
+    def reseed(self, symbols: Optional[Iterable[str]] = None) -> None:
+        """Refresh rolling windows from the OHLCV store (e.g. after new bars were appended)."""
+        for symbol in symbols if symbols is not None else self.index.symbols():
+            self._seed(symbol)
+
+    def symbols(self) -> List[str]:
+        return self.index.symbols()
+
+    def rules_for(self, user_id: int) -> List[AlertRule]:
+        return [rule for rule in self.index.rules.values() if rule.user_id == user_id]
+
+    def add_rule(self, symbol: str, kind: str, value: float, user_id: int = 0, channel_id: int = 0) -> AlertRule:
+        """Register a rule; raises ValueError for bad input or a full quota."""
+        symbol = self.price_history_service.store.normalize(symbol)
+        kind = kind.lower()
+        if kind not in ALERT_KINDS:
+            raise ValueError(f"Unknown alert kind {kind!r}; use one of: {', '.join(ALERT_KINDS)}")
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError("Alert value must be positive")
+        if len(self.rules_for(user_id)) >= self.max_per_user:
+            raise ValueError(f"You already have {self.max_per_user} alerts; remove one first")
+        rule = AlertRule(id=self._next_id, symbol=symbol, kind=kind, value=value, user_id=user_id, channel_id=channel_id)
+        self.index.add(rule)
+        self._next_id += 1
+        self._save()
+        self.watchlist_service.watch([symbol])
+        if kind not in ("above", "below") and not self._seed(symbol):
+            # Windows need daily history; fetch it in the background
+            asyncio.get_running_loop().create_task(self._backfill(symbol))
+        metrics.gauge("alert_rules").set(len(self.index))
+        return rule
+
+    async def _backfill(self, symbol: str) -> None:
+        try:
+            await self.price_history_service.update([symbol])
+            self._seed(symbol)
+        except Exception as exc:
+            self.logger.exception(f"Failed to backfill history for alerts on {symbol}: {exc}")
+
+    def remove_rule(self, rule_id: int, user_id: Optional[int] = None) -> Optional[AlertRule]:
+        """Remove a rule (only the owner's when `user_id` is given)."""
+        rule = self.index.rules.get(rule_id)
+        if rule is None or (user_id is not None and rule.user_id != user_id):
+            return None
+        self.index.remove(rule_id)
+        self._save()
+        if rule.symbol not in self.index.symbols():
+            self.watchlist_service.unwatch([rule.symbol])
+        metrics.gauge("alert_rules").set(len(self.index))
+        return rule
+
+    def on_quotes(self, quotes: List[Dict[str, object]]) -> None:
+        """Quote listener: evaluate the index and queue triggered rules."""
+        triggered = []
+        for quote in quotes:
+            price = quote.get("price")
+            if price is None:
+                continue
+            triggered.extend(
+                self.index.on_quote(str(quote["symbol"]), float(price), quote.get("volume"), str(quote.get("as_of") or "")[:10])
+            )
+        if triggered:
+            self._triggered = (self._triggered + triggered)[-MAX_PENDING_TRIGGERS:]
+            metrics.counter("alert_triggers_total").inc(len(triggered))
+            self._save_soon()
+
+    def poll_interval(self) -> float:
+        """Seconds between alert refreshes: `alert_poll_minutes`, stretched to fit the budget.
+
+        One poll costs a GLOBAL_QUOTE per alert symbol (or one bulk request
+        per 100); polls over a whole session may use `POLL_BUDGET_SHARE` of
+        `alphavantage_requests_per_day`.
+        """
+        interval = self.poll_minutes * 60.0
+        symbols = len(self.index.symbols())
+        if not symbols or self.requests_per_day <= 0:
+            return interval
+        per_poll = math.ceil(symbols / BULK_QUOTE_LIMIT) if self.watchlist_service.uses_bulk else symbols
+        polls = max(1.0, self.requests_per_day * POLL_BUDGET_SHARE / per_poll)
+        return max(interval, US_SESSION_MINUTES * 60.0 / polls)
+
+    async def poll(self, now: Optional[dt.datetime] = None) -> List[AlertTrigger]:
+        """Refresh quotes at backfill priority when a poll is due, then return and clear queued triggers.
+
+        Outside the regular US session, or sooner than `poll_interval()`
+        after the last refresh, only queued triggers are returned.
+        """
+        at = now or dt.datetime.now(dt.timezone.utc)
+        due = self._last_poll is None or time.monotonic() - self._last_poll >= self.poll_interval()
+        if len(self.index) and due and is_us_market_open(at):
+            self._last_poll = time.monotonic()
+            with span("alerts.poll"), request_context(PRIORITY_BACKFILL):
+                await self.watchlist_service.refresh()
+        return self.drain()
+
+    def drain(self) -> List[AlertTrigger]:
+        triggered, self._triggered = self._triggered, []
+        return triggered
+
+    @staticmethod
+    def format_trigger(trigger: AlertTrigger) -> str:
+        rule = trigger.rule
+        detail = f"volume {trigger.volume:,.0f}" if rule.kind == "volume" else f"at {trigger.price:.2f}"
+        mention = f"<@{rule.user_id}> " if rule.user_id else ""
+        return f"{mention}🔔 {rule.describe()} — {detail} (level {trigger.threshold:,.2f}, alert #{rule.id})"
@@ -2,6 +2,7 @@ import datetime as dt
 from typing import Dict, List, Optional
 
 from repositories.alphavantage_repo import AlphaVantageRepo
+from utils.bars import Bars
 
 
 class AlphaVantageService:
@@ -21,4 +22,26 @@ class AlphaVantageService:
         return self.repo.get_earnings_this_week(dates)
 
     def get_week_ipos_for_dates(self, dates: List[dt.date]) -> List[Dict[str, str]]:
-        return self.repo.get_ipos_this_week(dates)
\ No newline at end of file
+        return self.repo.get_ipos_this_week(dates)
+
+    async def get_week_earnings_for_dates_async(self, dates: List[dt.date]) -> List[Dict[str, str]]:
+        return await self.repo.get_earnings_this_week_async(dates)
+
+    async def get_week_ipos_for_dates_async(self, dates: List[dt.date]) -> List[Dict[str, str]]:
+        return await self.repo.get_ipos_this_week_async(dates)
+
+    async def get_bulk_quotes_async(self, symbols: List[str]) -> Optional[List[Dict[str, object]]]:
+        return await self.repo.fetch_bulk_quotes_async(symbols)
+
+    async def get_global_quote_async(self, symbol: str) -> Optional[Dict[str, object]]:
+        return await self.repo.fetch_global_quote_async(symbol)
+
+    async def get_daily_bars_async(self, symbol: str, outputsize: str = "compact") -> Optional[Bars]:
+        return await self.repo.fetch_daily_bars_async(symbol, outputsize)
+
+    def budget_status(self) -> Dict[str, object]:
+        """Remaining request budget per window and the number of queued requests."""
+        return {**self.repo.budget.remaining(), "queued": self.repo.budget.queued}
+
+    async def close(self) -> None:
+        await self.repo.close()
@@ -0,0 +1,102 @@
+import asyncio
+import datetime as dt
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+from services.price_history_service import PriceHistoryService
+from utils.logger import get_logger
+from utils.metrics import metrics, span
+
+if TYPE_CHECKING:
+    from utils.backtest import BacktestGrid
+
+
+@dataclass
+class BacktestReport:
+    """Ranked results of one grid run."""
+
+    symbols: int
+    start: Optional[dt.date]
+    end: Optional[dt.date]
+    combinations: int
+    elapsed_seconds: float
+    results: List[Dict[str, float]] = field(default_factory=list)
+
+
+class BacktestService:
+    """Backtest the breakout signal over the stored OHLCV history.
+
+    Builds one symbols x dates panel from the columnar store and sweeps a
+    `BacktestGrid` over it with `utils.backtest.run_grid`. The CPU work
+    runs off the event loop, in a process pool of `backtest_workers`.
+    `utils.backtest` (and its multiprocessing machinery) is only imported
+    on the first backtest.
+    """
+
+    def __init__(self, config, price_history_service: PriceHistoryService):
+        self.logger = get_logger(__name__)
+        self.price_history_service = price_history_service
+        self.workers = getattr(config, "backtest_workers", 0) or None
+        self.max_combinations = getattr(config, "backtest_max_combinations", 5000)
+        self.min_trades = getattr(config, "backtest_min_trades", 10)
+        self._default_grid: Optional["BacktestGrid"] = None
+
+    @property
+    def default_grid(self) -> "BacktestGrid":
+        if self._default_grid is None:
+            from utils.backtest import BacktestGrid
+
+            self._default_grid = BacktestGrid()
+        return self._default_grid
+
+    def parse_grid(self, args: Iterable[str]) -> "BacktestGrid":
+        """Grid from command arguments (see `BacktestGrid.from_args`); raises ValueError."""
+        from utils.backtest import BacktestGrid
+
+        grid = BacktestGrid.from_args(args, self.default_grid)
+        if len(grid) > self.max_combinations:
+            raise ValueError(f"{len(grid)} combinations exceed the limit of {self.max_combinations}")
+        return grid
+
+    async def run(
+        self,
+        grid: Optional["BacktestGrid"] = None,
+        symbols: Optional[Iterable[str]] = None,
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+    ) -> BacktestReport:
+        grid = grid or self.default_grid
+        with span("backtest.run"):
+            report = await asyncio.to_thread(self._run, grid, symbols, start, end)
+        metrics.counter("backtest_combinations_total").inc(report.combinations)
+        return report
+
+    def _run(self, grid: "BacktestGrid", symbols: Optional[Iterable[str]], start: Optional[dt.date], end: Optional[dt.date]) -> BacktestReport:
+        from utils.backtest import Panel, rank_results, run_grid
+
+        t0 = time.perf_counter()
+        panel = Panel.from_universe(self.price_history_service.universe(symbols), start, end)
+        rows = run_grid(panel, grid, self.workers)
+        return BacktestReport(
+            symbols=len(panel.symbols),
+            start=panel.start,
+            end=panel.end,
+            combinations=len(rows),
+            elapsed_seconds=time.perf_counter() - t0,
+            results=rank_results(rows, self.min_trades),
+        )
+
+    @staticmethod
+    def format_result(row: Dict[str, float]) -> Dict[str, str]:
+        """Format a result row for tables."""
+        pf = row["profit_factor"]
+        return {
+            "lookback": str(row["lookback"]),
+            "ratio": f"{row['volume_ratio']:g}",
+            "hold": str(row["hold"]),
+            "trades": str(row["trades"]),
+            "win": f"{row['win_rate'] * 100:.0f}%",
+            "avg": f"{row['avg_return'] * 100:+.2f}%",
+            "pf": "inf" if pf == float("inf") else f"{pf:.2f}",
+            "sharpe": f"{row['sharpe']:.2f}",
+        }
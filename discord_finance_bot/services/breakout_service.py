@@ -0,0 +1,170 @@
+import datetime as dt
+import json
+import os
+from typing import Dict, Iterable, List, Mapping, Optional
+from services.price_history_service import PriceHistoryService, last_completed_session
+from services.sector_history_service import SectorHistoryService
+from utils.breakout import scan_breakouts
+from utils.logger import get_logger
+from utils.metrics import metrics, timed
+
+
+class SectorMembers:
+    """Sector name -> member symbols, used to join breakouts with the sector ranking.
+
+    Persisted as a JSON object at `path` (sector names as shown on the
+    concepts page, e.g. "半导体": ["NVDA", "AMD"]) so it can be seeded by
+    hand and updated at runtime.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.logger = get_logger(__name__)
+        self.path = path
+        self._members: Dict[str, List[str]] = {}
+        self._by_symbol: Dict[str, List[str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            for sector, symbols in data.items():
+                self._set(sector, symbols)
+        except Exception as exc:
+            self.logger.exception(f"Failed to load sector members {self.path}: {exc}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self._members, fh, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def _set(self, sector: str, symbols: Iterable[str]) -> None:
+        self._members[sector] = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        self._by_symbol = {}
+        for name, members in self._members.items():
+            for symbol in members:
+                self._by_symbol.setdefault(symbol, []).append(name)
+
+    def set(self, sector: str, symbols: Iterable[str]) -> None:
+        """Replace the members of `sector` and persist the mapping."""
+        self._set(sector, symbols)
+        self._save()
+
+    def update(self, members: Mapping[str, Iterable[str]]) -> None:
+        """Replace the members of several sectors and persist once."""
+        for sector, symbols in members.items():
+            self._set(sector, symbols)
+        self._save()
+
+    def sectors_of(self, symbol: str) -> List[str]:
+        return self._by_symbol.get(symbol.upper(), [])
+
+    def symbols(self) -> List[str]:
+        return list(self._by_symbol)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+
+class BreakoutService:
+    """Rank 30-day-high breakouts across the scan universe by sector momentum.
+
+    The scan universe (`universe_symbols()`) is every symbol with stored
+    daily bars plus every known sector member. Only symbols that have bars
+    in the OHLCV store are actually scanned: the store holds the watchlist,
+    alert symbols and the sector members the history job adds
+    (`member_history_symbols()`, a few per run), so a member without
+    history cannot appear as a breakout (`missing_history()` lists those).
+
+    All symbols are scanned at once (see `utils.breakout.scan_breakouts`).
+    Hits are ordered by the rank of their best-ranked sector in today's
+    sector list, then by volume ratio; hits outside the ranked sectors (or
+    unmapped) follow after them. With a sector history, hits also carry
+    their sector's recent momentum.
+    """
+
+    # Sessions summed for the sector momentum column
+    MOMENTUM_SESSIONS = 5
+
+    def __init__(
+        self,
+        config,
+        price_history_service: PriceHistoryService,
+        sector_history_service: Optional[SectorHistoryService] = None,
+    ):
+        self.logger = get_logger(__name__)
+        self.price_history_service = price_history_service
+        self.sector_history_service = sector_history_service
+        self.lookback = getattr(config, "breakout_lookback_days", 30)
+        self.volume_ratio = getattr(config, "breakout_volume_ratio", 1.5)
+        self.max_candidates = getattr(config, "breakout_max_candidates", 10)
+        data_dir = getattr(config, "data_dir", "") or "data"
+        self.sectors = SectorMembers(os.path.join(data_dir, "sector_members.json"))
+
+    def universe_symbols(self) -> List[str]:
+        """Symbols a scan considers: stored symbols, then sector members not stored yet."""
+        return list(dict.fromkeys(self.price_history_service.stored_symbols() + self.sectors.symbols()))
+
+    def missing_history(self) -> List[str]:
+        """Sector members with no stored bars (invisible to the scan until backfilled)."""
+        stored = set(self.price_history_service.stored_symbols())
+        return [s for s in self.sectors.symbols() if s not in stored]
+
+    def member_history_symbols(self, limit: int, today: Optional[dt.date] = None) -> List[str]:
+        """Up to `limit` sector members whose bars the history job should download.
+
+        Members without history get at least half of `limit` (all of it
+        when every stored member is current); the rest goes to stored
+        members that are behind, oldest first, so each run moves on to
+        the members the previous runs skipped.
+        """
+        if limit <= 0:
+            return []
+        latest = last_completed_session(today or dt.date.today())
+        history = self.price_history_service
+        missing, behind = [], []
+        for symbol in self.sectors.symbols():
+            last = history.last_date(symbol)
+            if last is None:
+                missing.append(symbol)
+            elif last < latest:
+                behind.append((last, symbol))
+        behind.sort()
+        missing = missing[: max(limit - len(behind), (limit + 1) // 2)]
+        return (missing + [symbol for _, symbol in behind])[:limit]
+
+    @timed("breakout.scan")
+    def scan(
+        self,
+        top_sectors_details: List[dict],
+        quotes: Optional[Iterable[Mapping[str, object]]] = None,
+    ) -> List[Dict[str, object]]:
+        """Ranked breakout candidates; `quotes` (numeric quote rows) make the scan intraday."""
+        universe = self.price_history_service.universe(self.universe_symbols())
+        live = {str(q["symbol"]): q for q in quotes or () if q.get("symbol")}
+        hits = scan_breakouts(universe, self.lookback, self.volume_ratio, live).candidates()
+
+        ranking = {s.get("name", ""): (rank, s) for rank, s in enumerate(top_sectors_details or [], start=1)}
+        momentum = (
+            self.sector_history_service.momentum_by_name(self.MOMENTUM_SESSIONS)
+            if hits and self.sector_history_service is not None
+            else {}
+        )
+        for hit in hits:
+            ranked = sorted(ranking[name] for name in self.sectors.sectors_of(hit["symbol"]) if name in ranking)
+            rank, sector = ranked[0] if ranked else (None, {})
+            hit["sector"] = sector.get("name", "")
+            hit["sector_rank"] = rank
+            hit["sector_change_pct"] = sector.get("change_pct", "")
+            trend = momentum.get(hit["sector"])
+            hit["sector_momentum_pct"] = trend["momentum_pct"] if trend else None
+        # Stable sort keeps the volume-ratio order within a sector rank
+        hits.sort(key=lambda h: h["sector_rank"] if h["sector_rank"] is not None else len(ranking) + 1)
+        metrics.counter("breakout_candidates_total").inc(len(hits))
+        return hits[: self.max_candidates]
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+import discord
+from repositories.discord_rest_repo import DiscordRestRepo
+from utils.logger import get_logger
+from utils.metrics import metrics, span
+from utils.rate_limiter import KeyedRateLimiter
+
+
+# Statuses worth retrying besides 429: transport errors (0) and server errors
+RETRYABLE = {0, 500, 502, 503, 504}
+
+
+class ChannelRegistry:
+    """Broadcast targets: configured channel IDs plus runtime subscriptions.
+
+    Subscriptions are persisted as a JSON list at `path` so they survive
+    restarts; configured IDs are always included and cannot be removed.
+    """
+
+    def __init__(self, static_ids: Iterable[int] = (), path: Optional[str] = None):
+        self.logger = get_logger(__name__)
+        self.static_ids = [int(i) for i in static_ids if i]
+        self.path = path
+        self._subscribed: List[int] = []
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                self._subscribed = [int(i) for i in json.load(fh)]
+        except Exception as exc:
+            self.logger.exception(f"Failed to load channel registry {self.path}: {exc}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self._subscribed, fh)
+        os.replace(tmp, self.path)
+
+    def ids(self) -> List[int]:
+        """All target channel IDs, de-duplicated, configured ones first."""
+        return list(dict.fromkeys(self.static_ids + self._subscribed))
+
+    def add(self, channel_id: int) -> bool:
+        if channel_id in self:
+            return False
+        self._subscribed.append(int(channel_id))
+        self._save()
+        return True
+
+    def remove(self, channel_id: int) -> bool:
+        if channel_id not in self._subscribed:
+            return False
+        self._subscribed.remove(channel_id)
+        self._save()
+        return True
+
+    def __contains__(self, channel_id: object) -> bool:
+        return channel_id in self.static_ids or channel_id in self._subscribed
+
+    def __len__(self) -> int:
+        return len(self.ids())
+
+
+@dataclass
+class DeliveryReport:
+    """Per-broadcast delivery statistics."""
+
+    targets: int = 0
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    duration_seconds: float = 0.0
+    failures: Dict[int, str] = field(default_factory=dict)
+
+
+class BroadcastService:
+    """Fan one message out to every registered channel.
+
+    - The body is serialized once and reused for every target.
+    - A fixed number of workers drain a queue of channels, each send first
+      taking a token from its route bucket and the global bucket.
+    - Rate-limit headers pre-emptively pause exhausted routes; a 429 pauses
+      the route (or everything, if global) for its retry_after and the
+      channel is re-queued. Transport/5xx errors are retried the same way
+      with backoff; other errors (403, 404, ...) fail that channel only.
+    """
+
+    def __init__(self, config, repo: Optional[DiscordRestRepo] = None):
+        self.logger = get_logger(__name__)
+        self.config = config
+        static_ids = list(getattr(config, "channel_ids", []) or [])
+        if getattr(config, "channel_id", None):
+            static_ids.insert(0, config.channel_id)
+        data_dir = getattr(config, "data_dir", "")
+        self.registry = ChannelRegistry(
+            static_ids,
+            path=os.path.join(data_dir, "broadcast_channels.json") if data_dir else None,
+        )
+        self.repo = repo or DiscordRestRepo(config)
+        self.concurrency = max(1, getattr(config, "broadcast_concurrency", 8))
+        self.max_attempts = max(1, getattr(config, "broadcast_max_attempts", 4))
+        # Discord allows 50 req/s globally and ~5 per 5s per channel route;
+        # a small global burst keeps any one-second window under the limit
+        global_rate = getattr(config, "broadcast_global_rate", 40.0)
+        self.limiter = KeyedRateLimiter(
+            global_rate=global_rate,
+            global_capacity=max(1.0, global_rate / 8),
+            key_rate=1.0,
+            key_capacity=5,
+        )
+        self.last_report: Optional[DeliveryReport] = None
+
+    async def broadcast(
+        self,
+        content: Optional[str] = None,
+        embed: Optional[discord.Embed] = None,
+        channel_ids: Optional[Iterable[int]] = None,
+    ) -> DeliveryReport:
+        """Send `content`/`embed` to `channel_ids` (default: every registered channel)."""
+        targets = list(dict.fromkeys(channel_ids if channel_ids is not None else self.registry.ids()))
+        report = DeliveryReport(targets=len(targets))
+        if not targets:
+            self.logger.warning("No broadcast channels configured; skipping.")
+            self.last_report = report
+            return report
+
+        body = self.repo.encode_message(content, embed.to_dict() if embed is not None else None)
+        queue: asyncio.Queue = asyncio.Queue()
+        for channel_id in targets:
+            queue.put_nowait((channel_id, 1))
+
+        started = time.perf_counter()
+        with span("broadcast.total"):
+            await asyncio.gather(*(self._worker(queue, body, report) for _ in range(min(self.concurrency, len(targets)))))
+        report.duration_seconds = time.perf_counter() - started
+        self.last_report = report
+        self.logger.info(
+            f"Broadcast delivered {report.sent}/{report.targets} in {report.duration_seconds:.2f}s "
+            f"(retries={report.retries}, rate_limited={report.rate_limited}, failed={report.failed})"
+        )
+        return report
+
+    async def _worker(self, queue: asyncio.Queue, body: bytes, report: DeliveryReport) -> None:
+        while True:
+            try:
+                channel_id, attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            route = channel_id
+            await self.limiter.acquire(route)
+            with span("discord.send", target="broadcast"):
+                result = await self.repo.post_message(channel_id, body)
+            self.limiter.update(route, result.remaining, result.reset_after)
+
+            if result.ok:
+                report.sent += 1
+                metrics.counter("broadcast_messages_total", status="sent").inc()
+                continue
+
+            if result.status == 429:
+                report.rate_limited += 1
+                metrics.counter("broadcast_rate_limited_total", scope="global" if result.is_global else "route").inc()
+                self.limiter.pause(route, result.retry_after, is_global=result.is_global)
+            elif result.status in RETRYABLE:
+                self.limiter.pause(route, min(2 ** attempt, 30))
+
+            if (result.status == 429 or result.status in RETRYABLE) and attempt < self.max_attempts:
+                report.retries += 1
+                queue.put_nowait((channel_id, attempt + 1))
+                continue
+
+            report.failed += 1
+            report.failures[channel_id] = f"{result.status} {result.error}".strip()
+            metrics.counter("broadcast_messages_total", status="failed").inc()
+            self.logger.warning(f"Broadcast to channel {channel_id} failed: {report.failures[channel_id]}")
+
+    async def close(self) -> None:
+        await self.repo.close()
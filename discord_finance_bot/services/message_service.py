@@ -1,9 +1,44 @@
+import asyncio
+import discord
+import os
+from dataclasses import dataclass
 from services.alphavantage_service import AlphaVantageService
+from services.breakout_service import BreakoutService
+from services.price_history_service import PriceHistoryService
+from services.sector_history_service import SectorHistoryService
+from services.watchlist_service import WatchlistService
 from services.web_crawler_service import WebCrawlerService
+from utils.data_parser import to_markdown_table
+from utils.logger import get_logger
+from utils.metrics import span, timed
+from utils.single_flight import SingleFlight
+from utils.source_guard import LastGoodStore, SourceGuard, SourceResult
 from zoneinfo import ZoneInfo
+from typing import Awaitable, Callable, Dict, List, Optional
 import datetime as dt
 
 
+# Sector rows shown in the summary (a full crawl still records and ranks all of them)
+SUMMARY_SECTOR_ROWS = 10
+# Breakout rows in the text summary (the embed and JSON keep every candidate)
+SUMMARY_TEXT_BREAKOUT_ROWS = 5
+# Seconds each summary source may take before its last good data is served
+DEFAULT_SOURCE_BUDGETS = {"sectors": 45.0, "earnings": 20.0, "ipos": 20.0, "watchlist": 20.0}
+
+
+# Pre-rendered daily summary served to commands and scheduled pushes
+@dataclass
+class SummarySnapshot:
+    version: int
+    created_at: dt.datetime
+    payload: dict
+    text: str
+    embed: discord.Embed
+
+    def age_seconds(self) -> float:
+        return (dt.datetime.now(dt.timezone.utc) - self.created_at).total_seconds()
+
+
 class MessageService:
     """Generate Discord messages and JSON payloads for n8n integration.
 
@@ -14,7 +49,45 @@ class MessageService:
     def __init__(self, config):
         self.alpha_service = AlphaVantageService(config)
         self.web_crawler_service = WebCrawlerService(config)
+        self.watchlist_service = WatchlistService(config, self.alpha_service)
+        self.price_history_service = PriceHistoryService(config, self.alpha_service)
+        self.sector_history_service = SectorHistoryService(config)
+        self.breakout_service = BreakoutService(config, self.price_history_service, self.sector_history_service)
         self.config = config
+        self.logger = get_logger(__name__)
+        self._snapshot: Optional[SummarySnapshot] = None
+        # Each summary source runs under a deadline and breaker, falling back to its last good data
+        budgets = {**DEFAULT_SOURCE_BUDGETS, **(getattr(config, "summary_source_budgets", None) or {})}
+        self.last_good = LastGoodStore(os.path.join(getattr(config, "data_dir", "") or "data", "last_good.json"))
+        self.sources: Dict[str, SourceGuard] = {
+            name: SourceGuard(
+                name,
+                budget=budgets[name],
+                store=self.last_good,
+                # An empty sector list or watchlist means the fetch failed; calendars may be empty
+                empty_is_failure=name == "sectors" or (name == "watchlist" and bool(config.selected_stocks)),
+                failure_threshold=getattr(config, "circuit_failure_threshold", 3),
+                reset_seconds=getattr(config, "circuit_reset_seconds", 300),
+                default=[],
+            )
+            for name in DEFAULT_SOURCE_BUDGETS
+        }
+        self._snapshot_flight = SingleFlight()
+        # Concurrent summary requests share one build; results stay reusable briefly
+        self._summary_flight = SingleFlight(
+            fresh_seconds=getattr(config, "summary_fresh_seconds", 300),
+            error_seconds=getattr(config, "summary_error_seconds", 30),
+        )
+
+    async def start(self) -> None:
+        """Start long-lived resources (e.g. the shared browser) used by data sources."""
+        await self.web_crawler_service.start()
+
+    async def close(self) -> None:
+        """Release long-lived resources held by data sources."""
+        await self.web_crawler_service.close()
+        await self.alpha_service.close()
+        self.sector_history_service.close()
 
     def generate_daily_summary_json(self):
         """Return standardized JSON payload consumable by n8n workflows."""
@@ -35,32 +108,156 @@ class MessageService:
             "dates": [d.isoformat() for d in dates],
         }
 
-    async def generate_daily_summary_json_async(self):
-        """Async version returning standardized JSON payload for n8n/Discord flows."""
-        # fetch top sector details via async crawler service
-        top_sectors_details = await self.web_crawler_service.get_top_sectors_details_async()
-
-        # Compute today/tomorrow/day-after in configured timezone
+    def _summary_dates(self) -> List[dt.date]:
+        """Return today/tomorrow/day-after in the configured timezone."""
         today = dt.datetime.now(ZoneInfo(self.config.timezone)).date()
-        dates = [today, today + dt.timedelta(days=1), today + dt.timedelta(days=2)]
+        return [today, today + dt.timedelta(days=1), today + dt.timedelta(days=2)]
 
-        # AlphaVantage calls remain synchronous
-        earnings = self.alpha_service.get_week_earnings_for_dates(dates)
-        ipos = self.alpha_service.get_week_ipos_for_dates(dates)
-        print(top_sectors_details)
+    async def generate_daily_summary_json_async(self, force: bool = False):
+        """Async version returning standardized JSON payload for n8n/Discord flows.
+
+        Concurrent callers (commands, scheduled jobs) share a single in-flight
+        build, and a finished payload is reused for `summary_fresh_seconds`
+        unless `force` is set.
+        """
+        dates = self._summary_dates()
+        key = tuple(d.isoformat() for d in dates)
+        return await self._summary_flight.do(
+            key, lambda: self._build_daily_summary_json_async(dates), force=force
+        )
+
+    async def _guarded_source(self, name: str, fetch: Callable[[], Awaitable[list]]) -> SourceResult:
+        with span("summary.source", source=name):
+            return await self.sources[name].call(fetch)
+
+    @timed("summary.build")
+    async def _build_daily_summary_json_async(self, dates: List[dt.date]) -> dict:
+        # Sector scrape, both AlphaVantage calendars and watchlist quotes run concurrently,
+        # each bounded by its budget, so the slowest upstream cannot hold the summary back
+        fetch_sectors = (
+            self.web_crawler_service.get_all_sectors_async
+            if getattr(self.config, "crawler_full_crawl", False)
+            else lambda: self.web_crawler_service.get_top_sectors_details_async(limit=SUMMARY_SECTOR_ROWS)
+        )
+        results = dict(
+            zip(
+                ("sectors", "earnings", "ipos", "watchlist"),
+                await asyncio.gather(
+                    self._guarded_source("sectors", fetch_sectors),
+                    self._guarded_source("earnings", lambda: self.alpha_service.get_week_earnings_for_dates_async(dates)),
+                    self._guarded_source("ipos", lambda: self.alpha_service.get_week_ipos_for_dates_async(dates)),
+                    self._guarded_source("watchlist", self.watchlist_service.get_quotes),
+                ),
+            )
+        )
+        all_sectors, earnings, ipos, watchlist = (results[name].value for name in ("sectors", "earnings", "ipos", "watchlist"))
+        if not results["sectors"].stale:
+            # Every scrape is kept, so trend queries never need to scrape again
+            self.sector_history_service.record(all_sectors)
+        breakouts = self._scan_breakouts(all_sectors, watchlist)
+        top_sectors_details = all_sectors[:SUMMARY_SECTOR_ROWS]
+        self.logger.debug(
+            f"Summary built: {len(top_sectors_details)} sectors, {len(earnings)} earnings, "
+            f"{len(ipos)} IPOs, {len(breakouts)} breakouts"
+        )
         return {
             "top_sectors_details": top_sectors_details,
             "earnings": earnings,
             "ipos": ipos,
+            "watchlist": [self.format_quote(q) for q in watchlist],
+            "breakouts": [self.format_breakout(b) for b in breakouts],
             "dates": [d.isoformat() for d in dates],
+            # Source -> when its (last good) data was fetched, for sections served from fallback
+            "stale_sources": {
+                name: result.as_of.isoformat() if result.as_of else ""
+                for name, result in results.items()
+                if result.stale
+            },
         }
 
-    def generate_daily_summary_text(self) -> str:
-        """Return human-readable markdown text for Discord messages."""
-        payload = self.generate_daily_summary_json()
+    @staticmethod
+    def format_quote(quote: dict) -> dict:
+        """Format a numeric quote row for tables and JSON output."""
+        price, change, pct, volume = (quote.get(k) for k in ("price", "change", "change_pct", "volume"))
+        return {
+            "symbol": quote.get("symbol", ""),
+            "price": f"{price:.2f}" if price is not None else "",
+            "change": f"{change:+.2f}" if change is not None else "",
+            "change_pct": f"{pct:+.2f}%" if pct is not None else "",
+            "volume": f"{int(volume):,}" if volume is not None else "",
+            "as_of": quote.get("as_of", ""),
+        }
 
-        # Compose additional tables for earnings and IPOs
-        from utils.data_parser import to_markdown_table
+    def _scan_breakouts(self, top_sectors_details: List[dict], quotes: List[dict]) -> List[dict]:
+        # Local arrays only; a failed scan drops the section instead of the summary
+        try:
+            return self.breakout_service.scan(top_sectors_details, quotes)
+        except Exception as exc:
+            self.logger.exception(f"Breakout scan failed: {exc}")
+            return []
+
+    async def update_sector_members(self) -> int:
+        """Scrape the top sectors' constituents into the breakout sector map.
+
+        Uses the current snapshot's sector ranking when there is one;
+        returns the number of sectors updated.
+        """
+        top = getattr(self.config, "crawler_drilldown_sectors", 0)
+        if top <= 0:
+            return 0
+        names = None
+        if self._snapshot is not None:
+            names = [s["name"] for s in self._snapshot.payload.get("top_sectors_details", [])[:top]]
+        constituents = await self.web_crawler_service.get_sector_constituents_async(names, top=top)
+        members = {name: [row["symbol"] for row in rows] for name, rows in constituents.items() if rows}
+        if members:
+            self.breakout_service.sectors.update(members)
+        return len(members)
+
+    @staticmethod
+    def format_breakout(hit: dict) -> dict:
+        """Format a ranked breakout candidate for tables and JSON output."""
+        momentum = hit.get("sector_momentum_pct")
+        return {
+            "symbol": hit["symbol"],
+            "price": f"{hit['price']:.2f}",
+            "prior_high": f"{hit['prior_high']:.2f}",
+            "breakout_pct": f"{hit['breakout_pct']:+.2f}%",
+            "volume_ratio": f"{hit['volume_ratio']:.1f}x",
+            "change_pct": f"{hit['change_pct']:+.2f}%",
+            "sector": hit.get("sector", ""),
+            "sector_rank": hit.get("sector_rank") or "",
+            "sector_change_pct": hit.get("sector_change_pct", ""),
+            "sector_momentum_pct": f"{momentum:+.2f}%" if momentum is not None else "",
+            "intraday": hit.get("live", False),
+        }
+
+    @staticmethod
+    def render_watchlist_text(rows: List[dict]) -> str:
+        """Render formatted quote rows as a markdown table."""
+        return to_markdown_table(rows, ["symbol", "price", "change", "change_pct", "volume"])
+
+    async def get_watchlist_async(self) -> List[dict]:
+        """Formatted quotes for the configured watchlist (stale symbols refreshed first)."""
+        return [self.format_quote(q) for q in await self.watchlist_service.get_quotes()]
+
+    @staticmethod
+    def format_stale_note(payload: dict) -> str:
+        """Sections served from last good data and when it was fetched, or ""."""
+        stale = payload.get("stale_sources") or {}
+        parts = []
+        for name, as_of in stale.items():
+            if as_of:
+                when = dt.datetime.fromisoformat(as_of).astimezone(dt.timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+                parts.append(f"{name} (as of {when})")
+            else:
+                parts.append(f"{name} (unavailable)")
+        return ", ".join(parts)
+
+    @staticmethod
+    @timed("render.text")
+    def render_daily_summary_text(payload: dict) -> str:
+        """Render a summary payload as human-readable markdown text."""
         earnings_tbl = to_markdown_table(
             payload.get("earnings", []),
             ["symbol", "name", "reportDate", "estimateEPS", "estimateCurrency"],
@@ -86,48 +283,130 @@ class MessageService:
             ],
         )
 
+        watchlist_tbl = MessageService.render_watchlist_text(payload.get("watchlist") or [])
+        breakouts_tbl = to_markdown_table(
+            (payload.get("breakouts") or [])[:SUMMARY_TEXT_BREAKOUT_ROWS],
+            ["symbol", "price", "prior_high", "breakout_pct", "volume_ratio", "sector", "sector_change_pct", "sector_momentum_pct"],
+        )
+
+        stale_note = MessageService.format_stale_note(payload)
         return (
+            (f"⚠️ Stale data: {stale_note}\n\n" if stale_note else "")
+            + f"👀 Watchlist\n{watchlist_tbl}\n\n"
+            f"📈 Breakouts\n{breakouts_tbl}\n\n"
             f"🔥 Top Sector Details\n{sectors_details_tbl}\n\n"
             f"📅 Earnings & IPOs for {dates_str}\n\n"
             f"🧾 Earnings\n{earnings_tbl}\n\n"
             f"🆕 IPOs\n{ipos_tbl}"
         )
 
+    @staticmethod
+    @timed("render.embed")
+    def build_daily_summary_embed(data: dict) -> discord.Embed:
+        """Convert JSON data into a Discord Embed (with sector table)."""
+        embed = discord.Embed(
+            title="📊 Daily Market Summary",
+            description=f"Market summary for {data.get('dates', ['N/A'])[-1]}",
+            color=discord.Color.blue()
+        )
+
+        # --- Earnings section ---
+        earnings = data.get("earnings", [])
+        if earnings:
+            top_earnings = earnings[:5]
+            earnings_text = "\n".join(
+                [f"**{e['symbol']}** – {e['name']} ({e['reportDate']})"
+                 for e in top_earnings]
+            )
+            embed.add_field(name="🧾 Upcoming Earnings", value=earnings_text, inline=False)
+
+        # --- IPO section ---
+        ipos = data.get("ipos", [])
+        if ipos:
+            ipo_text = "\n".join(
+                [f"**{i['symbol']}** – {i['name']} ({i['ipoDate']})"
+                 for i in ipos]
+            )
+            embed.add_field(name="🚀 Upcoming IPOs", value=ipo_text, inline=False)
+
+        # --- Top Sector section ---
+        sectors = data.get("top_sectors_details", [])
+        if sectors:
+            table = "```text\n"
+            table += f"{'Sector':<10}{'Change':<8}{'Leader':<22}{'Leader %':<8}\n"
+            table += "-" * 50 + "\n"
+            for s in sectors[:8]:  # Limit to 8 rows to avoid overly long embed
+                name = (s['name'][:9] + '…') if len(s['name']) > 9 else s['name']
+                leader = (s['leader_stock'][:20] + '…') if len(s['leader_stock']) > 20 else s['leader_stock']
+                table += f"{name:<10}{s['change_pct']:<8}{leader:<22}{s['leader_change_pct']:<8}\n"
+            table += "```"
+            embed.add_field(name="🏭 Top Sectors", value=table, inline=False)
+
+        # --- Watchlist section ---
+        watchlist = data.get("watchlist", [])
+        if watchlist:
+            table = "```text\n"
+            table += f"{'Symbol':<8}{'Price':>10}{'Change %':>10}\n"
+            for q in watchlist[:15]:  # Embed field values are capped at 1024 chars
+                table += f"{q['symbol']:<8}{q['price']:>10}{q['change_pct']:>10}\n"
+            table += "```"
+            embed.add_field(name="👀 Watchlist", value=table, inline=False)
+
+        # --- Breakout section ---
+        breakouts = data.get("breakouts", [])
+        if breakouts:
+            table = "```text\n"
+            table += f"{'Symbol':<8}{'Price':>9}{'Brk %':>8}{'Vol':>6}  {'Sector':<10}\n"
+            for b in breakouts[:10]:
+                sector = (b['sector'][:9] + '…') if len(b['sector']) > 9 else b['sector']
+                table += f"{b['symbol']:<8}{b['price']:>9}{b['breakout_pct']:>8}{b['volume_ratio']:>6}  {sector:<10}\n"
+            table += "```"
+            embed.add_field(name="📈 Breakouts", value=table, inline=False)
+
+        stale_note = MessageService.format_stale_note(data)
+        if stale_note:
+            embed.add_field(name="⚠️ Stale data", value=stale_note[:1024], inline=False)
+
+        embed.set_footer(text="Data source: your API provider")
+        return embed
+
+    def generate_daily_summary_text(self) -> str:
+        """Return human-readable markdown text for Discord messages."""
+        return self.render_daily_summary_text(self.generate_daily_summary_json())
+
     async def generate_daily_summary_text_async(self) -> str:
         """Async version returning human-readable markdown text for Discord messages."""
-        payload = await self.generate_daily_summary_json_async()
+        return self.render_daily_summary_text(await self.generate_daily_summary_json_async())
 
-        # Compose additional tables for earnings and IPOs
-        from utils.data_parser import to_markdown_table
-        earnings_tbl = to_markdown_table(
-            payload.get("earnings", []),
-            ["symbol", "name", "reportDate", "estimateEPS", "estimateCurrency"],
-        )
-        ipos_tbl = to_markdown_table(
-            payload.get("ipos", []),
-            ["symbol", "name", "ipoDate", "priceRange", "currency"],
-        )
-
-        dates_str = ", ".join(payload.get("dates", []))
-        sectors_details = payload.get("top_sectors_details") or []
-        sectors_details_tbl = to_markdown_table(
-            sectors_details,
-            [
-                "name",
-                "change_pct",
-                "leader_stock",
-                "leader_change_pct",
-                "up_count",
-                "unchanged_count",
-                "down_count",
-            ],
-        )
+    async def refresh_snapshot(self, force: bool = False) -> SummarySnapshot:
+        """Build a new summary snapshot (payload + rendered text and embed)."""
+        return await self._snapshot_flight.do("snapshot", lambda: self._build_snapshot(force))
 
-        return (
-            f"🔥 Top Sector Details\n{sectors_details_tbl}\n\n"
-            f"📅 Earnings & IPOs for {dates_str}\n\n"
-            f"🧾 Earnings\n{earnings_tbl}\n\n"
-            f"🆕 IPOs\n{ipos_tbl}"
+    async def _build_snapshot(self, force: bool) -> SummarySnapshot:
+        payload = await self.generate_daily_summary_json_async(force=force)
+        created_at = dt.datetime.now(dt.timezone.utc)
+        embed = self.build_daily_summary_embed(payload)
+        embed.timestamp = created_at
+        version = (self._snapshot.version + 1) if self._snapshot else 1
+        self._snapshot = SummarySnapshot(
+            version=version,
+            created_at=created_at,
+            payload=payload,
+            text=self.render_daily_summary_text(payload),
+            embed=embed,
         )
+        return self._snapshot
 
-
+    async def get_snapshot(self, max_age: Optional[float] = None, force: bool = False) -> SummarySnapshot:
+        """Return the current snapshot, rebuilding it when missing, forced,
+        older than `max_age` seconds, or built for a previous day."""
+        snapshot = self._snapshot
+        current_dates = [d.isoformat() for d in self._summary_dates()]
+        if (
+            force
+            or snapshot is None
+            or snapshot.payload.get("dates") != current_dates
+            or (max_age is not None and snapshot.age_seconds() > max_age)
+        ):
+            snapshot = await self.refresh_snapshot(force=force)
+        return snapshot
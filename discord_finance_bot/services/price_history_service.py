@@ -0,0 +1,84 @@
+import asyncio
+import datetime as dt
+import os
+from typing import Dict, Iterable, List, Optional
+from repositories.alphavantage_repo import COMPACT_BARS
+from repositories.ohlcv_store import OHLCVStore
+from services.alphavantage_service import AlphaVantageService
+from utils.bars import Bars
+from utils.logger import get_logger
+from utils.metrics import metrics, span
+from utils.request_scheduler import PRIORITY_BACKFILL, request_context
+
+
+# A compact (100-bar) download still covers gaps up to roughly this many calendar days
+COMPACT_MAX_GAP_DAYS = COMPACT_BARS * 7 // 5 - 10
+
+
+def last_completed_session(today: dt.date) -> dt.date:
+    """Most recent weekday before `today` (exchange holidays are not modelled)."""
+    day = today - dt.timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= dt.timedelta(days=1)
+    return day
+
+
+class PriceHistoryService:
+    """Keep daily OHLCV history for tracked symbols in the columnar store.
+
+    `update()` downloads only what is missing: symbols already holding the
+    last completed session are skipped, short gaps use the compact series
+    and only new bars are appended. New symbols and long gaps also use the
+    compact series, since free keys get a premium notice for "full"; set
+    `history_full_backfill` on premium keys to download the whole series.
+    Downloads run at backfill priority so they never take request budget
+    from summaries or commands.
+    """
+
+    def __init__(self, config, alpha_service: AlphaVantageService):
+        self.logger = get_logger(__name__)
+        self.alpha_service = alpha_service
+        data_dir = getattr(config, "data_dir", "") or "data"
+        self.store = OHLCVStore(os.path.join(data_dir, "ohlcv"))
+        self.symbols = list(dict.fromkeys(s.strip().upper() for s in config.selected_stocks if s.strip()))
+        self.full_backfill = getattr(config, "history_full_backfill", False)
+
+    async def update(self, symbols: Optional[Iterable[str]] = None, today: Optional[dt.date] = None) -> Dict[str, int]:
+        """Append missing bars for `symbols` (default: the watchlist); return bars added per symbol."""
+        symbols = list(symbols) if symbols is not None else self.symbols
+        today = today or dt.date.today()
+        with span("history.update"), request_context(PRIORITY_BACKFILL):
+            added = await asyncio.gather(*(self._update_one(s, today) for s in symbols))
+        result = dict(zip(symbols, added))
+        metrics.counter("history_bars_appended_total").inc(sum(result.values()))
+        return result
+
+    async def _update_one(self, symbol: str, today: dt.date) -> int:
+        last = self.store.last_date(symbol)
+        if last is not None and last >= last_completed_session(today):
+            return 0
+        short_gap = last is not None and (today - last).days <= COMPACT_MAX_GAP_DAYS
+        outputsize = "full" if self.full_backfill and not short_gap else "compact"
+        try:
+            bars = await self.alpha_service.get_daily_bars_async(symbol, outputsize=outputsize)
+            if bars is None:
+                return 0
+            return self.store.append(symbol, bars)
+        except Exception as exc:
+            self.logger.exception(f"Failed to update price history for {symbol}: {exc}")
+            return 0
+
+    def bars(self, symbol: str, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> Bars:
+        """Zero-copy view of stored bars for `symbol` between `start` and `end`."""
+        return self.store.bars(symbol, start, end)
+
+    def universe(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Bars]:
+        """Memory-mapped bars for `symbols` (default: every stored symbol)."""
+        return self.store.load_universe(symbols)
+
+    def last_date(self, symbol: str) -> Optional[dt.date]:
+        """Date of the newest stored bar for `symbol` (None without history)."""
+        return self.store.last_date(symbol)
+
+    def stored_symbols(self) -> List[str]:
+        return self.store.symbols()
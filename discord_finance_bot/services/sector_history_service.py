@@ -0,0 +1,99 @@
+import datetime as dt
+import os
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+from repositories.sector_history_repo import SectorHistoryRepo
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+
+def market_session(at: dt.datetime) -> str:
+    """US session a scrape at `at` reflects: the New York date, weekends rolled back to Friday."""
+    day = at.astimezone(MARKET_TZ).date()
+    while day.weekday() >= 5:
+        day -= dt.timedelta(days=1)
+    return day.isoformat()
+
+
+class SectorHistoryService:
+    """Record every sector scrape and answer trend questions from the history.
+
+    Backed by `SectorHistoryRepo` (SQLite at DATA_DIR/sector_history.sqlite3),
+    so rank changes, multi-session momentum and leader streaks need no new
+    scraping.
+    """
+
+    def __init__(self, config):
+        self.logger = get_logger(__name__)
+        data_dir = getattr(config, "data_dir", "") or "data"
+        self.repo = SectorHistoryRepo(os.path.join(data_dir, "sector_history.sqlite3"))
+
+    def close(self) -> None:
+        self.repo.close()
+
+    def record(self, sectors: List[Dict[str, Any]], at: Optional[dt.datetime] = None) -> Optional[int]:
+        """Append a scrape's rows (in rank order); empty scrapes are not recorded."""
+        if not sectors:
+            return None
+        at = at or dt.datetime.now(dt.timezone.utc)
+        try:
+            scrape_id = self.repo.record(sectors, at.astimezone(dt.timezone.utc).isoformat(timespec="seconds"), market_session(at))
+        except Exception as exc:
+            self.logger.exception(f"Failed to record sector snapshot: {exc}")
+            return None
+        metrics.counter("sector_snapshots_recorded_total").inc()
+        return scrape_id
+
+    def find(self, query: str) -> Optional[str]:
+        names = self.repo.find_names(query.strip(), limit=1)
+        return names[0] if names else None
+
+    def history(self, name: str, sessions: int = 20) -> List[Dict[str, Any]]:
+        return self.repo.history(name, sessions)
+
+    def momentum(self, sessions: int = 5, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.repo.momentum(sessions, limit)
+
+    def momentum_by_name(self, sessions: int = 5) -> Dict[str, Dict[str, Any]]:
+        """Momentum rows of every recently ranked sector, keyed by name."""
+        return {row["name"]: row for row in self.repo.momentum(sessions, limit=-1)}
+
+    def rank_changes(self) -> List[Dict[str, Any]]:
+        return self.repo.rank_changes()
+
+    @staticmethod
+    def leader_streak(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Current leader and the consecutive latest sessions it has led (history oldest first)."""
+        leader, days = "", 0
+        for row in reversed(history):
+            if not row.get("leader_stock") or (leader and row["leader_stock"] != leader):
+                break
+            leader = row["leader_stock"]
+            days += 1
+        return {"leader_stock": leader, "days": days}
+
+    def sector_report(self, name: str, sessions: int = 20) -> Dict[str, Any]:
+        """History, momentum and leader streak of one sector."""
+        history = self.history(name, sessions)
+        ranked = [row for row in history if row["rank"] is not None]
+
+        def change_over(n: int) -> float:
+            return sum(row["change_pct"] or 0.0 for row in history[-n:] if row["rank"] is not None)
+
+        latest = history[-1] if history else {}
+        previous = history[-2] if len(history) > 1 else {}
+        return {
+            "name": name,
+            "sessions": len(history),
+            "days_ranked": len(ranked),
+            "rank": latest.get("rank"),
+            "previous_rank": previous.get("rank"),
+            "change_pct": latest.get("change_pct"),
+            "momentum_5d_pct": change_over(5),
+            "momentum_20d_pct": change_over(20),
+            "leader": self.leader_streak(history),
+            "history": history,
+        }
@@ -0,0 +1,130 @@
+import asyncio
+from typing import Callable, Dict, Iterable, List
+from repositories.alphavantage_repo import BULK_QUOTE_LIMIT
+from services.alphavantage_service import AlphaVantageService
+from utils.logger import get_logger
+from utils.metrics import metrics, span
+from utils.quote_table import QuoteTable
+from utils.request_scheduler import PRIORITY_BACKFILL, request_context
+from utils.single_flight import SingleFlight
+
+
+class WatchlistService:
+    """Keep latest quotes for `config.selected_stocks` in a `QuoteTable`.
+
+    A refresh only re-requests symbols older than `quote_max_age_seconds`.
+    With `quote_bulk_endpoint` (premium keys) they are fetched in
+    REALTIME_BULK_QUOTES batches of up to 100 symbols; symbols a batch did
+    not return, or every symbol without bulk access, use per-symbol
+    GLOBAL_QUOTE calls at backfill priority. A "premium endpoint" answer
+    turns bulk requests off until restart. Concurrent refreshes share one
+    in-flight run.
+
+    Other services can `watch()` extra symbols, which are refreshed along
+    with the watchlist but not listed in it, and `add_listener()` to receive
+    every batch of stored quotes.
+    """
+
+    # Per-symbol fallbacks queue behind everything else and give up after this long;
+    # symbols left stale are picked up by the next refresh
+    FALLBACK_DEADLINE_SECONDS = 20
+
+    def __init__(self, config, alpha_service: AlphaVantageService):
+        self.logger = get_logger(__name__)
+        self.alpha_service = alpha_service
+        self.symbols = list(dict.fromkeys(s.strip().upper() for s in config.selected_stocks if s.strip()))
+        self.max_age = getattr(config, "quote_max_age_seconds", 300)
+        self.batch_size = max(1, min(BULK_QUOTE_LIMIT, getattr(config, "quote_batch_size", BULK_QUOTE_LIMIT)))
+        self.extra_symbols: List[str] = []
+        self.table = QuoteTable()
+        self._listeners: List[Callable[[List[Dict[str, object]]], None]] = []
+        # Cleared for good once the key turns out to lack the premium bulk endpoint
+        self._use_bulk = bool(getattr(config, "quote_bulk_endpoint", False))
+        self._refresh_flight = SingleFlight()
+
+    def watch(self, symbols: Iterable[str]) -> None:
+        """Also keep quotes fresh for `symbols` (not shown in the watchlist)."""
+        known = set(self.symbols) | set(self.extra_symbols)
+        for symbol in symbols:
+            symbol = symbol.strip().upper()
+            if symbol and symbol not in known:
+                self.extra_symbols.append(symbol)
+                known.add(symbol)
+
+    def unwatch(self, symbols: Iterable[str]) -> None:
+        """Stop refreshing `symbols` added by `watch()` (watchlist symbols stay)."""
+        dropped = {s.strip().upper() for s in symbols}
+        self.extra_symbols = [s for s in self.extra_symbols if s not in dropped]
+
+    @property
+    def uses_bulk(self) -> bool:
+        return self._use_bulk
+
+    def tracked(self) -> List[str]:
+        return self.symbols + self.extra_symbols
+
+    def add_listener(self, listener: Callable[[List[Dict[str, object]]], None]) -> None:
+        """Call `listener(quotes)` with each batch of quotes stored by a refresh."""
+        self._listeners.append(listener)
+
+    async def refresh(self, force: bool = False) -> int:
+        """Refresh stale symbols (all with `force`); return how many were updated."""
+        return await self._refresh_flight.do("refresh", lambda: self._refresh(force))
+
+    async def _refresh(self, force: bool) -> int:
+        tracked = self.tracked()
+        pending = tracked if force else self.table.stale(tracked, self.max_age)
+        if not pending:
+            return 0
+        with span("watchlist.refresh"):
+            updated = 0
+            if self._use_bulk:
+                batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+                results = await asyncio.gather(*(self.alpha_service.get_bulk_quotes_async(b) for b in batches))
+                if any(r is None for r in results):
+                    self.logger.warning("REALTIME_BULK_QUOTES is a premium endpoint for this key; using GLOBAL_QUOTE until restart.")
+                    self._use_bulk = False
+                quotes = [q for batch in results if batch for q in batch]
+                updated += self._store(quotes)
+                returned = {q["symbol"] for q in quotes}
+                pending = [s for s in pending if s not in returned]
+            if pending:
+                updated += await self._refresh_each(pending)
+        metrics.counter("watchlist_quotes_updated_total").inc(updated)
+        return updated
+
+    async def _refresh_each(self, symbols: List[str]) -> int:
+        # All symbols are queued at once: the request budget paces them and the
+        # pooled session caps connections, and every deadline starts together
+        with request_context(PRIORITY_BACKFILL, deadline=self.FALLBACK_DEADLINE_SECONDS):
+            quotes = await asyncio.gather(*(self.alpha_service.get_global_quote_async(s) for s in symbols))
+        return self._store([q for q in quotes if q is not None])
+
+    def _store(self, quotes: List[Dict[str, object]]) -> int:
+        wanted = set(self.tracked())
+        stored = []
+        for quote in quotes:
+            symbol = str(quote["symbol"])
+            if symbol not in wanted:
+                continue
+            self.table.upsert(
+                symbol,
+                as_of=str(quote.get("as_of") or ""),
+                **{k: quote.get(k) for k in ("price", "change", "change_pct", "volume", "previous_close")},
+            )
+            stored.append(quote)
+        for listener in self._listeners if stored else ():
+            try:
+                listener(stored)
+            except Exception as exc:
+                self.logger.exception(f"Quote listener failed: {exc}")
+        return len(stored)
+
+    async def get_quotes(self, refresh: bool = True) -> List[Dict[str, object]]:
+        """Quotes for the watchlist in configured order, refreshing stale ones first."""
+        if refresh:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                self.logger.exception(f"Watchlist refresh failed: {exc}")
+        return self.table.rows(self.symbols)
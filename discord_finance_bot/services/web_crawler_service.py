@@ -12,15 +12,34 @@ class WebCrawlerService:
         self.repo = WebCrawlerRepo(config)
         self.config = config
 
+    async def start(self) -> None:
+        await self.repo.start()
+
+    async def close(self) -> None:
+        await self.repo.close()
+
     def get_top_sectors_names(self, url: Optional[str] = None, limit: int = 5) -> List[str]:
         return self.repo.fetch_top_sectors_names(url=url, limit=limit)
 
     def get_top_sectors_details(self, url: Optional[str] = "https://www.moomoo.com/hans/quote/us/concepts", limit: int = 5) -> List[Dict]:
         return self.repo.fetch_top_sectors_details(url=url, limit=limit)
 
-    async def get_top_sectors_details_async(self, url: Optional[str] = "https://www.moomoo.com/hans/quote/us/concepts", limit: int = 10) -> List[Dict]:
+    async def get_top_sectors_details_async(self, url: Optional[str] = None, limit: int = 10) -> List[Dict]:
         return await self.repo.fetch_top_sectors_details_async(url=url, limit=limit)
 
+    async def get_all_sectors_async(self, url: Optional[str] = None) -> List[Dict]:
+        """Every sector across all pages of the concepts list, ranked by change."""
+        return await self.repo.fetch_all_sectors_async(url=url)
+
+    async def get_sector_constituents_async(self, names: Optional[List[str]] = None, top: int = 5) -> Dict[str, List[Dict]]:
+        """Sector name -> constituent rows (symbol, name, price, change_pct).
+
+        Without `names`, drills into the `top` sectors of a fresh scrape.
+        """
+        if names is None:
+            names = [s["name"] for s in await self.get_top_sectors_details_async(limit=top) if s.get("name")]
+        return await self.repo.fetch_sector_constituents_async(names)
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+"""Run from the `discord_finance_bot` directory: python -m pytest -q test/test_alert_index.py"""
+from utils.alert_index import AlertIndex, AlertRule
+
+
+def fired(triggers):
+    return [t.rule.id for t in triggers]
+
+
+def test_price_crossing_fires_once_within_cooldown():
+    index = AlertIndex(cooldown=60.0)
+    index.add(AlertRule(1, "AAPL", "above", 100.0))
+
+    # The first quote only sets the price a crossing is measured from
+    assert index.on_quote("AAPL", 99.0, now=0.0) == []
+    assert fired(index.on_quote("AAPL", 101.0, now=1.0)) == [1]
+    # Staying above is not a new crossing
+    assert index.on_quote("AAPL", 102.0, now=2.0) == []
+    # Falling back and crossing again inside the cooldown stays quiet
+    assert index.on_quote("AAPL", 98.0, now=3.0) == []
+    assert index.on_quote("AAPL", 101.0, now=4.0) == []
+    # After the cooldown the next crossing fires again
+    index.on_quote("AAPL", 98.0, now=70.0)
+    assert fired(index.on_quote("AAPL", 101.0, now=71.0)) == [1]
+
+
+def test_below_fires_on_falling_crossing_only():
+    index = AlertIndex(cooldown=0.0)
+    index.add(AlertRule(1, "AAPL", "below", 50.0))
+    index.on_quote("AAPL", 55.0, now=0.0)
+    assert fired(index.on_quote("AAPL", 50.0, now=1.0)) == [1]
+    assert index.on_quote("AAPL", 60.0, now=2.0) == []
+
+
+def test_ma_threshold_is_mean_of_previous_closes():
+    index = AlertIndex(cooldown=0.0)
+    index.add(AlertRule(1, "AAPL", "ma_above", 5))
+    closes = [10.0, 11.0, 12.0, 13.0, 14.0, 15.0]
+    sessions = [f"2026-01-0{d}" for d in range(1, 7)]
+    index.seed("AAPL", sessions, closes, [1000.0] * len(closes))
+
+    # MA5 including today's price p crosses p exactly when p crosses mean(last 4 closes)
+    expected = sum(closes[-4:]) / 4
+    assert index.threshold(1) == expected
+    index.on_quote("AAPL", expected - 1, now=0.0)
+    assert fired(index.on_quote("AAPL", expected + 1, now=1.0)) == [1]
+
+
+def test_ma_rule_waits_for_enough_history():
+    index = AlertIndex()
+    index.add(AlertRule(1, "AAPL", "ma_below", 5))
+    index.seed("AAPL", ["2026-01-01", "2026-01-02"], [10.0, 11.0], [1.0, 1.0])
+    assert index.threshold(1) is None
+
+
+def test_session_change_rolls_the_window():
+    index = AlertIndex(cooldown=0.0)
+    index.add(AlertRule(1, "AAPL", "ma_above", 3))
+    index.seed("AAPL", ["2026-01-01", "2026-01-02"], [10.0, 20.0], [1.0, 1.0])
+    assert index.threshold(1) == 15.0
+
+    index.on_quote("AAPL", 30.0, volume=500.0, session="2026-01-05", now=0.0)
+    # Same session: the window does not move
+    index.on_quote("AAPL", 40.0, volume=600.0, session="2026-01-05", now=1.0)
+    assert index.threshold(1) == 15.0
+    # A new session closes 2026-01-05 at its last price (40) and drops the oldest close
+    index.on_quote("AAPL", 35.0, volume=10.0, session="2026-01-06", now=2.0)
+    assert index.threshold(1) == 30.0
+
+
+def test_volume_threshold_uses_average_daily_volume():
+    index = AlertIndex(volume_lookback=3, cooldown=0.0)
+    index.add(AlertRule(1, "AAPL", "volume", 2.0))
+    index.seed("AAPL", ["2026-01-01", "2026-01-02", "2026-01-05"], [1.0, 1.0, 1.0], [100.0, 200.0, 300.0])
+    assert index.threshold(1) == 400.0
+    assert index.on_quote("AAPL", 1.0, volume=399.0, session="2026-01-06", now=0.0) == []
+    assert fired(index.on_quote("AAPL", 1.0, volume=400.0, session="2026-01-06", now=1.0)) == [1]
+
+
+def test_remove_unindexes_the_rule():
+    index = AlertIndex(cooldown=0.0)
+    index.add(AlertRule(1, "AAPL", "above", 100.0))
+    index.add(AlertRule(2, "AAPL", "above", 100.0))
+
+    assert index.remove(1).id == 1
+    assert index.threshold(1) is None
+    assert index.remove(1) is None
+    index.on_quote("AAPL", 99.0, now=0.0)
+    assert fired(index.on_quote("AAPL", 101.0, now=1.0)) == [2]
+
+
+def test_load_matches_add():
+    rules = [AlertRule(i, "AAPL", "above" if i % 2 else "below", float(90 + i)) for i in range(20)]
+    added, loaded = AlertIndex(cooldown=0.0), AlertIndex(cooldown=0.0)
+    for rule in rules:
+        added.add(AlertRule(**rule.to_dict()))
+    loaded.load(AlertRule(**rule.to_dict()) for rule in rules)
+
+    for index in (added, loaded):
+        index.on_quote("AAPL", 95.0, now=0.0)
+    assert sorted(fired(added.on_quote("AAPL", 105.0, now=1.0))) == sorted(fired(loaded.on_quote("AAPL", 105.0, now=1.0)))
+    assert sorted(fired(added.on_quote("AAPL", 89.0, now=2.0))) == sorted(fired(loaded.on_quote("AAPL", 89.0, now=2.0)))
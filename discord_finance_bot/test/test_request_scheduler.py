@@ -0,0 +1,46 @@
+"""Run from the `discord_finance_bot` directory: python -m pytest -q test/test_request_scheduler.py"""
+import asyncio
+
+from utils.request_scheduler import PRIORITY_BACKFILL, PRIORITY_SCHEDULED, BudgetExceeded, RequestScheduler
+
+
+class FrozenClock:
+    """Clock that never advances, so buckets never refill during a test."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_backfill_leaves_reserve_for_scheduled_requests():
+    async def scenario():
+        scheduler = RequestScheduler("test", per_minute=0, per_day=25, clock=FrozenClock())
+        sent = []
+
+        def call(name):
+            async def _run():
+                sent.append(name)
+                return name
+            return _run
+
+        backfill = [
+            asyncio.ensure_future(scheduler.submit(("backfill", i), call(f"backfill-{i}"), priority=PRIORITY_BACKFILL))
+            for i in range(25)
+        ]
+        for _ in range(50):
+            await asyncio.sleep(0)
+        # Backfill stops at the 20% reserve: 20 of 25 daily tokens
+        assert len(sent) == 20
+
+        result = await asyncio.wait_for(
+            scheduler.submit("calendar", call("calendar"), priority=PRIORITY_SCHEDULED, deadline=1.0), timeout=1.0
+        )
+        assert result == "calendar"
+
+        await scheduler.close()
+        outcomes = await asyncio.gather(*backfill, return_exceptions=True)
+        assert sum(isinstance(o, BudgetExceeded) for o in outcomes) == 5
+
+    asyncio.run(scenario())
@@ -0,0 +1,136 @@
+"""Run from the `discord_finance_bot` directory: python -m pytest -q test/test_source_guard.py"""
+import asyncio
+from types import SimpleNamespace
+
+from repositories.alphavantage_repo import AlphaVantageRepo
+from utils.source_guard import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LastGoodStore, SourceGuard
+
+
+class ManualClock:
+    """Clock that only moves when a test advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def returning(value):
+    async def fetch():
+        return value
+    return fetch
+
+
+def test_breaker_opens_then_half_opens_then_closes():
+    clock = ManualClock()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 60
+    assert breaker.state == HALF_OPEN
+    # Only one trial call goes out while half-open
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+def test_failed_trial_reopens_the_breaker():
+    clock = ManualClock()
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+
+def test_deadline_serves_last_good_value_as_stale(tmp_path):
+    store = LastGoodStore(str(tmp_path / "last_good.json"))
+    guard = SourceGuard("sectors", budget=0.05, store=store, default=[])
+
+    async def slow():
+        await asyncio.sleep(1)
+        return ["late"]
+
+    async def scenario():
+        fresh = await guard.call(returning(["ok"]))
+        assert fresh.value == ["ok"] and not fresh.stale
+        result = await guard.call(slow)
+        assert result.stale and result.value == ["ok"]
+        assert result.as_of == fresh.as_of
+        assert "no answer" in result.error
+
+    asyncio.run(scenario())
+
+
+def test_open_circuit_skips_the_fetch(tmp_path):
+    guard = SourceGuard("ipos", budget=1, store=LastGoodStore(str(tmp_path / "lg.json")), failure_threshold=1, default=[])
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise RuntimeError("down")
+
+    async def scenario():
+        assert (await guard.call(failing)).value == []
+        result = await guard.call(failing)
+        assert result.stale and result.error == "circuit open"
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_empty_result_is_a_failure_only_when_configured(tmp_path):
+    store = LastGoodStore(str(tmp_path / "last_good.json"))
+    sectors = SourceGuard("sectors", budget=1, store=store, empty_is_failure=True, default=[])
+    earnings = SourceGuard("earnings", budget=1, store=store, default=[])
+
+    async def scenario():
+        await sectors.call(returning([{"name": "AI"}]))
+        result = await sectors.call(returning([]))
+        assert result.stale and result.value == [{"name": "AI"}]
+        assert result.error == "empty result"
+
+        result = await earnings.call(returning([]))
+        assert not result.stale and result.value == []
+
+    asyncio.run(scenario())
+
+
+def _calendar_repo(body):
+    repo = AlphaVantageRepo(SimpleNamespace(alphavantage_api_key="test-source-guard"))
+
+    async def download(params):
+        return body
+    repo._download_text_async = download
+    return repo
+
+
+def test_calendar_notice_keeps_last_good_data(tmp_path):
+    store = LastGoodStore(str(tmp_path / "last_good.json"))
+    store.put("ipos", [{"symbol": "OLD"}])
+    guard = SourceGuard("ipos", budget=1, store=store, default=[])
+    repo = _calendar_repo('{"Information": "rate limit"}')
+
+    result = asyncio.run(guard.call(repo.get_ipos_this_week_async))
+    assert result.stale and result.value == [{"symbol": "OLD"}]
+    assert "AlphaVantageUnavailable" in result.error
+    assert store.get("ipos")[0] == [{"symbol": "OLD"}]
+
+
+def test_empty_calendar_csv_is_a_success(tmp_path):
+    store = LastGoodStore(str(tmp_path / "last_good.json"))
+    store.put("ipos", [{"symbol": "OLD"}])
+    guard = SourceGuard("ipos", budget=1, store=store, default=[])
+    repo = _calendar_repo("symbol,name,ipoDate,priceRange,currency\r\n")
+
+    result = asyncio.run(guard.call(repo.get_ipos_this_week_async))
+    assert not result.stale and result.value == []
+    assert store.get("ipos")[0] == []
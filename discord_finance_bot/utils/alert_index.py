@@ -0,0 +1,322 @@
+import datetime as dt
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Rule kinds and what `value` means for each
+ALERT_KINDS = {
+    "above": "price crosses above value",
+    "below": "price crosses below value",
+    "volume": "session volume reaches value x the average daily volume",
+    "ma_above": "price crosses above its value-day moving average",
+    "ma_below": "price crosses below its value-day moving average",
+}
+
+
+@dataclass
+class AlertRule:
+    """One user's alert on one symbol (see `ALERT_KINDS`)."""
+
+    id: int
+    symbol: str
+    kind: str
+    value: float
+    user_id: int = 0
+    channel_id: int = 0
+    # Unix time of the last trigger, for the cooldown (0 = never fired)
+    last_fired: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def describe(self) -> str:
+        if self.kind == "volume":
+            return f"{self.symbol} volume ≥ {self.value:g}x average"
+        if self.kind.startswith("ma_"):
+            side = "above" if self.kind == "ma_above" else "below"
+            return f"{self.symbol} crosses {side} MA{int(self.value)}"
+        return f"{self.symbol} crosses {self.kind} {self.value:g}"
+
+
+@dataclass
+class AlertTrigger:
+    rule: AlertRule
+    price: float
+    volume: float
+    threshold: float
+
+
+class RollingWindow:
+    """Running sum of the last `size` values, updated in O(1) per value."""
+
+    __slots__ = ("size", "values", "total")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: deque = deque()
+        self.total = 0.0
+
+    def push(self, value: float) -> None:
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.size:
+            self.total -= self.values.popleft()
+
+    def mean(self) -> Optional[float]:
+        """Mean once the window is full, else None."""
+        return self.total / self.size if len(self.values) == self.size else None
+
+
+class _Ladder:
+    """Thresholds kept sorted (with their rule ids) for range lookups by bisect."""
+
+    __slots__ = ("keys", "ids")
+
+    def __init__(self):
+        self.keys: List[float] = []
+        self.ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: float, rule_id: int) -> None:
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.ids.insert(i, rule_id)
+
+    def extend(self, pairs: Iterable[Tuple[float, int]]) -> None:
+        """Bulk insert, sorting once (used when loading many rules)."""
+        merged = sorted(list(zip(self.keys, self.ids)) + list(pairs))
+        self.keys = [k for k, _ in merged]
+        self.ids = [i for _, i in merged]
+
+    def remove(self, key: float, rule_id: int) -> None:
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if self.ids[i] == rule_id:
+                del self.keys[i]
+                del self.ids[i]
+                return
+            i += 1
+
+    def rising(self, old: float, new: float) -> List[int]:
+        """Ids with old < key <= new."""
+        return self.ids[bisect_right(self.keys, old):bisect_right(self.keys, new)] if new > old else []
+
+    def falling(self, old: float, new: float) -> List[int]:
+        """Ids with new <= key < old."""
+        return self.ids[bisect_left(self.keys, new):bisect_left(self.keys, old)] if new < old else []
+
+
+class _SymbolState:
+    __slots__ = ("up", "down", "volume", "session", "price", "session_volume", "last_bar", "closes", "volumes", "dynamic")
+
+    def __init__(self, volume_lookback: int):
+        self.up = _Ladder()
+        self.down = _Ladder()
+        self.volume = _Ladder()
+        self.session = ""
+        self.price: Optional[float] = None
+        self.session_volume = 0.0
+        # Latest completed session pushed into the rolling windows
+        self.last_bar = ""
+        # MA window -> closes of the previous window-1 sessions
+        self.closes: Dict[int, RollingWindow] = {}
+        self.volumes = RollingWindow(volume_lookback)
+        # Rules whose threshold moves with the rolling windows
+        self.dynamic: Set[int] = set()
+
+
+class AlertIndex:
+    """Evaluate many alert rules per quote by touching only crossed thresholds.
+
+    Every rule is reduced to a fixed threshold kept in a per-symbol sorted
+    ladder: prices for `above`/`below`, session volume for `volume` (value x
+    the mean daily volume of `volume_lookback` sessions) and, for moving
+    averages, the mean of the previous `window - 1` closes (the price
+    crosses an MA that includes itself exactly when it crosses that mean).
+    A quote moving from p0 to p1 bisects the ladder for thresholds in
+    between, so its cost is O(log rules + hits). Rules fire on crossings
+    only, and not again within `cooldown` seconds.
+
+    Moving averages and average volumes are rolled incrementally when a
+    quote opens a new session (the previous session's last quote becomes its
+    close), or from stored daily bars via `seed`/`push_bar`; dynamic
+    thresholds are then re-indexed for that symbol only.
+    """
+
+    def __init__(self, volume_lookback: int = 30, cooldown: float = 3600.0):
+        self.volume_lookback = volume_lookback
+        self.cooldown = cooldown
+        self.rules: Dict[int, AlertRule] = {}
+        self._symbols: Dict[str, _SymbolState] = {}
+        # Rule id -> (ladder, threshold) currently indexed
+        self._indexed: Dict[int, Tuple[_Ladder, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _state(self, symbol: str) -> _SymbolState:
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolState(self.volume_lookback)
+        return state
+
+    def _placement(self, rule: AlertRule, state: _SymbolState) -> Optional[Tuple[_Ladder, float]]:
+        """Ladder and threshold for `rule`, or None until enough history is known."""
+        if rule.kind in ("above", "below"):
+            return (state.up if rule.kind == "above" else state.down), rule.value
+        if rule.kind == "volume":
+            mean = state.volumes.mean()
+            return (state.volume, rule.value * mean) if mean else None
+        window = int(rule.value)
+        closes = state.closes.get(window)
+        mean = closes.mean() if closes is not None else None
+        if mean is None:
+            return None
+        return (state.up if rule.kind == "ma_above" else state.down), mean
+
+    def _index(self, rule: AlertRule, state: _SymbolState) -> None:
+        placement = self._placement(rule, state)
+        if placement is not None:
+            placement[0].add(placement[1], rule.id)
+            self._indexed[rule.id] = placement
+
+    def _unindex(self, rule_id: int) -> None:
+        placement = self._indexed.pop(rule_id, None)
+        if placement is not None:
+            placement[0].remove(placement[1], rule_id)
+
+    def _track(self, rule: AlertRule, state: _SymbolState) -> None:
+        if rule.kind.startswith("ma_"):
+            window = int(rule.value)
+            state.closes.setdefault(window, RollingWindow(window - 1))
+        if rule.kind == "volume" or rule.kind.startswith("ma_"):
+            state.dynamic.add(rule.id)
+
+    def add(self, rule: AlertRule) -> None:
+        if rule.kind not in ALERT_KINDS:
+            raise ValueError(f"Unknown alert kind: {rule.kind!r}")
+        if rule.kind.startswith("ma_") and int(rule.value) < 2:
+            raise ValueError("Moving-average window must be at least 2")
+        self.remove(rule.id)
+        self.rules[rule.id] = rule
+        state = self._state(rule.symbol)
+        self._track(rule, state)
+        self._index(rule, state)
+
+    def load(self, rules: Iterable[AlertRule]) -> None:
+        """Add many rules at once, sorting each ladder a single time."""
+        pending: Dict[int, List[Tuple[float, int]]] = {}
+        ladders: Dict[int, _Ladder] = {}
+        for rule in rules:
+            if rule.kind not in ALERT_KINDS:
+                continue
+            self.rules[rule.id] = rule
+            state = self._state(rule.symbol)
+            self._track(rule, state)
+            placement = self._placement(rule, state)
+            if placement is not None:
+                ladders[id(placement[0])] = placement[0]
+                pending.setdefault(id(placement[0]), []).append((placement[1], rule.id))
+                self._indexed[rule.id] = placement
+        for key, pairs in pending.items():
+            ladders[key].extend(pairs)
+
+    def remove(self, rule_id: int) -> Optional[AlertRule]:
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return None
+        self._unindex(rule_id)
+        state = self._symbols.get(rule.symbol)
+        if state is not None:
+            state.dynamic.discard(rule_id)
+        return rule
+
+    def symbols(self) -> List[str]:
+        return sorted({rule.symbol for rule in self.rules.values()})
+
+    def history_needed(self, symbol: str) -> int:
+        """Daily bars needed to fill every rolling window of `symbol`."""
+        state = self._symbols.get(symbol)
+        return max([w.size for w in state.closes.values()] + [self.volume_lookback]) if state else 0
+
+    def threshold(self, rule_id: int) -> Optional[float]:
+        placement = self._indexed.get(rule_id)
+        return placement[1] if placement is not None else None
+
+    def _reindex_dynamic(self, state: _SymbolState) -> None:
+        for rule_id in list(state.dynamic):
+            self._unindex(rule_id)
+            self._index(self.rules[rule_id], state)
+
+    def seed(self, symbol: str, sessions: List[str], closes: List[float], volumes: List[float]) -> None:
+        """Rebuild `symbol`'s rolling windows from daily history (oldest first).
+
+        Ignored when the windows have already rolled past the history's last
+        session from live quotes.
+        """
+        state = self._state(symbol)
+        if not sessions or sessions[-1] < state.last_bar:
+            return
+        state.last_bar = sessions[-1]
+        for size, window in list(state.closes.items()):
+            state.closes[size] = rebuilt = RollingWindow(window.size)
+            for close in closes[-window.size:]:
+                rebuilt.push(close)
+        state.volumes = RollingWindow(self.volume_lookback)
+        for volume in volumes[-self.volume_lookback:]:
+            state.volumes.push(volume)
+        if state.price is None:
+            state.price = closes[-1]
+        self._reindex_dynamic(state)
+
+    def push_bar(self, symbol: str, session: str, close: float, volume: float) -> None:
+        """Roll a completed daily bar into `symbol`'s windows (older sessions are ignored)."""
+        state = self._state(symbol)
+        if session and session <= state.last_bar:
+            return
+        state.last_bar = session
+        for window in state.closes.values():
+            window.push(close)
+        state.volumes.push(volume)
+        if state.price is None:
+            state.price = close
+        self._reindex_dynamic(state)
+
+    def on_quote(self, symbol: str, price: float, volume: Optional[float] = None, session: str = "", now: Optional[float] = None) -> List[AlertTrigger]:
+        """Apply a quote and return the rules it triggered."""
+        state = self._symbols.get(symbol)
+        if state is None:
+            return []
+        if session and state.session and session != state.session:
+            if state.price is not None:
+                self.push_bar(symbol, state.session, state.price, state.session_volume)
+            state.session_volume = 0.0
+        if session:
+            state.session = session
+
+        hits: List[int] = []
+        old_price = state.price
+        if old_price is not None:
+            hits.extend(state.up.rising(old_price, price))
+            hits.extend(state.down.falling(old_price, price))
+        state.price = price
+        old_volume = state.session_volume
+        if volume is not None:
+            hits.extend(state.volume.rising(old_volume, volume))
+            state.session_volume = volume
+        if not hits:
+            return []
+
+        now = now if now is not None else dt.datetime.now(dt.timezone.utc).timestamp()
+        triggers = []
+        for rule_id in hits:
+            rule = self.rules[rule_id]
+            if rule.last_fired and now - rule.last_fired < self.cooldown:
+                continue
+            rule.last_fired = now
+            triggers.append(AlertTrigger(rule, price, state.session_volume, self._indexed[rule_id][1]))
+        return triggers
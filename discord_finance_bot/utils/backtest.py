@@ -0,0 +1,235 @@
+import datetime as dt
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.bars import Bars
+
+
+# Panel planes, in order
+PANEL_FIELDS = ("high", "close", "volume")
+TRADING_DAYS = 252
+# Below this much work (panel cells x combinations, roughly 0.5s on one core)
+# starting a process pool costs more than it saves
+PARALLEL_MIN_WORK = 1_000_000_000
+
+
+@dataclass
+class Panel:
+    """Daily bars of many symbols on one shared date axis.
+
+    `data` is a (PANEL_FIELDS x symbols x dates) float64 array with NaN
+    where a symbol has no bar, so every signal can be computed with whole
+    array operations.
+    """
+
+    symbols: List[str]
+    dates: np.ndarray
+    data: np.ndarray
+
+    @classmethod
+    def from_universe(cls, universe: Mapping[str, Bars], start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> "Panel":
+        sliced = {symbol: bars.between(start, end) for symbol, bars in universe.items()}
+        sliced = {symbol: bars for symbol, bars in sliced.items() if len(bars)}
+        if not sliced:
+            return cls([], np.empty(0, dtype="<M8[D]"), np.empty((len(PANEL_FIELDS), 0, 0)))
+        dates = np.unique(np.concatenate([bars.date for bars in sliced.values()]))
+        data = np.full((len(PANEL_FIELDS), len(sliced), len(dates)), np.nan)
+        for row, bars in enumerate(sliced.values()):
+            cols = np.searchsorted(dates, bars.date)
+            for plane, name in enumerate(PANEL_FIELDS):
+                data[plane, row, cols] = getattr(bars, name)
+        return cls(list(sliced), dates, data)
+
+    @property
+    def start(self) -> Optional[dt.date]:
+        return self.dates[0].astype(dt.date) if len(self.dates) else None
+
+    @property
+    def end(self) -> Optional[dt.date]:
+        return self.dates[-1].astype(dt.date) if len(self.dates) else None
+
+
+def _parse_values(text: str, cast) -> Tuple:
+    """Parse "a,b,c" or an inclusive range "start:stop:step" into sorted unique values."""
+    values = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" in part:
+            start, stop, step = (list(map(cast, part.split(":"))) + [cast(1)])[:3]
+            if step <= 0 or stop < start:
+                raise ValueError(f"Invalid range: {part!r}")
+            values.extend(cast(round(start + i * step, 6)) for i in range(int(round((stop - start) / step)) + 1))
+        else:
+            values.append(cast(part))
+    if not values:
+        raise ValueError(f"No values in {text!r}")
+    return tuple(sorted(set(values)))
+
+
+@dataclass(frozen=True)
+class BacktestGrid:
+    """Parameter grid of the breakout strategy.
+
+    - lookbacks: sessions whose high the close must clear
+    - volume_ratios: minimum volume vs. the lookback average
+    - holds: sessions a position is held (close to close)
+    """
+
+    lookbacks: Tuple[int, ...] = (20, 30, 55)
+    volume_ratios: Tuple[float, ...] = (1.5, 2.0, 3.0)
+    holds: Tuple[int, ...] = (5, 10, 20)
+
+    KEYS = {"lookback": ("lookbacks", int), "ratio": ("volume_ratios", float), "hold": ("holds", int)}
+
+    @classmethod
+    def from_args(cls, args: Iterable[str], default: Optional["BacktestGrid"] = None) -> "BacktestGrid":
+        """Override `default` with `lookback=`, `ratio=` and `hold=` arguments,
+        e.g. ["lookback=10:60:5", "ratio=1.5,2"]. Raises ValueError on bad input."""
+        values = dict(vars(default or cls()))
+        for arg in args:
+            key, _, text = arg.partition("=")
+            if key.lower() not in cls.KEYS or not text:
+                raise ValueError(f"Unknown argument: {arg!r}")
+            name, cast = cls.KEYS[key.lower()]
+            values[name] = _parse_values(text, cast)
+        grid = cls(**values)
+        if min(grid.lookbacks) < 1 or min(grid.holds) < 1 or min(grid.volume_ratios) < 0:
+            raise ValueError("lookback and hold must be >= 1, ratio >= 0")
+        return grid
+
+    def __len__(self) -> int:
+        return len(self.lookbacks) * len(self.volume_ratios) * len(self.holds)
+
+    def tasks(self) -> List[Tuple[int, Tuple[float, ...], Tuple[int, ...]]]:
+        """One unit of work per lookback: its rolling windows are computed once
+        and shared by every ratio and hold."""
+        return [(lookback, self.volume_ratios, self.holds) for lookback in self.lookbacks]
+
+
+def _trailing_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Max of the `window` bars before each bar (NaN when any is missing)."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] > window:
+        out[:, window:] = sliding_window_view(values, window, axis=-1)[:, :-1].max(axis=-1)
+    return out
+
+
+def _trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the `window` bars before each bar (NaN when any is missing)."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] > window:
+        valid = np.isfinite(values)
+        zeros = np.zeros((values.shape[0], 1))
+        csum = np.concatenate([zeros, np.cumsum(np.where(valid, values, 0.0), axis=-1)], axis=-1)
+        count = np.concatenate([zeros, np.cumsum(valid, axis=-1, dtype="f8")], axis=-1)
+        out[:, window:] = (csum[:, window:-1] - csum[:, :-window - 1]) / window
+        out[:, window:][count[:, window:-1] - count[:, :-window - 1] < window] = np.nan
+    return out
+
+
+def trade_stats(returns: np.ndarray, hold: int) -> Dict[str, float]:
+    """Summary statistics of per-trade returns (fractions) held `hold` sessions."""
+    trades = len(returns)
+    if not trades:
+        return {"trades": 0, "win_rate": 0.0, "avg_return": 0.0, "median_return": 0.0, "profit_factor": 0.0, "sharpe": 0.0}
+    gains = float(returns[returns > 0].sum())
+    losses = float(-returns[returns < 0].sum())
+    std = float(returns.std())
+    mean = float(returns.mean())
+    return {
+        "trades": trades,
+        "win_rate": float((returns > 0).mean()),
+        "avg_return": mean,
+        "median_return": float(np.median(returns)),
+        "profit_factor": gains / losses if losses > 0 else math.inf,
+        # Per-trade Sharpe scaled to a year of back-to-back holds
+        "sharpe": mean / std * math.sqrt(TRADING_DAYS / hold) if std > 0 else 0.0,
+    }
+
+
+def evaluate(data: np.ndarray, lookback: int, volume_ratios: Sequence[float], holds: Sequence[int]) -> List[Dict[str, float]]:
+    """Backtest one lookback against every volume ratio and hold.
+
+    A trade is entered at the close of a bar that closes above the prior
+    `lookback`-bar high with volume at least `ratio` times the prior mean,
+    and exited at the close `hold` bars later. Positions may overlap;
+    signals too close to the end of the data are dropped.
+    """
+    high, close, volume = data
+    columns = close.shape[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = volume / _trailing_mean(volume, lookback)
+        ratio[~(close > _trailing_max(high, lookback))] = np.nan
+    flat_close = close.ravel()
+    rows = []
+    for volume_ratio in volume_ratios:
+        with np.errstate(invalid="ignore"):
+            entries = np.flatnonzero(ratio >= volume_ratio)
+        day = entries % columns
+        for hold in holds:
+            entry = entries[day + hold < columns]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns = flat_close[entry + hold] / flat_close[entry] - 1.0
+            returns = returns[np.isfinite(returns)]
+            rows.append({"lookback": lookback, "volume_ratio": volume_ratio, "hold": hold, **trade_stats(returns, hold)})
+    return rows
+
+
+# Worker-side view of the shared panel, attached once per process
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_data: Optional[np.ndarray] = None
+
+
+def _attach(name: str, shape: Tuple[int, ...]) -> None:
+    global _worker_shm, _worker_data
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_data = np.ndarray(shape, dtype="f8", buffer=_worker_shm.buf)
+
+
+def _evaluate_shared(lookback: int, volume_ratios: Sequence[float], holds: Sequence[int]) -> List[Dict[str, float]]:
+    return evaluate(_worker_data, lookback, volume_ratios, holds)
+
+
+def run_grid(panel: Panel, grid: BacktestGrid, workers: Optional[int] = None) -> List[Dict[str, float]]:
+    """Evaluate every grid combination over `panel`.
+
+    Small sweeps run in-process. Larger ones spread lookbacks over a
+    process pool: the panel is copied once into a shared memory block that
+    workers map, so only parameters and result rows cross process
+    boundaries. Workers are spawned rather than forked, which is safe from
+    the bot's threaded event loop.
+    """
+    tasks = grid.tasks()
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1 or panel.data.size * len(grid) < PARALLEL_MIN_WORK:
+        return [row for task in tasks for row in evaluate(panel.data, *task)]
+
+    shm = shared_memory.SharedMemory(create=True, size=panel.data.nbytes)
+    try:
+        shared = np.ndarray(panel.data.shape, dtype="f8", buffer=shm.buf)
+        shared[:] = panel.data
+        del shared
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach,
+            initargs=(shm.name, panel.data.shape),
+        ) as pool:
+            results = list(pool.map(_evaluate_shared, *zip(*tasks)))
+    finally:
+        shm.close()
+        shm.unlink()
+    return [row for rows in results for row in rows]
+
+
+def rank_results(rows: List[Dict[str, float]], min_trades: int = 10) -> List[Dict[str, float]]:
+    """Order grid results by Sharpe; combinations with fewer than `min_trades` trades go last."""
+    return sorted(rows, key=lambda r: (r["trades"] < min_trades, -r["sharpe"], -r["trades"]))
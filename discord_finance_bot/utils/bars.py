@@ -0,0 +1,98 @@
+import csv
+import datetime as dt
+import io
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+
+# Column name -> on-disk/in-memory dtype (little-endian, fixed width)
+BAR_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("date", "<M8[D]"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+)
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class Bars:
+    """Daily OHLCV bars as parallel NumPy columns sorted by date.
+
+    Slicing by date (`between`, `after`) uses `searchsorted` and returns
+    views, so slicing memory-mapped columns never copies data.
+    """
+
+    __slots__ = ("date", "open", "high", "low", "close", "volume")
+
+    def __init__(self, date: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        self.date = date
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def empty(cls) -> "Bars":
+        return cls(**{name: np.empty(0, dtype=dtype) for name, dtype in BAR_COLUMNS})
+
+    @classmethod
+    def from_csv(cls, text: str) -> "Bars":
+        """Parse an AlphaVantage TIME_SERIES_DAILY CSV (any row order) into sorted bars.
+
+        Rows with unparseable values are skipped; for duplicate dates the
+        last row wins.
+        """
+        reader = csv.reader(io.StringIO(text))
+        header = [h.strip().lower() for h in next(reader, None) or []]
+        try:
+            idx = [header.index("timestamp" if name == "date" else name) for name, _ in BAR_COLUMNS]
+        except ValueError:
+            return cls.empty()
+        by_date: Dict[str, Tuple[float, ...]] = {}
+        for rec in reader:
+            if len(rec) != len(header):
+                continue
+            try:
+                by_date[rec[idx[0]]] = tuple(float(rec[i]) for i in idx[1:])
+            except ValueError:
+                continue
+        if not by_date:
+            return cls.empty()
+        try:
+            dates = np.array(list(by_date), dtype="<M8[D]")
+        except ValueError:
+            return cls.empty()
+        values = np.array(list(by_date.values()), dtype="<f8").reshape(len(by_date), len(PRICE_COLUMNS))
+        order = np.argsort(dates, kind="stable")
+        return cls(dates[order], *(values[order, i] for i in range(len(PRICE_COLUMNS))))
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name, _ in BAR_COLUMNS}
+
+    def _slice(self, lo: int, hi: int) -> "Bars":
+        return Bars(**{name: column[lo:hi] for name, column in self.columns().items()})
+
+    def between(self, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> "Bars":
+        """Bars with start <= date <= end (either bound optional), as views."""
+        lo = 0 if start is None else int(np.searchsorted(self.date, np.datetime64(start, "D"), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.date, np.datetime64(end, "D"), side="right"))
+        return self._slice(lo, max(lo, hi))
+
+    def after(self, date: Optional[dt.date]) -> "Bars":
+        """Bars strictly after `date` (all bars when None)."""
+        if date is None:
+            return self
+        return self._slice(int(np.searchsorted(self.date, np.datetime64(date, "D"), side="right")), len(self))
+
+    def tail(self, n: int) -> "Bars":
+        return self._slice(max(0, len(self) - n), len(self))
+
+    @property
+    def last_date(self) -> Optional[dt.date]:
+        return self.date[-1].astype(dt.date) if len(self) else None
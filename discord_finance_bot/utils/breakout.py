@@ -0,0 +1,121 @@
+import datetime as dt
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+import numpy as np
+from utils.bars import Bars
+
+
+@dataclass
+class BreakoutScan:
+    """Per-symbol breakout measures for one scan, as parallel arrays."""
+
+    as_of: Optional[dt.date]
+    symbols: List[str]
+    price: np.ndarray
+    prior_high: np.ndarray
+    breakout_pct: np.ndarray
+    volume_ratio: np.ndarray
+    change_pct: np.ndarray
+    live: np.ndarray
+    signal: np.ndarray
+
+    def candidates(self) -> List[Dict[str, object]]:
+        """Rows of the symbols whose `signal` is set, strongest volume first."""
+        idx = np.flatnonzero(self.signal)
+        idx = idx[np.argsort(-self.volume_ratio[idx], kind="stable")]
+        return [
+            {
+                "symbol": self.symbols[i],
+                "price": float(self.price[i]),
+                "prior_high": float(self.prior_high[i]),
+                "breakout_pct": float(self.breakout_pct[i]) * 100,
+                "volume_ratio": float(self.volume_ratio[i]),
+                "change_pct": float(self.change_pct[i]) * 100,
+                "live": bool(self.live[i]),
+            }
+            for i in idx
+        ]
+
+
+def _quote_date(quote: Mapping[str, object]) -> Optional[np.datetime64]:
+    try:
+        return np.datetime64(str(quote.get("as_of") or "")[:10], "D")
+    except ValueError:
+        return None
+
+
+def scan_breakouts(
+    universe: Mapping[str, Bars],
+    lookback: int = 30,
+    volume_ratio: float = 1.5,
+    quotes: Optional[Mapping[str, Mapping[str, object]]] = None,
+) -> BreakoutScan:
+    """Find symbols trading above their `lookback`-day high on heavy volume.
+
+    The current bar of each symbol is its live quote when `quotes` holds
+    one for a session newer than its stored bars (an intraday scan), and
+    otherwise its last stored bar. It is compared against the high and the
+    mean volume of the `lookback` completed bars before it. Symbols whose
+    history is shorter than that, or whose last bar is older than the
+    newest one in the universe, are left out. An intraday volume is the
+    session's volume so far, so the ratio only grows as the day goes on.
+
+    The per-symbol loop only copies window rows; all measures are computed
+    on (symbols x lookback) matrices at once.
+    """
+    lookback = max(1, int(lookback))
+    newest = max((bars.date[-1] for bars in universe.values() if len(bars)), default=None)
+    quotes = quotes or {}
+    symbols: List[str] = []
+    picked: List[Tuple[Bars, int, Optional[Mapping[str, object]]]] = []
+    for symbol, bars in universe.items():
+        n = len(bars)
+        if n == 0 or bars.date[-1] != newest:
+            continue
+        quote = quotes.get(symbol)
+        if quote is not None and (quote.get("price") is None or (_quote_date(quote) or newest) <= newest):
+            quote = None
+        # With a live quote every stored bar is complete; otherwise the last one is the current bar
+        end = n if quote is not None else n - 1
+        if end < lookback:
+            continue
+        symbols.append(symbol)
+        picked.append((bars, end, quote))
+
+    count = len(symbols)
+    high = np.empty((count, lookback))
+    volume = np.empty((count, lookback))
+    price = np.empty(count)
+    current_volume = np.empty(count)
+    previous_close = np.empty(count)
+    live = np.zeros(count, dtype=bool)
+    for row, (bars, end, quote) in enumerate(picked):
+        high[row] = bars.high[end - lookback:end]
+        volume[row] = bars.volume[end - lookback:end]
+        previous_close[row] = bars.close[end - 1]
+        if quote is not None:
+            live[row] = True
+            price[row] = float(quote["price"])
+            current_volume[row] = float(quote.get("volume") or 0.0)
+        else:
+            price[row] = bars.close[end]
+            current_volume[row] = bars.volume[end]
+
+    prior_high = high.max(axis=1, initial=-np.inf)
+    mean_volume = volume.mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakout_pct = price / prior_high - 1.0
+        ratio = np.where(mean_volume > 0, current_volume / mean_volume, 0.0)
+        change_pct = np.where(previous_close > 0, price / previous_close - 1.0, 0.0)
+    signal = (price > prior_high) & (ratio >= volume_ratio)
+    return BreakoutScan(
+        as_of=newest.astype(dt.date) if newest is not None else None,
+        symbols=symbols,
+        price=price,
+        prior_high=prior_high,
+        breakout_pct=breakout_pct,
+        volume_ratio=ratio,
+        change_pct=change_pct,
+        live=live,
+        signal=signal,
+    )
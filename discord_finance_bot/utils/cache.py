@@ -0,0 +1,139 @@
+import datetime as dt
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from utils.logger import get_logger
+from utils.scheduler_utils import get_timezone
+
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class CacheEntry:
+    """Cached value plus the raw text it was decoded from (persisted on disk)."""
+
+    __slots__ = ("value", "raw", "fetched_at")
+
+    def __init__(self, value: Any, raw: Optional[str], fetched_at: float):
+        self.value = value
+        self.raw = raw
+        self.fetched_at = fetched_at
+
+
+class TTLCache:
+    """Two-tier cache: in-memory LRU in front of an optional on-disk store.
+
+    An entry is fresh while it is younger than `ttl` and was fetched on the
+    same calendar day (in `timezone`) as now. Past that it is stale but still
+    served for up to `stale_ttl` seconds, so callers can return it immediately
+    and revalidate in the background. Only entries with `raw` text are
+    persisted; `decode` rebuilds the value from that text after a restart.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 32,
+        ttl: float = 6 * 3600,
+        stale_ttl: float = 2 * 24 * 3600,
+        disk_dir: Optional[str] = None,
+        decode: Optional[Callable[[str], Any]] = None,
+        timezone: str = "UTC",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.logger = get_logger(__name__)
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.disk_dir = disk_dir
+        self.decode = decode
+        self.tz = get_timezone(timezone)
+        self.clock = clock
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.stats: Dict[str, int] = {"hits": 0, "stale_hits": 0, "misses": 0, "disk_loads": 0, "writes": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """Build a stable key from a namespace and request parameters."""
+        return namespace + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+
+    def _day(self, ts: float) -> dt.date:
+        return dt.datetime.fromtimestamp(ts, self.tz).date()
+
+    def _state(self, entry: CacheEntry) -> str:
+        now = self.clock()
+        age = now - entry.fetched_at
+        if age < self.ttl and self._day(entry.fetched_at) == self._day(now):
+            return FRESH
+        if age < self.stale_ttl:
+            return STALE
+        return MISS
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _load_from_disk(self, key: str) -> Optional[CacheEntry]:
+        if not self.disk_dir or self.decode is None:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as fh:
+                doc = json.load(fh)
+            if doc.get("key") != key:
+                return None
+            entry = CacheEntry(self.decode(doc["raw"]), doc["raw"], float(doc["fetched_at"]))
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            self.logger.warning(f"Ignoring unreadable cache file for {key}: {exc}")
+            return None
+        self.stats["disk_loads"] += 1
+        return entry
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def lookup(self, key: str) -> Tuple[Optional[CacheEntry], str]:
+        """Return (entry, state) where state is "fresh", "stale" or "miss"."""
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self._remember(key, entry)
+        else:
+            self._memory.move_to_end(key)
+
+        state = self._state(entry) if entry is not None else MISS
+        if state == FRESH:
+            self.stats["hits"] += 1
+        elif state == STALE:
+            self.stats["stale_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            entry = None
+        return entry, state
+
+    def set(self, key: str, value: Any, raw: Optional[str] = None) -> None:
+        """Store a value in memory and, when `raw` is given, on disk."""
+        entry = CacheEntry(value, raw, self.clock())
+        self._remember(key, entry)
+        if not self.disk_dir or raw is None:
+            return
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"key": key, "fetched_at": entry.fetched_at, "raw": raw}, fh, ensure_ascii=False)
+            os.replace(tmp, path)
+            self.stats["writes"] += 1
+        except Exception as exc:
+            self.logger.warning(f"Failed to persist cache entry {key}: {exc}")
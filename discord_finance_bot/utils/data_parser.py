@@ -11,4 +11,16 @@ def to_markdown_table(items: List[Dict], headers: List[str]) -> str:
     rows = [line, sep]
     for obj in items:
         rows.append("| " + " | ".join([str(obj.get(h, "")) for h in headers]) + " |")
-    return "\n".join(rows)
\ No newline at end of file
+    return "\n".join(rows)
+
+
+def format_age(seconds: float) -> str:
+    """Format an age in seconds as a short human string, e.g. "42s", "5m", "2h 3m"."""
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, _ = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if minutes else f"{hours}h"
@@ -0,0 +1,93 @@
+import csv
+import datetime as dt
+import io
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+def parse_date(value: Optional[str]) -> Optional[dt.date]:
+    """Parse `YYYY-MM-DD` (fast path) or `YYYY/MM/DD`; return None if invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return dt.date.fromisoformat(value)
+        except ValueError:
+            return None
+    for fmt in ("%Y-%m-%d", "%Y/%m/%d"):
+        try:
+            return dt.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class DatedRows(Sequence):
+    """CSV rows kept sorted by a date column for bisect range queries.
+
+    Rows whose date cannot be parsed are kept after the dated ones (so the
+    sequence still holds every row) but never match a date query.
+    """
+
+    __slots__ = ("date_field", "_rows", "_ordinals")
+
+    def __init__(self, rows: Iterable[Dict[str, str]], date_field: str):
+        self.date_field = date_field
+        dated = []
+        undated: List[Dict[str, str]] = []
+        for row in rows:
+            d = parse_date(row.get(date_field))
+            if d is None:
+                undated.append(row)
+            else:
+                dated.append((d.toordinal(), row))
+        dated.sort(key=lambda pair: pair[0])
+        self._ordinals = [o for o, _ in dated]
+        self._rows = [r for _, r in dated] + undated
+
+    @classmethod
+    def from_csv(cls, text: str, date_fields: Sequence[str]) -> "DatedRows":
+        """Stream-parse CSV text and index it on the first of `date_fields` present."""
+        reader = csv.reader(io.StringIO(text))
+        header = next(reader, None) or []
+        date_field = next((f for f in date_fields if f in header), date_fields[0])
+        width = len(header)
+
+        def _rows() -> Iterator[Dict[str, str]]:
+            # Same handling as csv.DictReader: blank lines are skipped, short
+            # rows padded with None and extra fields kept under the None key
+            for rec in reader:
+                if len(rec) == width:
+                    yield dict(zip(header, rec))
+                elif rec:
+                    row = dict(zip(header, rec))
+                    if len(rec) < width:
+                        row.update((key, None) for key in header[len(rec):])
+                    else:
+                        row[None] = rec[width:]
+                    yield row
+
+        return cls(_rows(), date_field)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._rows)
+
+    def between(self, start: dt.date, end: dt.date) -> List[Dict[str, str]]:
+        """Rows dated within [start, end], in date order."""
+        lo = bisect_left(self._ordinals, start.toordinal())
+        hi = bisect_right(self._ordinals, end.toordinal())
+        return self._rows[lo:hi]
+
+    def on_dates(self, dates: Iterable[dt.date]) -> List[Dict[str, str]]:
+        """Rows dated on any of `dates`, in date order."""
+        out: List[Dict[str, str]] = []
+        for d in sorted(set(dates)):
+            out.extend(self.between(d, d))
+        return out
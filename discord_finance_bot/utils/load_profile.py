@@ -0,0 +1,123 @@
+import ipaddress
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlparse
+from utils.metrics import metrics
+
+
+FULL = "full"
+LEAN = "lean"
+
+# Playwright resource types the scrapers never read
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font", "stylesheet", "texttrack", "manifest")
+# Sites besides the scraped page's own that serve its scripts and data
+DEFAULT_ALLOWED_SITES = ("moomoo.com", "futunn.com", "futustatic.com")
+DEFAULT_VIEWPORT = "1024x768"
+
+
+def site_of(host: str) -> str:
+    """Registrable part of `host` used for first-party checks ("www.moomoo.com" -> "moomoo.com").
+
+    IP addresses and single-label hosts are returned unchanged.
+    """
+    host = (host or "").lower().rstrip(".")
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    return ".".join(labels[-2:]) if len(labels) > 2 else host
+
+
+def parse_viewport(text: str) -> Optional[Tuple[int, int]]:
+    """"1024x768" -> (1024, 768); empty or malformed -> None (browser default)."""
+    width, _, height = (text or "").lower().partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError:
+        return None
+
+
+@dataclass
+class LoadProfile:
+    """How much of a page the scraper's browser contexts load.
+
+    `full` loads everything, like a normal browser. `lean` aborts requests
+    for `blocked_types` and for hosts outside the scraped site and
+    `allowed_sites`, uses a smaller viewport and blocks service workers.
+    Scripts, XHR/fetch and documents are kept, since the sector list is
+    rendered by the page's JS from an XHR. `full` is the default: `lean`
+    has only been compared against the bench's synthetic concepts page,
+    not a recorded copy of the live one.
+    """
+
+    name: str = FULL
+    blocked_types: FrozenSet[str] = frozenset()
+    # Sites (see `site_of`) whose requests are kept; empty keeps every host
+    allowed_sites: FrozenSet[str] = frozenset()
+    viewport: Optional[Tuple[int, int]] = None
+
+    @property
+    def lean(self) -> bool:
+        return self.name == LEAN
+
+    @classmethod
+    def from_config(cls, config) -> "LoadProfile":
+        name = (getattr(config, "crawler_load_profile", FULL) or FULL).strip().lower()
+        if name != LEAN:
+            return cls()
+        sites = set(getattr(config, "crawler_allowed_hosts", None) or DEFAULT_ALLOWED_SITES)
+        sectors_url = getattr(config, "sectors_url", "")
+        if sectors_url:
+            sites.add(site_of(urlparse(sectors_url).hostname or ""))
+        return cls(
+            name=LEAN,
+            blocked_types=frozenset(getattr(config, "crawler_blocked_resources", None) or DEFAULT_BLOCKED_TYPES),
+            allowed_sites=frozenset(site_of(s) for s in sites if s),
+            viewport=parse_viewport(getattr(config, "crawler_viewport", DEFAULT_VIEWPORT)),
+        )
+
+    def blocked_reason(self, resource_type: str, url: str, main_frame: bool = True) -> Optional[str]:
+        """"type" or "third_party" when a request should be aborted, else None.
+
+        The top-level document is always loaded, whatever its host.
+        """
+        if resource_type == "document" and main_frame:
+            return None
+        if resource_type in self.blocked_types:
+            return "type"
+        if self.allowed_sites:
+            parsed = urlparse(url)
+            if parsed.scheme in ("http", "https") and site_of(parsed.hostname or "") not in self.allowed_sites:
+                return "third_party"
+        return None
+
+    def context_options(self) -> Dict[str, Any]:
+        """Keyword arguments for `browser.new_context()`."""
+        if not self.lean:
+            return {}
+        options: Dict[str, Any] = {"service_workers": "block", "reduced_motion": "reduce", "device_scale_factor": 1}
+        if self.viewport:
+            width, height = self.viewport
+            options["viewport"] = {"width": width, "height": height}
+        return options
+
+    async def _route(self, route) -> None:
+        request = route.request
+        try:
+            main_frame = request.frame.parent_frame is None
+        except Exception:
+            # Service worker requests have no frame
+            main_frame = False
+        reason = self.blocked_reason(request.resource_type, request.url, main_frame)
+        if reason is None:
+            await route.continue_()
+            return
+        metrics.counter("scrape_blocked_requests_total", reason=reason).inc()
+        await route.abort("blockedbyclient")
+
+    async def apply(self, context) -> None:
+        """Install the request filter on a new browser context (no-op for `full`)."""
+        if self.lean and (self.blocked_types or self.allowed_sites):
+            await context.route("**/*", self._route)
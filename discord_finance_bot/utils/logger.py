@@ -1,11 +1,179 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional, Tuple
+
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_lock = threading.Lock()
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        doc = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                doc[key] = value
+        if record.exc_info:
+            doc["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(doc, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most `limit` WARNING+ records per call site through every `window` seconds.
+
+    The next record that gets through reports how many were suppressed, so
+    bursts of identical errors during an upstream outage stay cheap.
+    """
+
+    def __init__(self, limit: int = 5, window: float = 60.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._sites: Dict[Tuple[str, str, int], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno < logging.WARNING:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            # [window_start, passed, suppressed]
+            state = self._sites.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = int(state[2]) if state else 0
+                state = [now, 0, 0]
+                self._sites[key] = state
+                if suppressed:
+                    record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+            if state[1] >= self.limit:
+                state[2] += 1
+                return False
+            state[1] += 1
+            return True
+
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """QueueHandler that leaves the formatter (incl. tracebacks) to the writer thread.
+
+    Only the message itself is built on the calling thread: `prepare`
+    merges `args` into `msg`, so later changes to mutable arguments cannot
+    alter the record. Formatting, including `exc_info` tracebacks, runs on
+    the writer thread. Once the writer has stopped (`shutdown_logging`),
+    records are written straight to its handlers on the calling thread
+    instead of being queued.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.direct: Optional[Tuple[logging.Handler, ...]] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        direct = self.direct
+        if direct is None:
+            super().emit(record)
+            return
+        record = self.prepare(record)
+        for handler in direct:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _build_handlers() -> List[logging.Handler]:
+    formatter: logging.Formatter
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    log_file = os.getenv("LOG_FILE", "")
+    if log_file:
+        handlers.append(
+            RotatingFileHandler(
+                log_file,
+                maxBytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                backupCount=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+                encoding="utf-8",
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _get_queue_handler() -> QueueHandler:
+    """Return the shared QueueHandler, starting the background writer on first use."""
+    global _queue_handler, _listener
+    with _lock:
+        if _queue_handler is None:
+            log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+            _listener = QueueListener(log_queue, *_build_handlers(), respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+            _queue_handler = _DeferredFormatQueueHandler(log_queue)
+            _queue_handler.addFilter(
+                RateLimitFilter(
+                    limit=int(os.getenv("LOG_RATE_LIMIT", "5")),
+                    window=float(os.getenv("LOG_RATE_WINDOW", "60")),
+                )
+            )
+        return _queue_handler
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer.
+
+    Records logged afterwards are written synchronously, so nothing is lost
+    to a queue nobody drains.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            if _queue_handler is not None:
+                _queue_handler.direct = tuple(_listener.handlers)
+            _listener = None
 
 
 def get_logger(name: str) -> logging.Logger:
-    """Get a configured logger with stream handler.
+    """Get a configured logger backed by the shared non-blocking queue.
+
+    Records are enqueued on the calling thread and written by one background
+    listener thread, so logging never blocks the event loop on I/O.
 
-    LOG_LEVEL env var controls level (default INFO).
+    Environment variables:
+    - LOG_LEVEL: level (default INFO)
+    - LOG_FORMAT: "text" (default) or "json" (JSON lines)
+    - LOG_FILE: optional file path, rotated at LOG_MAX_BYTES keeping LOG_BACKUP_COUNT files
+    - LOG_RATE_LIMIT / LOG_RATE_WINDOW: max WARNING+ records per call site per window
+      (default 5 per 60s; 0 disables)
     """
     logger = logging.getLogger(name)
     if logger.handlers:
@@ -15,10 +183,6 @@ def get_logger(name: str) -> logging.Logger:
     level = getattr(logging, level_name, logging.INFO)
     logger.setLevel(level)
 
-    handler = logging.StreamHandler()
-    handler.setLevel(level)
-    formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    logger.addHandler(_get_queue_handler())
     logger.propagate = False
-    return logger
\ No newline at end of file
+    return logger
@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from utils.logger import get_logger
+
+
+# Upper bounds in seconds; the last bucket is +Inf
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (seconds) with approximate quantiles."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile `q` (observed max for +Inf)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        mean = self.total / self.count if self.count else None
+        return {
+            "count": self.count,
+            "mean": mean,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max if self.count else None,
+        }
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down (e.g. remaining budget, queue depth)."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """Process-wide registry of named, labelled metrics.
+
+    Metrics are registered under bare names (`scrape_rows_total`); the
+    exposition prefixes every one of them with `namespace` (`dbot_scrape_rows_total`).
+    """
+
+    def __init__(self, namespace: str = "dbot"):
+        self.namespace = namespace
+        self._histograms: Dict[LabelKey, LatencyHistogram] = {}
+        self._counters: Dict[LabelKey, Counter] = {}
+        self._gauges: Dict[LabelKey, Gauge] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> LabelKey:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def histogram(self, name: str, **labels: str) -> LatencyHistogram:
+        key = self._key(name, labels)
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, LatencyHistogram())
+        return hist
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = self._key(name, labels)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter())
+        return counter
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        key = self._key(name, labels)
+        gauge = self._gauges.get(key)
+        if gauge is None:
+            with self._lock:
+                gauge = self._gauges.setdefault(key, Gauge())
+        return gauge
+
+    def histograms(self, name: Optional[str] = None) -> List[Tuple[str, Dict[str, str], LatencyHistogram]]:
+        """Return (name, labels, histogram) for every histogram, optionally filtered by name."""
+        return [
+            (n, dict(labels), hist)
+            for (n, labels), hist in sorted(self._histograms.items())
+            if name is None or n == name
+        ]
+
+    @staticmethod
+    def _labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+        return "{" + body + "}"
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        seen = set()
+        prefix = f"{self.namespace}_" if self.namespace else ""
+        for (name, labels), counter in sorted(self._counters.items()):
+            name = prefix + name
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{self._labels(labels)} {counter.value}")
+        for (name, labels), gauge in sorted(self._gauges.items()):
+            name = prefix + name
+            if name not in seen:
+                lines.append(f"# TYPE {name} gauge")
+                seen.add(name)
+            lines.append(f"{name}{self._labels(labels)} {gauge.value}")
+        for (name, labels), hist in sorted(self._histograms.items()):
+            name = prefix + name
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{self._labels(labels, (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{self._labels(labels, (('le', '+Inf'),))} {hist.count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {hist.total}")
+            lines.append(f"{name}_count{self._labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry used across controllers, services and repositories
+metrics = MetricsRegistry()
+_span_logger = get_logger("metrics.span")
+
+SPAN_METRIC = "span_duration_seconds"
+
+
+@contextmanager
+def span(name: str, **labels: str) -> Iterator[None]:
+    """Time a block into `span_duration_seconds{span=name}` and log it.
+
+    Works in sync and async code alike (wrap awaits inside a plain `with`).
+    """
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.histogram(SPAN_METRIC, span=name, **labels).observe(elapsed)
+        if status == "error":
+            metrics.counter("span_errors_total", span=name, **labels).inc()
+        _span_logger.debug(
+            f"span={name} status={status} duration_ms={elapsed * 1000:.1f}",
+            extra={"span": name, "status": status, "duration_ms": round(elapsed * 1000, 3), **labels},
+        )
+
+
+def timed(name: str, **labels: str) -> Callable:
+    """Decorator form of `span` for sync or async functions."""
+
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name, **labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+async def start_metrics_server(port: int, host: str = "127.0.0.1") -> asyncio.AbstractServer:
+    """Serve `GET /metrics` in Prometheus text format on host:port."""
+
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", metrics.render_prometheus().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_handle, host, port)
@@ -0,0 +1,75 @@
+import math
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# Numeric columns stored per symbol, in order
+QUOTE_COLUMNS = ("price", "change", "change_pct", "volume", "previous_close")
+
+
+class QuoteTable:
+    """Compact columnar table of latest quotes keyed by symbol.
+
+    Each numeric column is a flat `array('d')` and symbols map to a row
+    index, so hundreds of tickers cost a few KB and a refresh updates the
+    row in place. `fetched_at` (monotonic) drives incremental refresh.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._as_of: List[str] = []
+        self._columns: Dict[str, array] = {name: array("d") for name in QUOTE_COLUMNS}
+        self._fetched_at = array("d")
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._index
+
+    def upsert(self, symbol: str, as_of: str = "", **values: Optional[float]) -> None:
+        """Insert or overwrite one symbol's quote; missing values are stored as NaN."""
+        i = self._index.get(symbol)
+        if i is None:
+            i = self._index[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            self._as_of.append(as_of)
+            for column in self._columns.values():
+                column.append(math.nan)
+            self._fetched_at.append(0.0)
+        self._as_of[i] = as_of
+        for name, column in self._columns.items():
+            value = values.get(name)
+            column[i] = math.nan if value is None else float(value)
+        self._fetched_at[i] = self.clock()
+
+    def stale(self, symbols: Iterable[str], max_age: float) -> List[str]:
+        """Symbols never fetched or fetched more than `max_age` seconds ago."""
+        horizon = self.clock() - max_age
+        out = []
+        for symbol in symbols:
+            i = self._index.get(symbol)
+            if i is None or self._fetched_at[i] <= horizon:
+                out.append(symbol)
+        return out
+
+    def age_seconds(self, symbol: str) -> Optional[float]:
+        i = self._index.get(symbol)
+        return None if i is None else self.clock() - self._fetched_at[i]
+
+    def get(self, symbol: str) -> Optional[Dict[str, object]]:
+        i = self._index.get(symbol)
+        if i is None:
+            return None
+        row: Dict[str, object] = {"symbol": symbol, "as_of": self._as_of[i]}
+        for name, column in self._columns.items():
+            value = column[i]
+            row[name] = None if math.isnan(value) else value
+        return row
+
+    def rows(self, symbols: Iterable[str]) -> List[Dict[str, object]]:
+        """Quotes for `symbols` in the given order, skipping unknown symbols."""
+        return [row for row in (self.get(s) for s in symbols) if row is not None]
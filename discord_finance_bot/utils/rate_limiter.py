@@ -0,0 +1,121 @@
+import asyncio
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+
+class TokenBucket:
+    """Async token bucket refilled at `rate` tokens/second up to `capacity`.
+
+    `pause()` empties the bucket and blocks it for a while, which is how
+    server-side hints such as Retry-After are honoured.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.clock = clock
+        self.tokens = self.capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self) -> float:
+        now = self.clock()
+        if now > self._updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+        return now
+
+    def delay(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` can be taken (0 if available now)."""
+        now = self._refill()
+        # While paused no tokens accrue, so the wait is the pause plus a refill
+        blocked = max(0.0, self._blocked_until - now)
+        missing = tokens - self.tokens
+        if missing <= 0:
+            return blocked
+        if self.rate <= 0:
+            return float("inf")
+        return blocked + missing / self.rate
+
+    def available(self) -> float:
+        """Tokens that could be taken right now."""
+        now = self._refill()
+        return 0.0 if now < self._blocked_until else max(0.0, self.tokens)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        if self.delay(tokens) > 0:
+            return False
+        self.tokens -= tokens
+        return True
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until `tokens` are available and take them; return the time waited."""
+        waited = 0.0
+        while True:
+            wait = self.delay(tokens)
+            if wait <= 0:
+                self.tokens -= tokens
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """Block the bucket for `seconds` and drop any accumulated burst."""
+        now = self._refill()
+        self.tokens = min(self.tokens, 0.0)
+        self._blocked_until = max(self._blocked_until, now + max(0.0, seconds))
+        self._updated = max(self._updated, self._blocked_until)
+
+    @property
+    def idle(self) -> bool:
+        """True when the bucket is full and unblocked (safe to forget)."""
+        return self.delay(self.capacity) == 0.0
+
+
+class KeyedRateLimiter:
+    """A global token bucket plus one bucket per key (e.g. an HTTP route).
+
+    `acquire(key)` waits for both; `pause()` applies a Retry-After to one
+    key or, with `is_global=True`, to everything.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        key_rate: float,
+        key_capacity: Optional[float] = None,
+        global_capacity: Optional[float] = None,
+        max_keys: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        self.key_rate = key_rate
+        self.key_capacity = key_capacity
+        self.max_keys = max_keys
+        self.global_bucket = TokenBucket(global_rate, global_capacity, clock=clock)
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune()
+            bucket = self._buckets[key] = TokenBucket(self.key_rate, self.key_capacity, clock=self.clock)
+        return bucket
+
+    def _prune(self) -> None:
+        for key in [k for k, b in self._buckets.items() if b.idle]:
+            del self._buckets[key]
+
+    async def acquire(self, key: Hashable) -> float:
+        waited = await self.bucket(key).acquire()
+        waited += await self.global_bucket.acquire()
+        return waited
+
+    def pause(self, key: Hashable, seconds: float, is_global: bool = False) -> None:
+        (self.global_bucket if is_global else self.bucket(key)).pause(seconds)
+
+    def update(self, key: Hashable, remaining: Optional[int], reset_after: Optional[float]) -> None:
+        """Apply a server-reported bucket state: block the key when it is exhausted."""
+        if remaining is not None and remaining <= 0 and reset_after:
+            self.bucket(key).pause(reset_after)
@@ -0,0 +1,273 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.rate_limiter import TokenBucket
+
+
+# Priority classes; lower runs first
+PRIORITY_SCHEDULED = 0
+PRIORITY_COMMAND = 1
+PRIORITY_BACKFILL = 2
+PRIORITY_NAMES = {PRIORITY_SCHEDULED: "scheduled", PRIORITY_COMMAND: "command", PRIORITY_BACKFILL: "backfill"}
+
+# Seconds a request may wait in the queue, per priority class
+DEFAULT_DEADLINES = {PRIORITY_SCHEDULED: 300.0, PRIORITY_COMMAND: 30.0, PRIORITY_BACKFILL: 6 * 3600.0}
+
+# Share of the daily budget each priority class must leave untouched, so
+# backfill can never spend the tokens scheduled jobs and commands rely on
+DEFAULT_DAY_RESERVES = {PRIORITY_SCHEDULED: 0.0, PRIORITY_COMMAND: 0.1, PRIORITY_BACKFILL: 0.2}
+
+# Callers set these (see `request_context`) instead of threading them through every signature.
+# Tasks inherit the values that were current when they were created.
+request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_COMMAND)
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_context(priority: int, deadline: Optional[float] = None) -> Iterator[None]:
+    """Run the enclosed code with a request priority and optional queue deadline (seconds)."""
+    priority_token = request_priority.set(priority)
+    deadline_token = request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        request_deadline.reset(deadline_token)
+        request_priority.reset(priority_token)
+
+
+class BudgetExceeded(Exception):
+    """Raised when a queued request cannot be started before its deadline."""
+
+
+class _Request:
+    __slots__ = ("key", "factory", "priority", "deadline", "enqueued", "future", "started")
+
+    def __init__(self, key: Hashable, factory: Callable[[], Awaitable[Any]], priority: int, deadline: float, now: float):
+        self.key = key
+        self.factory = factory
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued = now
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.started = False
+
+
+class RequestScheduler:
+    """Spend a per-minute and per-day request budget on the most important calls.
+
+    Requests are queued by (priority, arrival) and started only when both
+    token buckets have a token. A request may only take a daily token while
+    more than its class's reserve (`day_reserves`, a share of the daily
+    budget) is left, so a steady stream of backfill cannot drain the tokens
+    a later scheduled job needs. Identical keys share one queued or running
+    request (a later, more urgent duplicate raises its priority). A request
+    still queued at its deadline fails with `BudgetExceeded`, so callers can
+    serve cached data instead of waiting indefinitely.
+
+    Remaining budget and queue depth are exported as gauges named
+    `<name>_budget_remaining{window}` and `<name>_queue_depth`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: float,
+        per_day: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+        day_reserves: Optional[Dict[int, float]] = None,
+    ):
+        self.name = name
+        self.logger = get_logger(__name__)
+        self.clock = clock
+        self.minute = TokenBucket(per_minute / 60.0, per_minute, clock=clock) if per_minute > 0 else None
+        self.day = TokenBucket(per_day / 86400.0, per_day, clock=clock) if per_day > 0 else None
+        reserves = DEFAULT_DAY_RESERVES if day_reserves is None else day_reserves
+        # Whole daily tokens each priority must leave behind (at least one token stays usable)
+        self._day_floor = {
+            priority: min(max(0.0, share) * per_day, max(0.0, per_day - 1)) for priority, share in reserves.items()
+        }
+        self._heap: List[Tuple[int, int, _Request]] = []
+        self._seq = itertools.count()
+        self._pending: Dict[Hashable, _Request] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for r in self._pending.values() if not r.started)
+
+    def remaining(self) -> Dict[str, Optional[float]]:
+        """Whole tokens currently available per window (None = unlimited)."""
+        out: Dict[str, Optional[float]] = {}
+        for window, bucket in (("minute", self.minute), ("day", self.day)):
+            out[window] = None if bucket is None else float(int(bucket.available()))
+        return out
+
+    def _publish(self) -> None:
+        for window, value in self.remaining().items():
+            if value is not None:
+                metrics.gauge(f"{self.name}_budget_remaining", window=window).set(value)
+        metrics.gauge(f"{self.name}_queue_depth").set(self.queued)
+
+    def _buckets(self) -> List[TokenBucket]:
+        return [bucket for bucket in (self.minute, self.day) if bucket is not None]
+
+    def _delay(self, priority: int) -> float:
+        """Seconds until a request of `priority` may take a token from both windows."""
+        delays = []
+        if self.minute is not None:
+            delays.append(self.minute.delay())
+        if self.day is not None:
+            delays.append(self.day.delay(1.0 + self._day_floor.get(priority, 0.0)))
+        return max(delays, default=0.0)
+
+    def _take(self) -> None:
+        for bucket in self._buckets():
+            bucket.try_acquire()
+
+    def try_acquire(self) -> bool:
+        """Take a token immediately if one is available (synchronous callers count as commands)."""
+        if self._next() is not None or self._delay(PRIORITY_COMMAND) > 0:
+            metrics.counter(f"{self.name}_requests_total", priority="sync", outcome="rejected").inc()
+            return False
+        self._take()
+        metrics.counter(f"{self.name}_requests_total", priority="sync", outcome="sent").inc()
+        self._publish()
+        return True
+
+    async def submit(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Queue `factory()` under `key` and return its result once it has run.
+
+        `priority` and `deadline` (seconds from now) default to the current
+        `request_context`, then to the class defaults.
+        """
+        priority = request_priority.get() if priority is None else priority
+        if deadline is None:
+            deadline = request_deadline.get()
+        if deadline is None:
+            deadline = DEFAULT_DEADLINES.get(priority, 30.0)
+        now = self.clock()
+        label = PRIORITY_NAMES.get(priority, str(priority))
+
+        request = self._pending.get(key)
+        if request is not None:
+            metrics.counter(f"{self.name}_requests_total", priority=label, outcome="deduped").inc()
+            request.deadline = max(request.deadline, now + deadline)
+            if not request.started and priority < request.priority:
+                request.priority = priority
+                heapq.heappush(self._heap, (priority, next(self._seq), request))
+                self._wake()
+            return await asyncio.shield(request.future)
+
+        request = _Request(key, factory, priority, now + deadline, now)
+        self._pending[key] = request
+        heapq.heappush(self._heap, (priority, next(self._seq), request))
+        self._ensure_dispatcher()
+        self._wake()
+        self._publish()
+        return await asyncio.shield(request.future)
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_dispatcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._dispatch())
+
+    def _next(self) -> Optional[_Request]:
+        """Pop stale heap entries and return the most urgent queued request."""
+        while self._heap:
+            priority, _, request = self._heap[0]
+            if request.started or request.future.done() or priority != request.priority:
+                heapq.heappop(self._heap)
+                continue
+            return request
+        return None
+
+    def _expire(self, request: _Request, reason: str) -> None:
+        heapq.heappop(self._heap)
+        self._pending.pop(request.key, None)
+        label = PRIORITY_NAMES.get(request.priority, str(request.priority))
+        metrics.counter(f"{self.name}_requests_total", priority=label, outcome="expired").inc()
+        if not request.future.done():
+            request.future.set_exception(BudgetExceeded(reason))
+            # Avoid "exception never retrieved" warnings when every waiter gave up
+            request.future.exception()
+
+    async def _dispatch(self) -> None:
+        while True:
+            request = self._next()
+            if request is None:
+                self._wakeup.clear()
+                self._publish()
+                await self._wakeup.wait()
+                continue
+
+            now = self.clock()
+            wait = self._delay(request.priority)
+            if now + wait > request.deadline:
+                self._expire(request, f"{self.name} budget exhausted; request not started within its deadline")
+                continue
+            if wait > 0:
+                # Sleep until a token frees up or a more urgent request arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            self._take()
+            request.started = True
+            label = PRIORITY_NAMES.get(request.priority, str(request.priority))
+            metrics.counter(f"{self.name}_requests_total", priority=label, outcome="sent").inc()
+            metrics.histogram(f"{self.name}_queue_wait_seconds", priority=label).observe(now - request.enqueued)
+            self._publish()
+            asyncio.ensure_future(self._run(request))
+
+    async def _run(self, request: _Request) -> None:
+        try:
+            result = await request.factory()
+        except BaseException as exc:
+            if not request.future.done():
+                request.future.set_exception(exc)
+                request.future.exception()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+        else:
+            if not request.future.done():
+                request.future.set_result(result)
+        finally:
+            self._pending.pop(request.key, None)
+
+    async def close(self) -> None:
+        """Stop the dispatcher and fail anything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        for request in list(self._pending.values()):
+            if not request.started and not request.future.done():
+                request.future.set_exception(BudgetExceeded(f"{self.name} scheduler closed"))
+                request.future.exception()
+        self._heap.clear()
+        self._pending = {k: r for k, r in self._pending.items() if r.started}
@@ -1,7 +1,21 @@
+import datetime as dt
 from typing import Any
 from zoneinfo import ZoneInfo
 
 
+US_MARKET_TZ = ZoneInfo("America/New_York")
+# Regular US session (exchange holidays are not modelled)
+US_MARKET_OPEN = dt.time(9, 30)
+US_MARKET_CLOSE = dt.time(16, 0)
+US_SESSION_MINUTES = 390
+
+
+def is_us_market_open(at: dt.datetime) -> bool:
+    """Whether `at` (timezone-aware) falls in a weekday regular session."""
+    local = at.astimezone(US_MARKET_TZ)
+    return local.weekday() < 5 and US_MARKET_OPEN <= local.time() < US_MARKET_CLOSE
+
+
 def get_timezone(tz_name: str) -> Any:
     """Return tzinfo for APScheduler using IANA time zone names.
 
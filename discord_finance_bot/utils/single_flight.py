@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls for the same key onto one shared task.
+
+    - Callers arriving while a call is in flight await the same task.
+    - A successful result is reused for `fresh_seconds` after it completes.
+    - A failure is re-raised to every waiter and, for `error_seconds`, to new
+      callers too, so an outage does not turn into a retry storm.
+    Cancelling one waiter never cancels the shared task.
+    """
+
+    def __init__(self, fresh_seconds: float = 0.0, error_seconds: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.fresh_seconds = fresh_seconds
+        self.error_seconds = error_seconds
+        self.clock = clock
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # key -> (completed_at, ok, value_or_exception)
+        self._done: Dict[Hashable, Tuple[float, bool, Any]] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "executions": 0, "shared": 0, "reused": 0}
+
+    def _recent(self, key: Hashable):
+        done = self._done.get(key)
+        if done is None:
+            return None
+        completed_at, ok, value = done
+        ttl = self.fresh_seconds if ok else self.error_seconds
+        if self.clock() - completed_at < ttl:
+            return done
+        self._done.pop(key, None)
+        return None
+
+    def _prune(self) -> None:
+        horizon = self.clock() - max(self.fresh_seconds, self.error_seconds)
+        for key in [k for k, (completed_at, _, _) in self._done.items() if completed_at < horizon]:
+            del self._done[key]
+
+    async def _run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        self._prune()
+        try:
+            value = await factory()
+        except Exception as exc:
+            self._done[key] = (self.clock(), False, exc)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self._done[key] = (self.clock(), True, value)
+        return value
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]], force: bool = False) -> Any:
+        """Return the result of `factory()` for `key`, sharing work with concurrent callers.
+
+        `force=True` skips the freshness window (an in-flight call is still joined).
+        """
+        self.stats["calls"] += 1
+        if not force:
+            recent = self._recent(key)
+            if recent is not None:
+                self.stats["reused"] += 1
+                _, ok, value = recent
+                if ok:
+                    return value
+                raise value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(self._run(key, factory))
+            self._inflight[key] = task
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable) -> None:
+        """Drop any completed result for `key`."""
+        self._done.pop(key, None)
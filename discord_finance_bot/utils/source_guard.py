@@ -0,0 +1,192 @@
+import asyncio
+import datetime as dt
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Stop calling a failing source for a while.
+
+    Opens after `failure_threshold` consecutive failures. While open every
+    call is refused; after `reset_seconds` one trial call is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self._trial or self.clock() - self.opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the single half-open trial)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def _publish(self) -> None:
+        metrics.gauge("circuit_state", source=self.name).set(_STATE_VALUES[self.state])
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._publish()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial:
+                metrics.counter("circuit_opened_total", source=self.name).inc()
+            self.opened_at = self.clock()
+        self._trial = False
+        self._publish()
+
+
+@dataclass
+class SourceResult:
+    """Outcome of a guarded call: fresh data, or the last good data marked stale."""
+
+    value: Any
+    stale: bool = False
+    # When `value` was fetched (UTC)
+    as_of: Optional[dt.datetime] = None
+    error: str = ""
+
+
+class SourceGuard:
+    """Deadline budget, circuit breaker and last-good fallback for one upstream source.
+
+    `call()` runs the fetch within `budget` seconds. A timeout, an exception
+    or (with `empty_is_failure`) an empty result counts as a failure: the
+    breaker is told and the last good value is returned with `stale=True`.
+    Last good values are kept in `store`, so they survive restarts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: float,
+        store: "LastGoodStore",
+        empty_is_failure: bool = False,
+        failure_threshold: int = 3,
+        reset_seconds: float = 300.0,
+        default: Any = None,
+    ):
+        self.logger = get_logger(__name__)
+        self.name = name
+        self.budget = budget
+        self.store = store
+        self.empty_is_failure = empty_is_failure
+        self.default = default
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_seconds)
+
+    def _fallback(self, error: str) -> SourceResult:
+        metrics.counter("source_fallbacks_total", source=self.name).inc()
+        last = self.store.get(self.name)
+        if last is None:
+            self.logger.warning(f"Source {self.name} unavailable ({error}) and no last good data is stored.")
+            return SourceResult(self.default, stale=True, error=error)
+        value, as_of = last
+        self.logger.warning(f"Source {self.name} unavailable ({error}); serving data from {as_of.isoformat()}.")
+        return SourceResult(value, stale=True, as_of=as_of, error=error)
+
+    async def call(self, fetch: Callable[[], Awaitable[Any]]) -> SourceResult:
+        if not self.breaker.allow():
+            return self._fallback("circuit open")
+        try:
+            value = await asyncio.wait_for(fetch(), self.budget)
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            metrics.counter("source_timeouts_total", source=self.name).inc()
+            return self._fallback(f"no answer within {self.budget:g}s")
+        except Exception as exc:
+            self.breaker.record_failure()
+            return self._fallback(f"{type(exc).__name__}: {exc}")
+        if self.empty_is_failure and not value:
+            self.breaker.record_failure()
+            return self._fallback("empty result")
+        self.breaker.record_success()
+        as_of = self.store.put(self.name, value)
+        return SourceResult(value, as_of=as_of)
+
+
+class LastGoodStore:
+    """Last successful value per source, persisted as JSON at `path` (optional).
+
+    An unchanged value only refreshes its timestamp in memory; the file is
+    rewritten when a value changes or every `persist_seconds`, so after a
+    restart a timestamp can lag by at most that long.
+    """
+
+    def __init__(self, path: Optional[str] = None, persist_seconds: float = 300.0):
+        self.logger = get_logger(__name__)
+        self.path = path
+        self.persist_seconds = persist_seconds
+        self._values: Dict[str, Dict[str, Any]] = {}
+        self._saved_at = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                self._values = json.load(fh)
+        except Exception as exc:
+            self.logger.exception(f"Failed to load last good data {self.path}: {exc}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self._values, fh, ensure_ascii=False, default=str)
+            os.replace(tmp, self.path)
+            self._saved_at = time.monotonic()
+        except Exception as exc:
+            self.logger.warning(f"Failed to persist last good data {self.path}: {exc}")
+
+    def get(self, name: str):
+        """(value, as_of) of the last good fetch of `name`, or None."""
+        entry = self._values.get(name)
+        if entry is None:
+            return None
+        return entry["value"], dt.datetime.fromisoformat(entry["as_of"])
+
+    def put(self, name: str, value: Any) -> dt.datetime:
+        as_of = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+        previous = self._values.get(name)
+        self._values[name] = {"value": value, "as_of": as_of.isoformat()}
+        if previous is None or previous["value"] != value or time.monotonic() - self._saved_at >= self.persist_seconds:
+            self._save()
+        return as_of
@@ -0,0 +1,129 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class _TimedLoader:
+    """Loader proxy that times module creation and execution.
+
+    The real loader is put back on the module spec before the module body
+    runs, so nothing that inspects `__loader__`/`__spec__` later sees the proxy.
+    """
+
+    def __init__(self, loader: Any, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        with self._profiler.importing(spec.name):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        spec = module.__spec__
+        spec.loader = self._loader
+        module.__loader__ = self._loader
+        with self._profiler.importing(spec.name):
+            self._loader.exec_module(module)
+
+
+class StartupProfiler:
+    """Time imports (per module) and named startup phases for `--profile-startup`.
+
+    `install()` adds a meta path finder that wraps each newly imported
+    module's loader; a module's self time excludes the imports it triggers.
+    Phases are wall-clock blocks timed with `phase()`, and `ready()` marks
+    the moment the gateway session is up.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        # Module -> [self seconds, cumulative seconds]
+        self.imports: Dict[str, List[float]] = {}
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_at: Optional[float] = None
+        self._stack: List[List[float]] = []
+        self._installed = False
+
+    # -- meta path finder protocol -------------------------------------------------
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+        return None
+
+    def invalidate_caches(self) -> None:
+        pass
+
+    def install(self) -> None:
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            sys.meta_path.remove(self)
+            self._installed = False
+
+    @contextmanager
+    def importing(self, name: str) -> Iterator[None]:
+        # Frame: [seconds spent in nested imports]
+        frame = [0.0]
+        self._stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += elapsed
+            entry = self.imports.setdefault(name, [0.0, 0.0])
+            entry[0] += elapsed - frame[0]
+            entry[1] += elapsed
+
+    # -- phases ----------------------------------------------------------------------
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t0))
+
+    def ready(self) -> None:
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter()
+
+    def report(self, top: int = 15, components: Optional[Dict[str, float]] = None) -> str:
+        """Plain-text report: phases, component init times, slowest packages and modules."""
+        lines = ["Startup profile"]
+        for name, seconds in self.phases:
+            lines.append(f"  phase {name:<28}{seconds * 1000:>10.1f} ms")
+        for name, seconds in (components or {}).items():
+            lines.append(f"  init  {name:<28}{seconds * 1000:>10.1f} ms")
+        if self.ready_at is not None:
+            lines.append(f"  {'time to on_ready':<34}{(self.ready_at - self.started) * 1000:>10.1f} ms")
+
+        packages: Dict[str, float] = {}
+        for name, (own, _) in self.imports.items():
+            root = name.split(".", 1)[0]
+            packages[root] = packages.get(root, 0.0) + own
+        total = sum(packages.values())
+        lines.append(f"Imports: {len(self.imports)} modules, {total * 1000:.1f} ms")
+        lines.append("  slowest packages (self time of all their modules):")
+        for root, own in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+            lines.append(f"    {root:<40}{own * 1000:>10.1f} ms")
+        lines.append("  slowest modules (cumulative, including their imports):")
+        for name, (own, cumulative) in sorted(self.imports.items(), key=lambda kv: kv[1][1], reverse=True)[:top]:
+            lines.append(f"    {name:<40}{cumulative * 1000:>10.1f} ms  (self {own * 1000:.1f} ms)")
+        return "\n".join(lines)